@@ -1,10 +1,16 @@
 """Main place to adjust pytest settings and creating global fixtures."""
 
+import socket
+from contextlib import AbstractContextManager, contextmanager
+from typing import Callable, Iterator
+
 import pytest
-from sqlmodel import create_engine
+from aiosmtpd.controller import Controller
+from sqlalchemy import event
 
 import dundie.utils.log as log
-from dundie import models
+from dundie import database, models
+from dundie.database import create_db_engine
 from dundie.settings import log_file
 from tests.constants import TEST_DATABASE_FILE, TEST_LOG_FILE
 
@@ -53,7 +59,7 @@ def _setup_test_database(request, monkeypatch):
     """
     tmpdir = request.getfixturevalue("tmpdir")
     test_database = str(tmpdir.join(TEST_DATABASE_FILE))
-    engine = create_engine(f"sqlite:///{test_database}")
+    engine = create_db_engine(f"sqlite:///{test_database}")
     models.SQLModel.metadata.create_all(bind=engine)
     with monkeypatch.context() as m:
         m.setattr("dundie.database.engine", engine)
@@ -84,3 +90,102 @@ def _setup_test_logfile(request, monkeypatch):
     with monkeypatch.context() as m:
         m.setattr(log, f"{log_file.name}", test_log_file)
         yield
+
+
+class RecordingHandler:
+    """
+    aiosmtpd handler that records the messages and SMTP sessions.
+
+    Attributes:
+        messages (list[tuple[str, list[str]]]): The sender and recipients of
+          every message accepted.
+        sessions (list[object]): The SMTP sessions the messages were sent on.
+        rejected (set[str]): The recipients refused with a 550 reply.
+    """
+
+    def __init__(self):
+        """Initialize class."""
+        self.messages: list[tuple[str, list[str]]] = []
+        self.sessions: list[object] = []
+        self.rejected: set[str] = set()
+
+    async def handle_RCPT(
+        self, server, session, envelope, address, rcpt_options
+    ) -> str:
+        """Accept the recipient, unless it is rejected."""
+        if address in self.rejected:
+            return "550 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        """Record the message and the session it was sent on."""
+        self.messages.append((envelope.mail_from, envelope.rcpt_tos))
+        if not any(session is known for known in self.sessions):
+            self.sessions.append(session)
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture
+def unused_port() -> int:
+    """
+    Fixture to get a local TCP port nobody is listening on.
+
+    Returns:
+        int: The port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(unused_port: int) -> Iterator[tuple[RecordingHandler, int]]:
+    """
+    Fixture to run a local SMTP server.
+
+    Args:
+      unused_port (int): The port the server listens on.
+
+    Yields:
+      tuple[RecordingHandler, int]: The server handler and its port.
+    """
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=unused_port)
+    controller.start()
+    yield handler, unused_port
+    controller.stop()
+
+
+@pytest.fixture
+def sql_statements() -> Callable[[], AbstractContextManager[list[str]]]:
+    """
+    Fixture to capture the SQL statements executed on the test database.
+
+    Example:
+        >>> with sql_statements() as statements:
+        ...     read()
+        >>> len(statements)
+        1
+
+    Returns:
+        Callable[[], AbstractContextManager[list[str]]]: A context manager
+          yielding the list the statements executed in its block are
+          appended to.
+    """
+
+    @contextmanager
+    def capture() -> Iterator[list[str]]:
+        statements: list[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = database.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return capture
@@ -1,16 +1,32 @@
-"""CLI (Command Line Interface) module of dundie."""
+"""CLI (Command Line Interface) module of dundie.
 
+The commands import `dundie.core` and `dundie.database` when they run, so
+`--help` and `--version` start without loading SQLModel, httpx or pwdlib.
+"""
+
+import csv
 import importlib.metadata
 import json
+import time
 from datetime import datetime
 from decimal import Decimal
+from typing import IO, Any, Iterable
 
 import rich_click as click
 from rich.console import Console
 from rich.table import Table
 
-from dundie import core
-from dundie.settings import PROJECT_NAME, Query
+from dundie.settings import (
+    DATABASE_REVISION,
+    DATE_FORMAT,
+    LOAD_CHUNK_SIZE,
+    OUTBOX_BATCH_SIZE,
+    PASSWORD_HASH_WORKERS,
+    PROJECT_NAME,
+    READ_FIELDS,
+    Query,
+    ResultDict,
+)
 
 click.rich_click.USE_RICH_MARKUP = True
 click.rich_click.USE_MARKDOWN = True
@@ -32,7 +48,23 @@ class CustomJSONEncoder(json.JSONEncoder):
         return str(super().default(obj))
 
 
-@click.group()
+class DundieGroup(click.RichGroup):
+    """Command group reporting database errors without a traceback."""
+
+    def invoke(self, ctx: click.Context) -> Any:
+        """Invoke the command, converting database schema errors."""
+        try:
+            return super().invoke(ctx)
+        except Exception as e:
+            # Imported on error only, to keep the startup light
+            from dundie.database import DatabaseSchemaError
+
+            if isinstance(e, DatabaseSchemaError):
+                raise click.ClickException(str(e)) from e
+            raise
+
+
+@click.group(cls=DundieGroup)
 @click.version_option(importlib.metadata.version(PROJECT_NAME))
 def main() -> None:
     """Dunder Mifflin Rewards System.
@@ -48,7 +80,35 @@ def main() -> None:
 
 @main.command()
 @click.argument("filepath", type=click.Path(exists=True), required=True)
-def load(filepath: str) -> None:
+@click.option(
+    "--bulk",
+    is_flag=True,
+    default=False,
+    help="Use set-based bulk inserts and updates",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=LOAD_CHUNK_SIZE,
+    show_default=True,
+    help="Number of rows written per chunk",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=0),
+    default=PASSWORD_HASH_WORKERS,
+    show_default=True,
+    help="Processes hashing passwords in bulk mode (0: all cores, 1: serial)",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Display each chunk as soon as it is loaded",
+)
+def load(
+    filepath: str, bulk: bool, chunk_size: int, workers: int, stream: bool
+) -> None:
     """Load employees data from a CSV file to the database and display them.
 
     FILEPATH is the path to the CSV file.
@@ -58,27 +118,90 @@ def load(filepath: str) -> None:
     - Validates the data.
     - Parses the data.
     - Displays the data.
+    - Bulk import mode for large files, hashing passwords in parallel.
+    - Streaming mode to display each chunk as soon as it is loaded.
     """
-    table = Table(title="Dunder Mifflin Employees")
-    headers = ["Name", "Email", "Role", "Department", "Currency", "Created"]
-    for header in headers:
-        table.add_column(header, header_style="magenta", highlight=True)
+    from dundie import core
 
-    employees = core.load(filepath)
+    console = Console()
 
-    if not employees:
-        console = Console()
+    start = time.perf_counter()
+    if stream:
+        total = 0
+        for employees in core.iter_load(
+            filepath, bulk=bulk, chunk_size=chunk_size, workers=workers
+        ):
+            total += len(employees)
+            console.print(employees_table(employees))
+    else:
+        employees = core.load(
+            filepath, bulk=bulk, chunk_size=chunk_size, workers=workers
+        )
+        total = len(employees)
+        if employees:
+            console.print(employees_table(employees))
+    elapsed = time.perf_counter() - start
+
+    if not total:
         console.print(
             "ERROR: Check the CSV and the log files for errors",
             style="bold red",
         )
         return
 
+    if bulk:
+        console.print(
+            f"Loaded {total} rows in {elapsed:.2f}s"
+            f" ({total / elapsed:.0f} rows/s)"
+        )
+
+
+def employees_table(employees: ResultDict) -> Table:
+    """Build the table displayed by the load command.
+
+    Args:
+        employees (ResultDict): The employee records returned by the load.
+
+    Returns:
+        Table: The table with one row per employee.
+    """
+    table = Table(title="Dunder Mifflin Employees")
+    headers = ["Name", "Email", "Role", "Department", "Currency", "Created"]
+    for header in headers:
+        table.add_column(header, header_style="magenta", highlight=True)
+
     for employee in employees:
         table.add_row(*[str(entry) for entry in employee.values()])
 
-    console = Console()
-    console.print(table)
+    return table
+
+
+def split_fields(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> list[str] | None:
+    """Split and validate the comma-separated fields of the show command.
+
+    Args:
+        ctx (click.Context): The click context.
+        param (click.Parameter): The --fields option.
+        value (str | None): The value of the option.
+
+    Returns:
+        list[str] | None: The fields, or None to show all of them.
+
+    Raises:
+        click.BadParameter: If a field is not one of READ_FIELDS.
+    """
+    if not value:
+        return None
+
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    invalid = [field for field in fields if field not in READ_FIELDS]
+    if invalid:
+        raise click.BadParameter(
+            f"{', '.join(invalid)} (choose from {', '.join(READ_FIELDS)})"
+        )
+    return fields
 
 
 @main.command()
@@ -92,9 +215,40 @@ def load(filepath: str) -> None:
 )
 @click.option(
     "--format",
-    type=click.Choice(["txt", "json"], case_sensitive=False),
+    type=click.Choice(["txt", "json", "ndjson", "csv"], case_sensitive=False),
     default="txt",
-    help="Output format (txt or json)",
+    help="Output format (txt, json, ndjson or csv)",
+)
+@click.option(
+    "--sort",
+    "order_by",
+    type=click.Choice(["id", "email"], case_sensitive=False),
+    default="id",
+    show_default=True,
+    help="Sort by employee id or email",
+)
+@click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    required=False,
+    help="Show at most this number of employees",
+)
+@click.option(
+    "--after",
+    required=False,
+    help="Show the employees after this employee id or email",
+)
+@click.option(
+    "--fields",
+    callback=split_fields,
+    required=False,
+    help="Comma-separated fields to show, e.g. name,email,balance",
+)
+@click.option(
+    "--refresh-rates",
+    is_flag=True,
+    default=False,
+    help="Fetch the exchange rates even if they are cached",
 )
 def show(**query: Query) -> None:
     """Show employees data.
@@ -103,8 +257,25 @@ def show(**query: Query) -> None:
 
     - Filter by email or department.
     - Output to console or file.
-    - Output format as TXT or JSON.
+    - Output format as TXT, JSON, NDJSON or CSV.
+    - NDJSON and CSV rows are streamed as they are read, for large reports.
+    - Pages of --limit employees, use --after to get the next page.
+    - Only the --fields requested are read from the database.
+    - Exchange rates cached for an hour, use --refresh-rates to fetch them.
     """
+    from dundie import core
+
+    if query["format"] in ("ndjson", "csv"):
+        rows = core.iter_read(**query)
+        if query["file"]:
+            with query["file"] as file:  # type: ignore
+                write_rows(rows, str(query["format"]), file)
+        else:
+            write_rows(
+                rows, str(query["format"]), click.get_text_stream("stdout")
+            )
+        return
+
     result = core.read(**query)
 
     if not result:
@@ -112,42 +283,80 @@ def show(**query: Query) -> None:
         console.print("No results found")
         return
 
-    table = Table(title="Dunder Mifflin Rewards Report")
-    headers = [
-        "Name",
-        "Email",
-        "Role",
-        "Department",
-        "Balance",
-        "Currency",
-        "Total",
-        "Last Transaction",
-    ]
-    for header in headers:
-        table.add_column(header, header_style="magenta", highlight=True)
-
     for employee in result:
-        employee["balance"] = f"{employee['balance']:.2f}"
-        employee["total"] = f"{employee['total']:.2f}"
-        table.add_row(*[str(entry) for entry in employee.values()])
+        format_amounts(employee)
 
     if query["format"] == "json":
-        output_data = json.dumps(result, indent=4, cls=CustomJSONEncoder)
-        if query["file"]:
-            with query["file"] as file:  # type: ignore
-                console = Console(file=file)
-                console.print(output_data)
-        else:
-            console = Console()
-            console.print(output_data)
+        output: Any = json.dumps(result, indent=4, cls=CustomJSONEncoder)
     else:
-        if query["file"]:
-            with query["file"] as file:  # type: ignore
-                console = Console(file=file)
-                console.print(table)
+        output = Table(title="Dunder Mifflin Rewards Report")
+        for field in result[0]:
+            output.add_column(
+                field.replace("_", " ").title(),
+                header_style="magenta",
+                highlight=True,
+            )
+        for employee in result:
+            output.add_row(*[str(entry) for entry in employee.values()])
+
+    if query["file"]:
+        with query["file"] as file:  # type: ignore
+            console = Console(file=file)
+            console.print(output)
+    else:
+        console = Console()
+        console.print(output)
+
+    if (
+        query["format"] == "txt"
+        and len(result) == query["limit"]
+        and "email" in result[-1]
+    ):
+        console = Console()
+        console.print(f"Next page: --after {result[-1]['email']}")
+
+
+def format_amounts(employee: dict[str, Any]) -> None:
+    """Format the balance and the total of the employee data, if present.
+
+    Args:
+        employee (dict[str, Any]): The employee data returned by `core.read`.
+    """
+    for field in ("balance", "total"):
+        if field in employee:
+            employee[field] = f"{employee[field]:.2f}"
+
+
+def write_rows(
+    rows: Iterable[dict[str, Any]], output_format: str, file: IO[str]
+) -> int:
+    """Write the employee data to a file as NDJSON or CSV, row by row.
+
+    The rows are written as they are read, without building a Rich table or
+    the full report in memory.
+
+    Args:
+        rows (Iterable[dict[str, Any]]): The employee data returned by
+            `core.iter_read`.
+        output_format (str): The output format, ndjson or csv.
+        file (IO[str]): The file to write to.
+
+    Returns:
+        int: The number of rows written.
+    """
+    writer = None
+    count = 0
+    for row in rows:
+        format_amounts(row)
+        if output_format == "csv":
+            if writer is None:
+                writer = csv.DictWriter(file, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
         else:
-            console = Console()
-            console.print(table)
+            file.write(json.dumps(row, cls=CustomJSONEncoder) + "\n")
+        count += 1
+    return count
 
 
 @main.command()
@@ -166,6 +375,8 @@ def update(ctx: click.Context, value: Decimal, **query: Query) -> None:
 
     - Filter by email or department.
     """
+    from dundie import core
+
     result = core.update(value, **query)
     if result:
         console = Console()
@@ -173,3 +384,193 @@ def update(ctx: click.Context, value: Decimal, **query: Query) -> None:
         return
 
     ctx.invoke(show, **query)
+
+
+@main.command()
+@click.option(
+    "--fix",
+    is_flag=True,
+    default=False,
+    help="Rewrite mismatched balances from the ledger",
+)
+def reconcile(fix: bool) -> None:
+    """Check the balance of reward points against the transaction ledger.
+
+    ## Features
+
+    - Recomputes every balance from its latest snapshot and newer transactions.
+    - Reports the employees whose balance does not match the ledger.
+    - Optionally fixes the mismatched balances.
+    """
+    from dundie import core
+
+    result = core.reconcile(fix=fix)
+
+    console = Console()
+
+    if not result:
+        console.print("All balances match the ledger")
+        return
+
+    table = Table(title="Dunder Mifflin Balance Reconciliation")
+    headers = ["Email", "Balance", "Ledger", "Fixed"]
+    for header in headers:
+        table.add_column(header, header_style="magenta", highlight=True)
+
+    for employee in result:
+        employee["balance"] = f"{employee['balance']:.2f}"
+        employee["ledger"] = f"{employee['ledger']:.2f}"
+        table.add_row(*[str(entry) for entry in employee.values()])
+
+    console.print(table)
+
+
+@main.command()
+def login() -> None:
+    """Log in and keep a session token for the next commands.
+
+    Uses the EMPLOYEE_EMAIL and EMPLOYEE_PASSWORD environment variables.
+
+    ## Features
+
+    - Verifies the password once instead of on every command.
+    - The token expires after an hour or when logging out.
+    """
+    from dundie import core
+
+    result = core.login()
+
+    console = Console()
+    console.print(
+        f"Logged in as {result['email']} until "
+        f"{result['expires_at'].strftime(DATE_FORMAT)}"
+    )
+
+
+@main.command()
+def logout() -> None:
+    """Log out and revoke the session token."""
+    from dundie import core
+
+    console = Console()
+    if core.logout():
+        console.print("Logged out")
+    else:
+        console.print("Not logged in")
+
+
+@main.group()
+def mail() -> None:
+    """Manage the emails queued in the outbox."""
+
+
+@mail.command()
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=OUTBOX_BATCH_SIZE,
+    show_default=True,
+    help="Number of emails sent per batch",
+)
+def flush(batch_size: int) -> None:
+    """Send the emails queued in the outbox.
+
+    ## Features
+
+    - Sends the emails in batches on one SMTP connection.
+    - Keeps the emails that fail to be retried on the next flush.
+    - Drops the emails that failed OUTBOX_MAX_ATTEMPTS times.
+    - Stops when the SMTP server is unreachable, keeping the unsent emails.
+    - Reports the throughput.
+    """
+    from dundie import core
+
+    start = time.perf_counter()
+    result = core.flush_outbox(batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    console = Console()
+    console.print(
+        f"Sent {result['sent']} emails, {result['failed']} failed, "
+        f"{result['dropped']} dropped"
+        f" in {elapsed:.2f}s ({result['sent'] / elapsed:.1f} emails/s)"
+    )
+    if result["unsent"]:
+        raise click.ClickException(
+            f"The SMTP server is unreachable, {result['unsent']} emails left "
+            "in the outbox."
+        )
+
+
+@main.group()
+def ledger() -> None:
+    """Manage the transaction ledger."""
+
+
+@ledger.command()
+@click.option(
+    "--before",
+    type=click.DateTime(formats=["%Y-%m-%d", DATE_FORMAT]),
+    required=True,
+    help="Compact the transactions dated before this date",
+)
+@click.option(
+    "--archive",
+    type=click.Path(dir_okay=False),
+    required=False,
+    help="Archive the compacted transactions to a new gzip compressed CSV",
+)
+def compact(before: datetime, archive: str | None) -> None:
+    """Compact the transaction ledger into balance snapshots.
+
+    ## Features
+
+    - Snapshots the balance of each employee at --before.
+    - Deletes the transactions folded into the snapshots.
+    - Recomputing a balance reads only its latest snapshot and newer
+      transactions.
+    - Optionally archives the deleted transactions.
+    """
+    from dundie import core
+
+    try:
+        result = core.compact_ledger(before, archive=archive)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--before")
+    except FileExistsError:
+        raise click.BadParameter(
+            f"File {archive!r} already exists.", param_hint="--archive"
+        )
+
+    console = Console()
+    console.print(
+        f"Compacted {result['transactions']} transactions of "
+        f"{result['employees']} employees before {result['before']}"
+    )
+    if result["archive"]:
+        console.print(f"Archived to {result['archive']}")
+
+
+@main.group()
+def db() -> None:
+    """Manage the database."""
+
+
+@db.command()
+def init() -> None:
+    """Initialize a new database.
+
+    ## Features
+
+    - Creates the tables.
+    - Stamps the database with the current migration revision.
+    """
+    from dundie.database import init_db
+
+    console = Console()
+    if init_db():
+        console.print(f"Database initialized at revision {DATABASE_REVISION}")
+    else:
+        console.print(
+            f"Database already initialized at revision {DATABASE_REVISION}"
+        )
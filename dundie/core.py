@@ -3,21 +3,63 @@
 This module contains the business logic for the Dundie application.
 """
 
+import gzip
+import os
 from csv import DictReader
 from csv import Error as CSVError
+from datetime import datetime
 from decimal import Decimal
-from typing import Any
+from itertools import chain, islice
+from typing import Any, Iterable, Iterator, Optional, TypeVar
 
 from pydantic import ValidationError
-from sqlmodel import select
+from sqlmodel import func, or_, select
 
 from dundie.database import get_session
-from dundie.models import Employee
-from dundie.settings import DATE_FORMAT, Query, ResultDict
-from dundie.utils.authentication import require_authentication
-from dundie.utils.db import add_employee, add_transaction
+from dundie.models import Balance, Employee, Outbox, Transaction
+from dundie.settings import (
+    BALANCE_PRECISION,
+    DATE_FORMAT,
+    LOAD_CHUNK_SIZE,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    PASSWORD_HASH_WORKERS,
+    READ_CHUNK_SIZE,
+    READ_FIELDS,
+    Query,
+    ResultDict,
+)
+from dundie.utils.authentication import (
+    authenticate_password,
+    delete_token,
+    issue_token,
+    read_token,
+    require_authentication,
+    revoke_token,
+    save_token,
+)
+from dundie.utils.db import (
+    add_employee,
+    add_transactions,
+    bulk_add_employees,
+    check_compaction_date,
+    compact_transactions,
+    get_employee_ids,
+    latest_snapshots,
+    lock_balances,
+    purge_outbox,
+    recompute_balance,
+)
+from dundie.utils.email import SMTPSender
 from dundie.utils.exchange import get_exchange_rates
 from dundie.utils.log import get_logger
+from dundie.utils.user import password_hash_executor
+
+T = TypeVar("T")
+
+# The columns the employee data can be sorted by. Both are unique, so the last
+# value of a page is a keyset cursor for the next one.
+SORT_COLUMNS: dict[str, Any] = {"id": Employee.id, "email": Employee.email}
 
 
 def loc_to_dot_sep(loc: tuple[str | int, ...]) -> str:
@@ -71,47 +113,139 @@ def convert_errors(e: ValidationError) -> list[dict[str, Any]]:
     return new_errors
 
 
-def load(filepath: str) -> ResultDict:
+def validation_error_msg(
+    employee_data: dict[str, Any], error: ValidationError
+) -> str:
     """
-    Load employee data from a CSV file, add employees to the database, and\
-    return a list of employee records.
+    Build the log message for an employee row that failed validation.
 
     Args:
-        filepath (str): The path to the CSV file containing employee data.
+        employee_data (dict[str, Any]): The raw employee data from the CSV.
+        error (ValidationError): The Pydantic ValidationError raised for it.
 
     Returns:
-        list[dict[str, Any]]: A list of dictionaries, each containing employee
-          data including name, department, role, email, and creation status.
+        str: The error message to log.
+    """
+    pretty_errors = convert_errors(error)
+    error_msg = f"""\
+Employee {employee_data!r} has an invalid email {pretty_errors[0]["input"]!r}:\
+ [ValidationError] {pretty_errors[0]["ctx"]["reason"]}
+"""
+    return error_msg
 
-    Raises:
-        FileNotFoundError: If the specified file does not exist.
-        CSVError: If there is an error reading the CSV file.
-        ValidationError: If there is an error validating the employee data.
+
+def batched(iterable: Iterable[T], size: int) -> Iterator[list[T]]:
     """
-    employees = []
+    Split an iterable into lists of at most `size` items.
+
+    Args:
+        iterable (Iterable[T]): The iterable to split.
+        size (int): The maximum number of items in each list.
+
+    Yields:
+        list[T]: The next list of items.
+
+    Example:
+        >>> list(batched([1, 2, 3], 2))
+        [[1, 2], [3]]
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def iter_employees(
+    csv_data: Iterable[dict[str, Any]],
+) -> Iterator[tuple[dict[str, Any], Employee]]:
+    """
+    Validate employee rows read from a CSV file.
+
+    The iteration stops at the first invalid row, which is logged, so the
+    rows before it can still be added to the database.
+
+    Args:
+        csv_data (Iterable[dict[str, Any]]): The employee rows.
 
+    Yields:
+        tuple[dict[str, Any], Employee]: The row and the validated employee.
+    """
     log = get_logger()
 
-    try:
-        csv_data = DictReader(
-            open(filepath), strict=True, dialect="unix", skipinitialspace=True
-        )
+    for employee_data in csv_data:
+        try:
+            employee = Employee(**employee_data)
+        except ValidationError as error:
+            log.error(validation_error_msg(employee_data, error))
+            return
+        yield employee_data, employee
+
+
+def iter_load(
+    filepath: str,
+    bulk: bool = False,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    workers: int = PASSWORD_HASH_WORKERS,
+) -> Iterator[ResultDict]:
+    """
+    Stream employee data from a CSV file to the database in chunks.
 
-        csv_data_list = list(csv_data)
+    The CSV file is read lazily and the rows go through a generator pipeline
+    that validates them, groups them in chunks of `chunk_size` and writes
+    each chunk in its own transaction, so memory usage does not depend on
+    the size of the file. The chunks committed before an invalid row or a
+    malformed line are kept.
 
-        if not csv_data_list:
-            log.error(f"Empty CSV file provided {filepath!r}")
-            return []
+    In bulk mode, the existing employees are fetched in a single query and
+    each chunk is written with set-based statements, after hashing the
+    passwords of the whole chunk in a pool of `workers` processes.
 
-        with get_session() as session:
-            for employee_data in csv_data_list:
-                employee = Employee(**employee_data)
-                _, created = add_employee(session, employee)
-                return_data = employee_data.copy()
-                return_data["created"] = created
-                employees.append(return_data)
+    Args:
+        filepath (str): The path to the CSV file containing employee data.
+        bulk (bool): Whether to use the bulk import mode. Defaults to False.
+        chunk_size (int): The number of rows written per chunk. Defaults to
+          LOAD_CHUNK_SIZE.
+        workers (int): The number of processes hashing passwords in bulk
+          mode. 0 uses all the CPU cores and 1 hashes serially. Defaults to
+          PASSWORD_HASH_WORKERS.
+
+    Yields:
+        list[dict[str, Any]]: The employee records of each committed chunk,
+          including name, department, role, email, and creation status.
+    """
+    log = get_logger()
 
-            session.commit()
+    try:
+        with open(filepath) as csv_file:
+            csv_data = DictReader(
+                csv_file, strict=True, dialect="unix", skipinitialspace=True
+            )
+
+            with (
+                get_session() as session,
+                password_hash_executor(workers if bulk else 1) as executor,
+            ):
+                employee_ids = get_employee_ids(session) if bulk else {}
+
+                for chunk in batched(iter_employees(csv_data), chunk_size):
+                    employees = [employee for _, employee in chunk]
+                    if bulk:
+                        created = bulk_add_employees(
+                            session, employees, employee_ids, executor
+                        )
+                    else:
+                        created = [
+                            add_employee(session, employee)[1]
+                            for employee in employees
+                        ]
+                    session.commit()
+
+                    yield [
+                        {**employee_data, "created": _created}
+                        for (employee_data, _), _created in zip(chunk, created)
+                    ]
+
+            if csv_data.line_num <= 1:
+                log.error(f"Empty CSV file provided {filepath!r}")
 
     except FileNotFoundError as exception_msg:
         log.error(f"FileNotFoundError: {exception_msg}")
@@ -119,70 +253,239 @@ def load(filepath: str) -> ResultDict:
     except CSVError as exception_msg:
         log.error(f"CSVError: {exception_msg}")
         pass
-    except ValidationError as error:
-        pretty_errors = convert_errors(error)
-        error_msg = f"""\
-Employee {employee_data!r} has an invalid email {pretty_errors[0]["input"]!r}:\
- [ValidationError] {pretty_errors[0]["ctx"]["reason"]}
-"""
-        log.error(error_msg)
-        pass
 
-    return employees
 
+def load(
+    filepath: str,
+    bulk: bool = False,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    workers: int = PASSWORD_HASH_WORKERS,
+) -> ResultDict:
+    """
+    Load employee data from a CSV file, add employees to the database, and\
+    return a list of employee records.
+
+    In bulk mode, the existing employees are fetched in a single query and
+    the rows are written with set-based statements in chunks of `chunk_size`,
+    committing after each chunk. See `iter_load` to process the chunks as
+    they are committed instead of collecting all the records.
+
+    Args:
+        filepath (str): The path to the CSV file containing employee data.
+        bulk (bool): Whether to use the bulk import mode. Defaults to False.
+        chunk_size (int): The number of rows written per chunk. Defaults to
+          LOAD_CHUNK_SIZE.
+        workers (int): The number of processes hashing passwords in bulk
+          mode. Defaults to PASSWORD_HASH_WORKERS.
 
-def read(**query: Query) -> ResultDict:
+    Returns:
+        list[dict[str, Any]]: A list of dictionaries, each containing employee
+          data including name, department, role, email, and creation status.
     """
-    Read and filter employee data from the database based on the provided\
-    query parameters.
+    return list(
+        chain.from_iterable(iter_load(filepath, bulk, chunk_size, workers))
+    )
+
+
+def query_filters(**query: Query) -> list[Any]:
+    """
+    Build the SQL filters on the Employee table from the query parameters.
 
     Keyword Args:
         email (str, optional): Filter by employee email.
         department (str, optional): Filter by employee department.
 
     Returns:
-        list[dict[str, Any]]: A list of dictionaries containing employee data,
-            including name, email, role, department, balance, and last
-            transaction date.
+        list[Any]: The SQL expressions every selected employee must match.
     """
-    return_data = []
-
     sql_statement = []
     if query.get("department"):
         sql_statement.append(Employee.department == query["department"])
     if query.get("email"):
         sql_statement.append(Employee.email == query["email"])
+    return sql_statement
 
-    sql = select(Employee)
-    if sql_statement:
-        sql = sql.where(*sql_statement)
 
-    with get_session() as session:
-        currencies = session.exec(select(Employee.currency).distinct())
-        exchange_rates = get_exchange_rates(list(currencies))
+def page_filters(**query: Query) -> tuple[Any, list[Any]]:
+    """
+    Build the sort key and the keyset filter of a page of employees.
 
-        results = session.exec(sql)
-        for employee in results:
-            total = (
-                exchange_rates[employee.currency].value * employee.balance.value
-            )
+    The `after` cursor is the id or the email of the last employee of the
+    previous page. The page starts right after that employee in the sort
+    order, so fetching it only reads the rows it returns, whatever the page
+    number.
 
-            return_data.append(
-                {
-                    "name": employee.name,
-                    "email": employee.email,
-                    "role": employee.role,
-                    "department": employee.department,
-                    "balance": employee.balance.value,
-                    "currency": employee.currency,
-                    "total": total,
-                    "last_transaction": employee.transaction[-1].date.strftime(
-                        DATE_FORMAT
-                    ),
-                }
+    Keyword Args:
+        order_by (str, optional): Sort by "id" or by "email". Defaults to
+          "id".
+        after (str | int, optional): The id or the email of the last employee
+          of the previous page.
+
+    Returns:
+        tuple[Any, list[Any]]: The column to sort by and the SQL expressions
+          every employee of the page must match.
+
+    Raises:
+        ValueError: If `order_by` is not a valid sort key.
+    """
+    order_by = str(query.get("order_by") or "id")
+    if order_by not in SORT_COLUMNS:
+        raise ValueError(f"Invalid sort key {order_by!r}.")
+    sort_column = SORT_COLUMNS[order_by]
+
+    after = query.get("after")
+    if after is None or after == "":
+        return sort_column, []
+
+    after = str(after)
+    if after.isdigit():
+        cursor = Employee.id == int(after)
+        if order_by == "id":
+            return sort_column, [Employee.id > int(after)]  # type: ignore
+    else:
+        cursor = Employee.email == after
+        if order_by == "email":
+            return sort_column, [Employee.email > after]
+
+    # The cursor identifies the employee by the other key, so the sort value
+    # of that employee is looked up in the same query.
+    cursor_value = select(sort_column).where(cursor).scalar_subquery()
+    return sort_column, [sort_column > cursor_value]
+
+
+def iter_read(**query: Query) -> Iterator[dict[str, Any]]:
+    """
+    Stream employee data from the database, filtered by the provided query\
+    parameters.
+
+    The rows are fetched from a server-side cursor READ_CHUNK_SIZE at a time
+    and yielded one by one, so memory usage does not depend on the number of
+    employees. The session stays open until the generator is exhausted or
+    closed.
+
+    With `limit` and `after`, a single page is fetched with a keyset query,
+    in constant time on large tenants.
+
+    Keyword Args:
+        email (str, optional): Filter by employee email.
+        department (str, optional): Filter by employee department.
+        order_by (str, optional): Sort by "id" or by "email". Defaults to
+          "id".
+        after (str | int, optional): The id or the email of the last employee
+          of the previous page.
+        limit (int, optional): The maximum number of employees.
+        fields (list[str], optional): The fields of READ_FIELDS to return, in
+          that order. Only their columns are selected, and the exchange rates
+          are only fetched for the total. Defaults to all of them.
+        refresh_rates (bool, optional): Fetch the exchange rates even if they
+          are cached.
+
+    Yields:
+        dict[str, Any]: The employee data, including name, email, role,
+          department, balance, and last transaction date.
+
+    Raises:
+        ValueError: If `order_by` is not a valid sort key or a field is not
+          valid.
+    """
+    sort_column, keyset = page_filters(**query)
+    sql_statement = query_filters(**query) + keyset
+    limit = query.get("limit")
+
+    def page(sql: Any) -> Any:
+        """Apply the filters, the sort order and the limit to a query."""
+        sql = sql.order_by(sort_column)
+        if sql_statement:
+            sql = sql.where(*sql_statement)
+        if limit:
+            sql = sql.limit(limit)
+        return sql
+
+    fields = list(dict.fromkeys(query.get("fields") or READ_FIELDS))
+    for field in fields:
+        if field not in READ_FIELDS:
+            raise ValueError(f"Invalid field {field!r}.")
+
+    # The balance and the date of the last transaction are fetched in the
+    # same query, instead of lazy loading them for every employee. The date
+    # is stored on the balance, so the transaction table is not read.
+    columns = {
+        "name": Employee.name,
+        "email": Employee.email,
+        "role": Employee.role,
+        "department": Employee.department,
+        "balance": Balance.value,
+        "currency": Employee.currency,
+        "last_transaction": Balance.last_transaction_at,
+    }
+
+    # Only the requested columns are selected, plus the ones the total is
+    # computed from.
+    selected = [field for field in fields if field != "total"]
+    if "total" in fields:
+        selected += [
+            field for field in ("balance", "currency") if field not in selected
+        ]
+
+    sql = page(
+        select(*[columns[field].label(field) for field in selected])
+        .select_from(Employee)
+        .join(Balance)
+    ).execution_options(yield_per=READ_CHUNK_SIZE)
+
+    with get_session() as session:
+        exchange_rates = {}
+        if "total" in fields:
+            # Only the currencies of the selected employees are needed.
+            currencies = page(select(Employee.currency)).subquery()
+            exchange_rates = get_exchange_rates(
+                list(session.exec(select(currencies.c.currency).distinct())),
+                refresh=bool(query.get("refresh_rates")),
             )
 
-    return return_data
+        for row in session.exec(sql):
+            # A query of a single column yields its values, not rows.
+            data = row._asdict() if len(selected) > 1 else {selected[0]: row}
+            if "total" in fields:
+                data["total"] = (
+                    exchange_rates[data["currency"]].value * data["balance"]
+                )
+            if "last_transaction" in fields:
+                date = data["last_transaction"]
+                data["last_transaction"] = (
+                    date.strftime(DATE_FORMAT) if date else ""
+                )
+            yield {field: data[field] for field in fields}
+
+
+def read(**query: Query) -> ResultDict:
+    """
+    Read and filter employee data from the database based on the provided\
+    query parameters.
+
+    Keyword Args:
+        email (str, optional): Filter by employee email.
+        department (str, optional): Filter by employee department.
+        order_by (str, optional): Sort by "id" or by "email". Defaults to
+          "id".
+        after (str | int, optional): The id or the email of the last employee
+          of the previous page.
+        limit (int, optional): The maximum number of employees.
+        fields (list[str], optional): The fields of READ_FIELDS to return, in
+          that order. Defaults to all of them.
+        refresh_rates (bool, optional): Fetch the exchange rates even if they
+          are cached.
+
+    Returns:
+        list[dict[str, Any]]: A list of dictionaries containing employee data,
+            including name, email, role, department, balance, and last
+            transaction date.
+
+    Raises:
+        ValueError: If `order_by` is not a valid sort key or a field is not
+          valid.
+    """
+    return list(iter_read(**query))
 
 
 @require_authentication
@@ -193,10 +496,10 @@ def update(value: Decimal, from_employee: Employee, **query: Query) -> str:
 
     This function retrieves employees matching the provided query parameters,
     updates their balance by the specified value, and logs the transaction. If
-    no employees are found, or if an employee is not present in the database,
-    appropriate messages are returned. Additionally, it ensures that the
-    initiating employee has sufficient funds or superuser privileges to
-    perform the operation.
+    no employees are found, an appropriate message is returned. Additionally,
+    it ensures that the initiating employee has sufficient funds or superuser
+    privileges to perform the operation. The whole award is written with a
+    few set-based statements in a single transaction.
 
     Args:
         value (Decimal): The amount to update the balance by.
@@ -205,63 +508,336 @@ def update(value: Decimal, from_employee: Employee, **query: Query) -> str:
 
     Returns:
         str: A message indicating the result of the operation. If no employees
-        are found, or if an employee is missing in the database, a descriptive
-        message is returned. Otherwise, an empty string is returned.
+        are found, or if the funds are insufficient, a descriptive message is
+        returned. Otherwise, an empty string is returned.
     """
     result = ""
 
-    employees = read(**query)
+    with get_session() as session:
+        # Only the target ids and emails are needed, unlike `read` this
+        # does not look up exchange rates.
+        employees = session.exec(
+            select(Employee.id, Employee.email)
+            .where(*query_filters(**query))
+            .order_by(Employee.id)  # type: ignore
+        ).all()
+
+        if not employees:
+            result = "No employees found"
+            return result
+
+        total = len(employees) * value
+
+        # The balances are locked before checking the funds, so concurrent
+        # transfers cannot spend the same points twice.
+        balances = lock_balances(
+            session,
+            [employee_id for employee_id, _ in employees] + [from_employee.id],
+        )
+        balance = balances.get(from_employee.id, Decimal(0))
+
+        if balance < total and not from_employee.superuser:
+            result = f"Insufficient funds to transfer {total}"
+            return result
+
+        # The award is written with set-based statements and committed at
+        # once, so a failure leaves no partial award behind.
+        recipients = [
+            employee_id
+            for employee_id, email in employees
+            if email != from_employee.email
+        ]
+        transactions = [(employee_id, value) for employee_id in recipients]
+        if not from_employee.superuser:
+            transactions += [(from_employee.id, -value)] * len(recipients)
+
+        add_transactions(
+            session, transactions, "Updated points", from_employee.email
+        )
 
-    if not employees:
-        result = "No employees found"
-        return result
+        session.commit()
 
-    total = len(employees) * value
+    return result
 
-    if from_employee.balance.value < total and not from_employee.superuser:
-        result = f"Insufficient funds to transfer {total}"
-        return result
+
+def reconcile(fix: bool = False) -> ResultDict:
+    """
+    Check the stored balance of every employee against the summed ledger.
+
+    Balances are maintained incrementally by `add_transaction`, so this
+    function provides the explicit full recompute: it adds the transactions
+    newer than the latest balance snapshot of each employee to the snapshot,
+    in a single grouped query, and reports the employees whose stored
+    balance differs from the ledger.
+
+    Args:
+        fix (bool): If True, rewrite the mismatched balances with the value
+          summed from the ledger. Defaults to False.
+
+    Returns:
+        list[dict[str, Any]]: A list of dictionaries, one per mismatched
+          employee, containing the email, the stored balance, the ledger
+          balance and whether it was fixed.
+    """
+    return_data = []
+
+    snapshots = latest_snapshots()
+    ledger = (
+        select(
+            Transaction.employee_id,
+            func.sum(Transaction.value).label("value"),
+        )
+        .join(
+            snapshots,
+            snapshots.c.employee_id == Transaction.employee_id,
+            isouter=True,
+        )
+        .where(
+            or_(
+                snapshots.c.taken_at.is_(None),
+                Transaction.date >= snapshots.c.taken_at,
+            )
+        )
+        .group_by(Transaction.employee_id)  # type: ignore
+        .subquery()
+    )
+
+    sql = (
+        select(
+            Employee.id,
+            Employee.email,
+            Balance.value,
+            snapshots.c.value,
+            ledger.c.value,
+        )
+        .join(Balance, isouter=True)
+        .join(snapshots, snapshots.c.employee_id == Employee.id, isouter=True)
+        .join(ledger, ledger.c.employee_id == Employee.id, isouter=True)
+        .order_by(Employee.id)  # type: ignore
+    )
 
     with get_session() as session:
-        for employee in employees:
-            if employee["email"] == from_employee.email:
+        for employee_id, email, balance, snapshot, newer in session.exec(sql):
+            balance = Decimal(balance or 0).quantize(BALANCE_PRECISION)
+            ledger_value = (
+                Decimal(snapshot or 0) + Decimal(newer or 0)
+            ).quantize(BALANCE_PRECISION)
+            if balance == ledger_value:
                 continue
 
-            email = employee["email"]
-            instance = session.exec(
-                select(Employee).where(Employee.email == email)
-            ).first()
-            if instance:
-                add_transaction(
-                    session,
-                    instance,
-                    value,
-                    "Updated points",
-                    from_employee.email,
-                )
-            else:
-                result = f"Employee {email!r} not found in the database"
-                return result
-
-            if not from_employee.superuser:
-                instance = session.exec(
-                    select(Employee).where(
-                        Employee.email == from_employee.email
-                    )
-                ).first()
-                if instance:
-                    add_transaction(
-                        session,
-                        instance,
-                        -value,
-                        "Updated points",
-                        from_employee.email,
+            if fix:
+                employee = session.get(Employee, employee_id)
+                if employee:
+                    recompute_balance(session, employee)
+
+            return_data.append(
+                {
+                    "email": email,
+                    "balance": balance,
+                    "ledger": ledger_value,
+                    "fixed": fix,
+                }
+            )
+
+        session.commit()
+
+    return return_data
+
+
+def compact_ledger(
+    before: datetime, archive: Optional[str] = None
+) -> dict[str, Any]:
+    """
+    Fold the transactions dated before a date into balance snapshots.
+
+    Recomputing a balance then reads only the latest snapshot of the employee
+    and the transactions dated from it on. The snapshots are taken and the
+    folded transactions deleted in a single transaction. The archive file is
+    removed if the compaction fails or no transaction is compacted.
+
+    Args:
+        before (datetime): The date the transactions are folded before.
+        archive (Optional[str]): The path of a gzip compressed CSV file to
+          write the deleted transactions to. It must not exist. Defaults to
+          None (not archived).
+
+    Returns:
+        dict[str, Any]: The number of employees snapshotted, the number of
+          transactions compacted, the date of the snapshots and the path of
+          the archive, or None if no archive was written.
+
+    Raises:
+        ValueError: If `before` is in the future or not later than the last
+          compaction.
+        FileExistsError: If the archive file already exists.
+    """
+    with get_session() as session:
+        # Check the date before the archive file is created
+        check_compaction_date(session, before)
+
+        if not archive:
+            employees, transactions = compact_transactions(session, before)
+            session.commit()
+        else:
+            with gzip.open(archive, "xt", newline="") as archive_file:
+                try:
+                    employees, transactions = compact_transactions(
+                        session, before, archive_file=archive_file
                     )
-                else:
-                    result = f"Employee {from_employee.email!r}\
-                          not found in the database"
-                    return result
+                    # Write the whole archive before the rows are deleted
+                    archive_file.close()
+                    session.commit()
+                except BaseException:
+                    archive_file.close()
+                    os.remove(archive)
+                    raise
+
+            if not transactions:
+                os.remove(archive)
+                archive = None
+
+    return {
+        "employees": employees,
+        "transactions": transactions,
+        "before": before.strftime(DATE_FORMAT),
+        "archive": archive,
+    }
+
+
+def flush_outbox(batch_size: int = OUTBOX_BATCH_SIZE) -> dict[str, int]:
+    """
+    Send the emails queued in the outbox in batches.
+
+    The outbox is drained in batches of `batch_size` emails, committing after
+    each batch. All the emails are sent on one SMTP connection, which is
+    reopened if it fails. Sent emails are deleted from the outbox. Emails
+    that fail are kept with their attempts counter increased and are retried
+    on the next flush, until OUTBOX_MAX_ATTEMPTS is reached: they are then
+    deleted, as their body may hold a password, and their recipient is
+    logged. If the SMTP server cannot be reached, the flush stops and the
+    unsent emails are kept without counting an attempt.
+
+    Args:
+        batch_size (int): The number of emails sent per batch. Defaults to
+          OUTBOX_BATCH_SIZE.
+
+    Returns:
+        dict[str, int]: The number of emails sent, failed, dropped after
+          OUTBOX_MAX_ATTEMPTS and left unsent because the SMTP server could
+          not be reached.
+    """
+    log = get_logger()
 
+    result = {"sent": 0, "failed": 0, "dropped": 0, "unsent": 0}
+
+    last_id = 0
+
+    with get_session() as session, SMTPSender() as smtp_sender:
+        # Emails exhausted by a previous version, which kept them
+        dropped = purge_outbox(session)
         session.commit()
 
+        while True:
+            emails = session.exec(
+                select(Outbox)
+                .where(
+                    Outbox.id > last_id,  # type: ignore
+                    Outbox.attempts < OUTBOX_MAX_ATTEMPTS,
+                )
+                .order_by(Outbox.id)  # type: ignore
+                .limit(batch_size)
+            ).all()
+
+            if not emails:
+                break
+
+            last_id = emails[-1].id  # type: ignore
+
+            for email in emails:
+                if smtp_sender.send(
+                    email.sender, email.recipient, email.subject, email.body
+                ):
+                    session.delete(email)
+                    result["sent"] += 1
+                elif smtp_sender.connection_failed:
+                    break
+                else:
+                    email.attempts += 1
+                    session.add(email)
+                    result["failed"] += 1
+
+            dropped += purge_outbox(session)
+            session.commit()
+
+            if smtp_sender.connection_failed:
+                result["unsent"] = session.exec(
+                    select(func.count())
+                    .select_from(Outbox)
+                    .where(Outbox.attempts < OUTBOX_MAX_ATTEMPTS)
+                ).one()
+                log.error(
+                    "SMTP server unreachable, %d emails left in the outbox",
+                    result["unsent"],
+                )
+                break
+
+    for recipient in dropped:
+        log.error(
+            "Dropped the email to %s after %d failed attempts",
+            recipient,
+            OUTBOX_MAX_ATTEMPTS,
+        )
+    result["dropped"] = len(dropped)
+
     return result
+
+
+def login() -> dict[str, Any]:
+    """
+    Log in with the password and save a session token for the next commands.
+
+    The password of the EMPLOYEE_EMAIL and EMPLOYEE_PASSWORD environment
+    variables is verified once, and the commands requiring authentication
+    then verify the token instead until it expires. The previous token, if
+    any, is revoked.
+
+    Returns:
+        dict[str, Any]: The email of the employee and the expiration date of
+          the token.
+
+    Raises:
+        AuthenticationError: If the credentials are not valid.
+    """
+    previous_token = read_token()
+
+    with get_session() as session:
+        employee = authenticate_password(session)
+        token, expires_at = issue_token(session, employee)
+        if previous_token:
+            revoke_token(session, previous_token)
+        session.commit()
+        email = employee.email
+
+    save_token(token)
+
+    return {"email": email, "expires_at": expires_at}
+
+
+def logout() -> bool:
+    """
+    Revoke and delete the session token saved by `login`.
+
+    Returns:
+        bool: True if a valid token was revoked, False otherwise.
+    """
+    token = read_token()
+    if not token:
+        return False
+
+    with get_session() as session:
+        revoked = revoke_token(session, token)
+        session.commit()
+
+    delete_token()
+
+    return revoked
@@ -1,14 +1,206 @@
 """Database module of dundie."""
 
 import os
+from typing import Any, Dict, Optional
 
-from sqlmodel import Session, create_engine
+from sqlalchemy import (
+    Column,
+    Engine,
+    MetaData,
+    String,
+    Table,
+    event,
+    inspect,
+    make_url,
+)
+from sqlmodel import Session, create_engine, select
 
 from dundie import models
-from dundie.settings import DATABASE_DIR, SQL_CONNECTION_STRING
+from dundie.settings import (
+    DATABASE_DIR,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_SIZE,
+    DATABASE_REVISION,
+    SQL_CONNECTION_STRING,
+    SQLITE_PRAGMAS,
+)
 
 engine = None
 
+# Table where Alembic records the revision of the database
+alembic_version = Table(
+    "alembic_version",
+    MetaData(),
+    Column("version_num", String(32), primary_key=True),
+)
+
+
+# Revision of the databases created by `get_session` before the migrations
+# were checked, which have the tables but were never stamped
+UNVERSIONED_REVISION = "29e650e071c8"
+
+
+class DatabaseSchemaError(Exception):
+    """Custom exception for a database not at DATABASE_REVISION."""
+
+    pass
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Get the connection pool options of the engine for a database URL.
+
+    SQLite keeps the default pool of its driver, while server databases such
+    as PostgreSQL get a pool sized for many concurrent writers.
+
+    Args:
+        url (str): The SQL connection string.
+
+    Returns:
+        Dict[str, Any]: The keyword arguments for `create_engine`.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": DATABASE_POOL_SIZE,
+        "max_overflow": DATABASE_MAX_OVERFLOW,
+        "pool_recycle": DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": DATABASE_POOL_PRE_PING,
+    }
+
+
+def create_db_engine(
+    url: str = SQL_CONNECTION_STRING,
+    pragmas: Optional[Dict[str, Any]] = None,
+) -> Engine:
+    """
+    Create the database engine.
+
+    The connection pool is configured by `engine_options`. For SQLite
+    databases, the pragmas are set on every new connection through the engine
+    `connect` event.
+
+    Args:
+        url (str): The SQL connection string. Defaults to
+          SQL_CONNECTION_STRING.
+        pragmas (Optional[Dict[str, Any]]): The SQLite pragmas. Defaults to
+          SQLITE_PRAGMAS.
+
+    Returns:
+        Engine: The database engine.
+    """
+    new_engine = create_engine(url, echo=False, **engine_options(url))
+
+    if new_engine.dialect.name == "sqlite":
+        pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+        @event.listens_for(new_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection: Any, _: Any) -> None:
+            """Set the SQLite pragmas on a new connection."""
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return new_engine
+
+
+def get_database_revision(bind: Engine) -> Optional[str]:
+    """
+    Get the Alembic revision of the database.
+
+    Args:
+        bind (Engine): The database engine.
+
+    Returns:
+        Optional[str]: The revision, or None if the database has not been
+          initialized.
+    """
+    with bind.connect() as connection:
+        if not inspect(connection).has_table(alembic_version.name):
+            return None
+        return connection.execute(
+            select(alembic_version.c.version_num)
+        ).scalar()
+
+
+def has_application_tables(bind: Engine) -> bool:
+    """
+    Check whether the database has any table of the models.
+
+    Args:
+        bind (Engine): The database engine.
+
+    Returns:
+        bool: True if a table of the models exists, False otherwise.
+    """
+    with bind.connect() as connection:
+        tables = set(inspect(connection).get_table_names())
+    return not tables.isdisjoint(models.SQLModel.metadata.tables)
+
+
+def check_database_revision(bind: Engine) -> None:
+    """
+    Check that the database is at the revision expected by the models.
+
+    Args:
+        bind (Engine): The database engine.
+
+    Raises:
+        DatabaseSchemaError: If the database revision is not
+          DATABASE_REVISION.
+    """
+    revision = get_database_revision(bind)
+    if revision is None and has_application_tables(bind):
+        raise DatabaseSchemaError(
+            "The database has tables but no migration revision, run "
+            f"'alembic stamp {UNVERSIONED_REVISION} && alembic upgrade head'."
+        )
+    if revision is None:
+        raise DatabaseSchemaError(
+            "The database is not initialized, run 'dundie db init'."
+        )
+    if revision != DATABASE_REVISION:
+        raise DatabaseSchemaError(
+            f"The database is at revision {revision!r} instead of "
+            f"{DATABASE_REVISION!r}, run 'alembic upgrade head'."
+        )
+
+
+def init_db() -> bool:
+    """
+    Create the tables of a new database and stamp it with DATABASE_REVISION.
+
+    Returns:
+        bool: True if the database was initialized, False if it already was.
+
+    Raises:
+        DatabaseSchemaError: If the database is at another revision, or has
+          tables but no revision.
+    """
+    global engine
+
+    if not engine:
+        os.makedirs(DATABASE_DIR, exist_ok=True)
+        engine = create_db_engine()
+
+    revision = get_database_revision(engine)
+    if revision == DATABASE_REVISION:
+        return False
+    if revision is not None or has_application_tables(engine):
+        check_database_revision(engine)
+
+    with engine.begin() as connection:
+        models.SQLModel.metadata.create_all(bind=connection)
+        alembic_version.create(connection)
+        connection.execute(
+            alembic_version.insert().values(version_num=DATABASE_REVISION)
+        )
+
+    return True
+
 
 def get_session() -> Session:
     """
@@ -16,19 +208,21 @@ def get_session() -> Session:
 
     This function creates and returns a new SQLModel session with the
     specified engine binding. If the engine is not already created, it
-    initializes the engine using the SQL_CONNECTION_STRING and creates
-    all tables defined in the models.
+    initializes the engine using the SQL_CONNECTION_STRING and checks, once
+    per process, that the database is at DATABASE_REVISION.
 
     Returns:
         Session: A new SQLModel session object.
+
+    Raises:
+        DatabaseSchemaError: If the database is not at DATABASE_REVISION.
     """
     global engine
 
-    if not os.path.exists(DATABASE_DIR):
-        os.makedirs(DATABASE_DIR)
-
     if not engine:
-        engine = create_engine(SQL_CONNECTION_STRING, echo=False)
-        models.SQLModel.metadata.create_all(bind=engine)
+        os.makedirs(DATABASE_DIR, exist_ok=True)
+        new_engine = create_db_engine()
+        check_database_revision(new_engine)
+        engine = new_engine
 
     return Session(bind=engine, autocommit=False, autoflush=False)
@@ -1,8 +1,8 @@
 """Database models for the Dundie app.
 
 This module defines the database models for the Dundie app using SQLModel.
-It includes models for Employee, Balance, Transaction, and User, along with
-a helper class for validation.
+It includes models for Employee, Balance, Transaction, User, Outbox, Token
+and BalanceSnapshot, along with a helper class for validation.
 
 Classes:
     SQLModelValidation: Helper class to allow for validation in SQLModel
@@ -11,6 +11,9 @@ Classes:
     Balance: Model representing an employee's balance.
     Transaction: Model representing a financial transaction.
     User: Model representing a user in the system.
+    Outbox: Model representing an email waiting to be sent.
+    Token: Model representing a session token issued by `dundie login`.
+    BalanceSnapshot: Model representing a checkpoint of an employee's ledger.
 
 Usage:
     Run this script standalone to test the models and their relationships.
@@ -20,6 +23,7 @@ from datetime import datetime
 from decimal import Decimal
 
 from pydantic import EmailStr
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 from sqlmodel._compat import SQLModelConfig
 from typing_extensions import Annotated, Optional
@@ -115,6 +119,11 @@ class Balance(SQLModelValidation, table=True):
           the primary key and indexed.
         value (Decimal): The balance value for the employee. It is a required
           field with up to 3 decimal places.
+        last_transaction_at (Optional[datetime]): The date of the latest
+          transaction of the employee, maintained on write so reports do not
+          read the transaction history.
+        transaction_count (int): The number of transactions of the employee,
+          maintained on write.
         employee_id (int): The foreign key linking to the employee's ID. It
           must be unique.
         employee (Employee): The relationship to the Employee model, with
@@ -123,6 +132,14 @@ class Balance(SQLModelValidation, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     value: Annotated[Decimal, Field(nullable=False, decimal_places=3)]
+    last_transaction_at: Optional[datetime] = Field(default=None)
+    transaction_count: int = Field(
+        default=0,
+        nullable=False,
+        sa_column_kwargs={
+            "server_default": "0",
+        },
+    )
 
     employee_id: int = Field(foreign_key="employee.id", unique=True)
     employee: Employee = Relationship(back_populates="balance")
@@ -146,6 +163,12 @@ class Transaction(SQLModelValidation, table=True):
           by the transaction.
     """
 
+    # Serves the per-employee ledger lookups, such as the balance recompute
+    # and the date of the last transaction, without scanning the table.
+    __table_args__ = (
+        Index("ix_transaction_employee_id_date", "employee_id", "date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     value: Annotated[
         Decimal, Field(nullable=False)
@@ -182,6 +205,102 @@ class User(SQLModelValidation, table=True):
     employee: Employee = Relationship(back_populates="user")
 
 
+class Outbox(SQLModelValidation, table=True):
+    """
+    Outbox model representing an email waiting to be sent.
+
+    Emails are written to the outbox in the same transaction as the changes
+    that trigger them, so no email is sent for rolled-back changes, and are
+    sent later in batches by `dundie mail flush`.
+
+    Attributes:
+        id (Optional[int]): The unique identifier for the email. It is the
+          primary key and indexed.
+        sender (str): The email address of the sender.
+        recipient (str): The email address of the recipient.
+        subject (str): The subject of the email.
+        body (str): The body content of the email.
+        attempts (int): The number of failed attempts to send the email.
+        created_at (datetime): The date and time when the email was queued.
+          Defaults to the current date and time.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True, index=True)
+    sender: str = Field(nullable=False)
+    recipient: str = Field(nullable=False)
+    subject: str = Field(nullable=False)
+    body: str = Field(nullable=False)
+    attempts: int = Field(default=0, nullable=False)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
+class Token(SQLModelValidation, table=True):
+    """
+    Token model representing a session token issued by `dundie login`.
+
+    The token itself is kept by the client. The database keeps its id, so a
+    token can be revoked before it expires.
+
+    Attributes:
+        id (str): The unique identifier of the token. It is the primary key.
+        employee_id (int): Foreign key referencing the employee the token was
+          issued to.
+        created_at (datetime): The date and time when the token was issued.
+          Defaults to the current date and time.
+        expires_at (datetime): The date and time when the token expires.
+        revoked (bool): Whether the token was revoked by `dundie logout`.
+    """
+
+    id: str = Field(primary_key=True)
+    employee_id: int = Field(foreign_key="employee.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    expires_at: datetime = Field(nullable=False)
+    revoked: bool = Field(default=False, nullable=False)
+
+
+class BalanceSnapshot(SQLModelValidation, table=True):
+    """
+    BalanceSnapshot model representing a checkpoint of an employee's ledger.
+
+    `dundie ledger compact` folds the transactions older than a date into a
+    snapshot and deletes them. The ledger of an employee is then its latest
+    snapshot plus the transactions dated from `taken_at` on.
+
+    Attributes:
+        id (Optional[int]): Unique identifier for the snapshot, primary key.
+        employee_id (int): Foreign key referencing the employee of the
+          snapshot.
+        value (Decimal): The sum of the transactions dated before
+          `taken_at`.
+        transaction_count (int): The number of transactions dated before
+          `taken_at`.
+        last_transaction_at (Optional[datetime]): The date of the latest
+          transaction dated before `taken_at`.
+        taken_at (datetime): The date the snapshot was taken at. Only the
+          transactions dated before it are included.
+        created_at (datetime): The date and time when the snapshot was
+          created. Defaults to the current date and time.
+    """
+
+    __tablename__ = "balance_snapshot"
+    # Serves the lookup of the latest snapshot of an employee.
+    __table_args__ = (
+        Index(
+            "ix_balance_snapshot_employee_id_taken_at",
+            "employee_id",
+            "taken_at",
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    employee_id: int = Field(foreign_key="employee.id", nullable=False)
+    value: Annotated[Decimal, Field(nullable=False, decimal_places=3)]
+    transaction_count: int = Field(default=0, nullable=False)
+    last_transaction_at: Optional[datetime] = Field(default=None)
+    taken_at: datetime = Field(nullable=False)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+
 if __name__ == "__main__":
     """Run this script to test it standalone."""
 
@@ -8,17 +8,75 @@ Attributes:
   SMTP_TIMEOUT (int): The timeout duration for SMTP connections in seconds.
   SMTP_USERNAME (str): The username for SMTP authentication.
   SMTP_PASSWORD (str): The password for SMTP authentication.
+  SMTP_MAX_RETRIES (int): The number of retries of an email after an SMTP
+    connection failure.
+  SMTP_RETRY_BACKOFF (float): The delay before the first retry in seconds,
+    doubled on each retry.
+  OUTBOX_BATCH_SIZE (int): The number of emails sent per batch when flushing
+    the outbox.
+  OUTBOX_MAX_ATTEMPTS (int): The number of failed attempts after which an
+    email is dropped from the outbox.
   CURRENT_PATH (str): The current directory path of the application.
   DATABASE_PATH (str): The file path to the database file.
-  SQL_CONNECTION_STRING (str): The SQL connection string for the database.
+  SQL_CONNECTION_STRING (str): The SQL connection string for the database,
+    read from DUNDIE_DATABASE_URL. Defaults to the SQLite DATABASE_PATH.
+  DATABASE_POOL_SIZE (int): The number of connections kept open by the pool
+    of server databases, read from DUNDIE_DATABASE_POOL_SIZE.
+  DATABASE_MAX_OVERFLOW (int): The number of connections opened beyond the
+    pool size under load, read from DUNDIE_DATABASE_MAX_OVERFLOW.
+  DATABASE_POOL_RECYCLE (int): The number of seconds after which a
+    connection is replaced, read from DUNDIE_DATABASE_POOL_RECYCLE. -1
+    never replaces connections.
+  DATABASE_POOL_PRE_PING (bool): Whether connections are tested before
+    being used, read from DUNDIE_DATABASE_POOL_PRE_PING.
+  DATABASE_REVISION (str): The Alembic revision the models match. It must be
+    updated with every new migration.
+  SQLITE_PRAGMAS (Dict[str, Any]): The pragmas set on every new SQLite
+    connection. WAL lets readers run alongside a writer, and busy_timeout
+    makes concurrent writers wait for the lock instead of failing with
+    "database is locked".
   EMAIL_FROM (str): The default email address for outgoing emails.
+  TOKEN_PATH (str): The file path where `dundie login` keeps the session
+    token.
+  TOKEN_TTL (int): The number of seconds a session token is valid.
+  SECRET_KEY_PATH (str): The file path to the key signing the session tokens,
+    generated on first use. The DUNDIE_SECRET_KEY environment variable takes
+    precedence.
   DEFAULT_ACTOR (str): The default actor for system actions.
   DEFAULT_MANAGER_POINTS (Decimal): The default points assigned to managers.
   DEFAULT_ASSOCIATE_POINTS (Decimal): The default points assigned to
     associates.
+  BALANCE_PRECISION (Decimal): The precision used to compare balances.
+  LOAD_CHUNK_SIZE (int): The number of rows written per chunk by the load.
+  READ_CHUNK_SIZE (int): The number of rows fetched per round trip when
+    streaming employee data.
+  READ_FIELDS (List[str]): The fields of the employee data, in the order
+    they are shown by default.
+  PASSWORD_HASH_WORKERS (int): The number of processes hashing passwords in
+    bulk mode. 0 uses all the CPU cores and 1 hashes serially.
+  ARGON2_PROFILES (Dict[str, Dict[str, int]]): The Argon2 parameters of each
+    password hashing profile. "default" is the RFC 9106 low-memory profile,
+    "batch" is the OWASP minimum, cheaper to onboard employees in bulk on
+    trusted hosts.
+  ARGON2_PROFILE (str): The profile used to hash passwords, read from
+    DUNDIE_ARGON2_PROFILE.
+  ARGON2_TIME_COST (int): The number of Argon2 iterations, read from
+    DUNDIE_ARGON2_TIME_COST. Defaults to the value of ARGON2_PROFILE.
+  ARGON2_MEMORY_COST (int): The Argon2 memory usage in kibibytes, read from
+    DUNDIE_ARGON2_MEMORY_COST. Defaults to the value of ARGON2_PROFILE.
+  ARGON2_PARALLELISM (int): The number of Argon2 lanes, read from
+    DUNDIE_ARGON2_PARALLELISM. Defaults to the value of ARGON2_PROFILE.
   PROJECT_NAME (str): The name of the project.
   DATE_FORMAT (str): The date format used in the application.
   LOGFILE (str): The name of the log file.
+  API_BASE_URL (str): The URL of the exchange rate API.
+  API_TIMEOUT (float): The timeout of the exchange rate API requests in
+    seconds.
+  API_MAX_CONNECTIONS (int): The number of concurrent connections to the
+    exchange rate API.
+  EXCHANGE_RATES_CACHE_PATH (str): The file path to the exchange rate cache.
+  EXCHANGE_RATES_TTL (int): The number of seconds a cached exchange rate is
+    used before being fetched again.
 """
 
 import os
@@ -53,20 +111,93 @@ SMTP_PORT: int = 8025
 SMTP_TIMEOUT: int = 5
 SMTP_USERNAME: str = "username"
 SMTP_PASSWORD: str = "password"
+SMTP_MAX_RETRIES: int = 3
+SMTP_RETRY_BACKOFF: float = 0.5
+
+OUTBOX_BATCH_SIZE: int = 100
+OUTBOX_MAX_ATTEMPTS: int = 5
 
 CURRENT_PATH: str = os.curdir
 
 DATABASE_DIR: str = os.path.join(CURRENT_PATH, "assets")
 DATABASE_PATH: str = os.path.join(DATABASE_DIR, "database.db")
-SQL_CONNECTION_STRING: str = f"sqlite:///{DATABASE_PATH}"
+SQL_CONNECTION_STRING: str = os.getenv(
+    "DUNDIE_DATABASE_URL", f"sqlite:///{DATABASE_PATH}"
+)
+DATABASE_POOL_SIZE: int = int(os.getenv("DUNDIE_DATABASE_POOL_SIZE", "5"))
+DATABASE_MAX_OVERFLOW: int = int(
+    os.getenv("DUNDIE_DATABASE_MAX_OVERFLOW", "10")
+)
+DATABASE_POOL_RECYCLE: int = int(
+    os.getenv("DUNDIE_DATABASE_POOL_RECYCLE", "1800")
+)
+DATABASE_POOL_PRE_PING: bool = os.getenv(
+    "DUNDIE_DATABASE_POOL_PRE_PING", "true"
+).lower() in ("1", "true", "yes")
+DATABASE_REVISION: str = "c4e8a2f61d37"
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 10_000,  # milliseconds
+    "mmap_size": 256 * 1024 * 1024,  # bytes
+    "cache_size": -64 * 1024,  # negative values are KiB
+    "temp_store": "MEMORY",
+}
 
 EMAIL_FROM: str = "system@dundie.com"
 
+TOKEN_PATH: str = os.path.join(DATABASE_DIR, ".token")
+TOKEN_TTL: int = 60 * 60
+SECRET_KEY_PATH: str = os.path.join(DATABASE_DIR, ".secret_key")
+
 DEFAULT_ACTOR: str = "system"
 
 DEFAULT_MANAGER_POINTS: Decimal = Decimal(100)
 DEFAULT_ASSOCIATE_POINTS: Decimal = Decimal(500)
 
+BALANCE_PRECISION: Decimal = Decimal("0.001")
+
+LOAD_CHUNK_SIZE: int = 500
+READ_CHUNK_SIZE: int = 1000
+READ_FIELDS: List[str] = [
+    "name",
+    "email",
+    "role",
+    "department",
+    "balance",
+    "currency",
+    "total",
+    "last_transaction",
+]
+PASSWORD_HASH_WORKERS: int = 0
+ARGON2_PROFILES: Dict[str, Dict[str, int]] = {
+    "default": {"time_cost": 3, "memory_cost": 64 * 1024, "parallelism": 4},
+    "batch": {"time_cost": 2, "memory_cost": 19 * 1024, "parallelism": 1},
+}
+ARGON2_PROFILE: str = os.getenv("DUNDIE_ARGON2_PROFILE", "default")
+if ARGON2_PROFILE not in ARGON2_PROFILES:
+    raise ValueError(
+        f"Invalid DUNDIE_ARGON2_PROFILE {ARGON2_PROFILE!r}, "
+        f"use one of: {', '.join(ARGON2_PROFILES)}."
+    )
+ARGON2_TIME_COST: int = int(
+    os.getenv(
+        "DUNDIE_ARGON2_TIME_COST", ARGON2_PROFILES[ARGON2_PROFILE]["time_cost"]
+    )
+)
+ARGON2_MEMORY_COST: int = int(
+    os.getenv(
+        "DUNDIE_ARGON2_MEMORY_COST",
+        ARGON2_PROFILES[ARGON2_PROFILE]["memory_cost"],
+    )
+)
+ARGON2_PARALLELISM: int = int(
+    os.getenv(
+        "DUNDIE_ARGON2_PARALLELISM",
+        ARGON2_PROFILES[ARGON2_PROFILE]["parallelism"],
+    )
+)
+
 PROJECT_NAME: str = "dundie"
 
 DATE_FORMAT: str = "%Y-%m-%d %H:%M:%S"
@@ -82,3 +213,9 @@ LOG_BACKUP_COUNT: int = 3
 API_BASE_URL: str = (
     "https://economia.awesomeapi.com.br/json/last/USD-{currency}"
 )
+API_TIMEOUT: float = 5.0
+API_MAX_CONNECTIONS: int = 8
+EXCHANGE_RATES_CACHE_PATH: str = os.path.join(
+    DATABASE_DIR, "exchange_rates.json"
+)
+EXCHANGE_RATES_TTL: int = 60 * 60
@@ -1,15 +1,20 @@
 """Security module for dundie."""
 
+import hashlib
+import hmac
 import os
-from functools import wraps
-from typing import Any, Callable
+import secrets
+from datetime import datetime, timedelta
+from functools import partial, wraps
+from typing import Any, Callable, Optional
 
-from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import Session, select
 
 from dundie.database import get_session
-from dundie.models import Employee
-from dundie.utils.user import verify_password
+from dundie.models import Balance, Employee, Token, User
+from dundie.settings import SECRET_KEY_PATH, TOKEN_PATH, TOKEN_TTL
+from dundie.utils.user import verify_and_update_password
 
 
 class AuthenticationError(Exception):
@@ -18,58 +23,340 @@ class AuthenticationError(Exception):
     pass
 
 
-def require_authentication(func: Callable) -> Callable:
-    """Implement decorator to enforce authentication for a function.
+def get_employee(
+    session: Session, *where: Any, history: bool = False
+) -> Optional[Employee]:
+    """
+    Get the employee matching the given SQL filters, for authentication.
 
-    This decorator ensures that the function it wraps can only be executed
-    if valid authentication credentials are provided via environment variables.
-    It retrieves the employee's email and password from the environment,
-    verifies the credentials against the database, and injects the authenticated
-    employee object into the wrapped function as a keyword argument.
+    By default, only the employee, its password and its balance value are
+    loaded, in a single query, so the cost does not depend on the length of
+    the employee's transaction history.
 
     Args:
-        func (Callable): The function to be wrapped by the decorator.
+        session (Session): The database session to use.
+        *where (Any): The SQL expressions the employee must match.
+        history (bool): Whether to also load the employee's transactions.
+          Defaults to False.
 
     Returns:
-        Callable: The wrapped function with authentication enforced.
+        Optional[Employee]: The employee, or None if not found.
+    """
+    options = [
+        joinedload(Employee.balance).load_only(Balance.value),  # type: ignore
+        joinedload(Employee.user).load_only(User.password),  # type: ignore
+    ]
+    if history:
+        options.append(selectinload(Employee.transaction))  # type: ignore
+
+    return session.exec(
+        select(Employee).options(*options).where(*where)
+    ).first()
+
+
+def authenticate_password(session: Session, history: bool = False) -> Employee:
+    """
+    Authenticate the employee with the credentials of the environment.
+
+    The email and password are read from the EMPLOYEE_EMAIL and
+    EMPLOYEE_PASSWORD environment variables and the password is verified with
+    Argon2. If its hash is weaker than the Argon2 settings, it is replaced by
+    a new hash. Committing the session is left to the caller.
+
+    Args:
+        session (Session): The database session to use.
+        history (bool): Whether to also load the employee's transactions.
+          Defaults to False.
+
+    Returns:
+        Employee: The authenticated employee.
 
     Raises:
         AuthenticationError: If the required environment variables are not set,
             if the employee is not found in the database, or if the password is
             invalid.
     """
+    email = os.getenv("EMPLOYEE_EMAIL")
+    password = os.getenv("EMPLOYEE_PASSWORD")
+
+    if not all([email, password]):
+        raise AuthenticationError(
+            "Variables EMPLOYEE_EMAIL and EMPLOYEE_PASSWORD are undefined."
+        )
+
+    employee = get_employee(session, Employee.email == email, history=history)
+
+    if not employee:
+        raise AuthenticationError(f"Employee with email {email!r} not found.")
+
+    valid, updated_hash = verify_and_update_password(
+        str(password), employee.user.password
+    )
+    if not valid:
+        raise AuthenticationError("Invalid password.")
+
+    if updated_hash:
+        employee.user.password = updated_hash
+        session.add(employee.user)
+
+    return employee
+
+
+def get_secret_key() -> bytes:
+    """
+    Get the key signing the session tokens.
+
+    The key is read from the DUNDIE_SECRET_KEY environment variable or, if it
+    is not set, from SECRET_KEY_PATH, where a random key is generated on
+    first use.
+
+    Returns:
+        bytes: The secret key.
+    """
+    secret_key = os.getenv("DUNDIE_SECRET_KEY")
+    if secret_key:
+        return secret_key.encode()
+
+    try:
+        with open(SECRET_KEY_PATH) as file:
+            return file.read().strip().encode()
+    except FileNotFoundError:
+        pass
+
+    secret_key = secrets.token_hex(32)
+    os.makedirs(os.path.dirname(SECRET_KEY_PATH) or os.curdir, exist_ok=True)
+    descriptor = os.open(SECRET_KEY_PATH, os.O_WRONLY | os.O_CREAT, 0o600)
+    with os.fdopen(descriptor, "w") as file:
+        file.write(secret_key)
+    return secret_key.encode()
+
+
+def sign(payload: str) -> str:
+    """
+    Sign a payload with HMAC-SHA256.
+
+    Args:
+        payload (str): The payload to sign.
+
+    Returns:
+        str: The hexadecimal signature.
+    """
+    return hmac.new(
+        get_secret_key(), payload.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def issue_token(session: Session, employee: Employee) -> tuple[str, datetime]:
+    """
+    Issue a session token for an employee.
+
+    The token is made of its id, its expiration timestamp and the HMAC
+    signature of both. Its id is recorded in the database so it can be
+    revoked. Committing the session is left to the caller.
+
+    Args:
+        session (Session): The database session to use.
+        employee (Employee): The employee the token is issued to.
+
+    Returns:
+        tuple[str, datetime]: The token and its expiration date.
+    """
+    expires_at = datetime.now().replace(microsecond=0) + timedelta(
+        seconds=TOKEN_TTL
+    )
+    token_id = secrets.token_urlsafe(16)
+    session.add(
+        Token(id=token_id, employee_id=employee.id, expires_at=expires_at)
+    )
+
+    payload = f"{token_id}.{int(expires_at.timestamp())}"
+    return f"{payload}.{sign(payload)}", expires_at
+
+
+def parse_token(token: str) -> Optional[str]:
+    """
+    Check the signature and the expiration of a session token.
+
+    Args:
+        token (str): The session token.
+
+    Returns:
+        Optional[str]: The token id, or None if the token is malformed,
+          forged or expired.
+    """
+    try:
+        token_id, expires, signature = token.strip().split(".")
+    except ValueError:
+        return None
+
+    # Only a token signed by us is parsed further
+    if not hmac.compare_digest(
+        sign(f"{token_id}.{expires}").encode(), signature.encode()
+    ):
+        return None
+    try:
+        expires_at = datetime.fromtimestamp(int(expires))
+    except (ValueError, OverflowError, OSError):
+        return None
+    if expires_at <= datetime.now():
+        return None
+    return token_id
+
+
+def verify_token(
+    session: Session, token: str, history: bool = False
+) -> Optional[Employee]:
+    """
+    Verify a session token and get the employee it was issued to.
+
+    Unlike the password, the token is verified with a cheap HMAC check and a
+    lookup of its id, which fails if the token was revoked.
+
+    Args:
+        session (Session): The database session to use.
+        token (str): The session token.
+        history (bool): Whether to also load the employee's transactions.
+          Defaults to False.
+
+    Returns:
+        Optional[Employee]: The employee, or None if the token is not valid.
+    """
+    token_id = parse_token(token)
+    if token_id is None:
+        return None
+
+    row = session.get(Token, token_id)
+    if not row or row.revoked or row.expires_at <= datetime.now():
+        return None
+    return get_employee(
+        session, Employee.id == row.employee_id, history=history
+    )
+
+
+def revoke_token(session: Session, token: str) -> bool:
+    """
+    Revoke a session token. Committing the session is left to the caller.
+
+    Args:
+        session (Session): The database session to use.
+        token (str): The session token.
+
+    Returns:
+        bool: True if a valid token was revoked, False otherwise.
+    """
+    token_id = parse_token(token)
+    row = session.get(Token, token_id) if token_id else None
+    if not row or row.revoked:
+        return False
+
+    row.revoked = True
+    session.add(row)
+    return True
+
+
+def read_token() -> Optional[str]:
+    """
+    Read the session token saved by `dundie login`.
+
+    Returns:
+        Optional[str]: The session token, or None if there is none.
+    """
+    try:
+        with open(TOKEN_PATH) as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def save_token(token: str) -> None:
+    """
+    Save the session token, readable only by the current user.
+
+    Args:
+        token (str): The session token.
+    """
+    os.makedirs(os.path.dirname(TOKEN_PATH) or os.curdir, exist_ok=True)
+    descriptor = os.open(
+        TOKEN_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+    )
+    with os.fdopen(descriptor, "w") as file:
+        file.write(token)
+
+
+def delete_token() -> None:
+    """Delete the saved session token, if any."""
+    try:
+        os.remove(TOKEN_PATH)
+    except FileNotFoundError:
+        pass
+
+
+def require_authentication(
+    func: Optional[Callable] = None, *, history: bool = False
+) -> Callable:
+    """Implement decorator to enforce authentication for a function.
+
+    This decorator ensures that the function it wraps can only be executed
+    by an authenticated employee, and injects the authenticated employee
+    object into the wrapped function as a keyword argument. Only the
+    employee, its password and its balance value are loaded, unless the
+    decorator is used as `@require_authentication(history=True)`.
+
+    The session token saved by `dundie login` is used if it is valid and,
+    when EMPLOYEE_EMAIL is set, issued to that employee. Otherwise, the
+    employee's email and password are retrieved from the
+    environment and the password is verified against the database, and
+    hashed again in place if its hash needs an upgrade.
+
+    Args:
+        func (Optional[Callable]): The function to be wrapped by the
+            decorator.
+        history (bool): Whether to also load the employee's transactions.
+            Defaults to False.
+
+    Returns:
+        Callable: The wrapped function with authentication enforced.
+
+    Raises:
+        AuthenticationError: If the session token is not valid or is issued
+            to another employee than EMPLOYEE_EMAIL and the required
+            environment variables are not set, if the employee is not found
+            in the database, or if the password is invalid.
+    """
+    if func is None:
+        return partial(require_authentication, history=history)
 
     @wraps(func)
     def decorator(*args: Any, **kwargs: Any) -> Any:
         """Implement decorator to require authentication for a function."""
-        email = os.getenv("EMPLOYEE_EMAIL")
-        password = os.getenv("EMPLOYEE_PASSWORD")
+        token = read_token()
 
-        if not all([email, password]):
-            raise AuthenticationError(
-                "Variables EMPLOYEE_EMAIL and EMPLOYEE_PASSWORD are undefined."
+        with get_session() as session:
+            session.expire_on_commit = False
+            employee = (
+                verify_token(session, token, history=history) if token else None
             )
 
-        with get_session() as session:
-            employee = session.exec(
-                select(Employee)
-                .options(
-                    selectinload(Employee.balance),  # type: ignore
-                    selectinload(Employee.transaction),  # type: ignore
-                    selectinload(Employee.user),  # type: ignore
-                )
-                .where(Employee.email == email)
-            ).first()
+            # Explicit credentials of another employee take precedence over
+            # the session token.
+            email = os.getenv("EMPLOYEE_EMAIL")
+            if employee and email and employee.email != email:
+                if not os.getenv("EMPLOYEE_PASSWORD"):
+                    raise AuthenticationError(
+                        f"The session token is not for {email!r}, set "
+                        "EMPLOYEE_PASSWORD or run 'dundie login'."
+                    )
+                employee = None
 
             if not employee:
-                raise AuthenticationError(
-                    f"Employee with email {email!r} not found."
-                )
-
-            if password is not None and not verify_password(
-                password, employee.user.password
-            ):
-                raise AuthenticationError("Invalid password.")
+                if token and not os.getenv("EMPLOYEE_PASSWORD"):
+                    raise AuthenticationError(
+                        "The session token is expired or revoked, "
+                        "run 'dundie login'."
+                    )
+                employee = authenticate_password(session, history=history)
+                # Save the upgraded password hash, if any
+                session.commit()
 
         # Dependency injection
         return func(*args, from_employee=employee, **kwargs)
@@ -1,19 +1,38 @@
 """Database module of dundie."""
 
+import csv
+from concurrent.futures import Executor
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import IO, Any, Optional
 
-from sqlmodel import Session, select
+from sqlmodel import Session, and_, delete, func, insert, select, update
 
-from dundie.models import Balance, Employee, Transaction, User
+from dundie.models import (
+    Balance,
+    BalanceSnapshot,
+    Employee,
+    Outbox,
+    Transaction,
+    User,
+)
 from dundie.settings import (
+    DATE_FORMAT,
     DEFAULT_ACTOR,
     DEFAULT_ASSOCIATE_POINTS,
     DEFAULT_MANAGER_POINTS,
     EMAIL_FROM,
+    OUTBOX_MAX_ATTEMPTS,
+    READ_CHUNK_SIZE,
+)
+from dundie.utils.user import (
+    generate_password_hash,
+    generate_password_hashes,
+    generate_simple_password,
 )
-from dundie.utils.email import send_email
-from dundie.utils.user import generate_password_hash
+
+# The columns of the transactions written to a ledger archive.
+ARCHIVE_FIELDS = ["id", "employee_id", "value", "description", "actor", "date"]
 
 
 def add_employee(
@@ -24,8 +43,8 @@ def add_employee(
 
     This function adds an employee to the provided session if the email is
     valid and the employee does not already exist. If the employee is newly
-    created, it sets the initial balance and password, and sends an email with
-    the password.
+    created, it sets the initial balance and password, and queues an email
+    with the password in the outbox.
 
     Args:
         session (Session): The database session to use for adding the employee.
@@ -57,8 +76,8 @@ def add_employee(
         set_initial_balance(session, employee)
         password = set_initial_password(session, employee, password)
         # TODO: Encrypt password and send link to reset it
-        # TODO: Use queue to send email
-        send_email(
+        queue_email(
+            session,
             EMAIL_FROM,
             employee.email,
             "Your dundie password",
@@ -68,25 +87,40 @@ def add_employee(
     return employee, created
 
 
-def set_initial_balance(session: Session, employee: Employee) -> None:
+def get_initial_points(role: str, department: str) -> Decimal:
     """
-    Set the initial balance for an employee in the database.
+    Get the initial points for an employee based on role and department.
 
     Args:
-        session (Session): The database session to use for setting the balance.
-        employee (Employee): The employee object for whom the balance is set.
+        role (str): The role of the employee.
+        department (str): The department of the employee.
 
     Returns:
-        None
+        Decimal: The initial points for the employee.
     """
     roles = ["Manager", "Director"]
     departments = ["Board", "Management"]
     value = (
         DEFAULT_MANAGER_POINTS
-        if any(role in employee.role for role in roles)
-        or any(department in employee.department for department in departments)
+        if any(_role in role for _role in roles)
+        or any(_department in department for _department in departments)
         else DEFAULT_ASSOCIATE_POINTS
     )
+    return value
+
+
+def set_initial_balance(session: Session, employee: Employee) -> None:
+    """
+    Set the initial balance for an employee in the database.
+
+    Args:
+        session (Session): The database session to use for setting the balance.
+        employee (Employee): The employee object for whom the balance is set.
+
+    Returns:
+        None
+    """
+    value = get_initial_points(employee.role, employee.department)
     add_transaction(session, employee, value, "Initial balance")
 
 
@@ -101,6 +135,13 @@ def add_transaction(
     Add a transaction to the database for a given employee and update their\
     balance.
 
+    The balance is updated incrementally by applying the transaction value as
+    a delta in the same unit of work, so the cost does not grow with the
+    employee's transaction history. The date of the last transaction and the
+    number of transactions stored on the balance are updated in the same
+    statement. The changes are flushed but committing the session is left to
+    the caller. Use `recompute_balance` to rebuild a balance from the ledger.
+
     Args:
         session (Session): The database session to use for adding the
           transaction.
@@ -114,8 +155,6 @@ def add_transaction(
     Returns:
         None
     """
-    balance: Decimal
-
     transaction = Transaction(
         employee=employee,
         value=value,
@@ -123,20 +162,371 @@ def add_transaction(
         actor=actor,
     )
     session.add(transaction)
-    session.commit()
-    session.refresh(transaction)
 
-    transactions = session.exec(
-        select(Transaction).where(Transaction.employee == employee)
+    if not employee.balance:
+        session.add(
+            Balance(
+                employee=employee,
+                value=transaction.value,
+                last_transaction_at=transaction.date,
+                transaction_count=1,
+            )
+        )
+        session.flush()
+    else:
+        session.flush()
+        session.exec(
+            update(Balance)
+            .where(Balance.employee_id == employee.id)  # type: ignore
+            .values(
+                value=Balance.value + transaction.value,
+                last_transaction_at=transaction.date,
+                transaction_count=Balance.transaction_count + 1,
+            )
+        )
+
+
+def lock_balances(
+    session: Session, employee_ids: list[int]
+) -> dict[int, Decimal]:
+    """
+    Lock the balances of the given employees until the end of the transaction.
+
+    The rows are locked with SELECT ... FOR UPDATE in employee id order, so
+    concurrent transfers on a server database such as PostgreSQL wait for
+    each other instead of deadlocking. SQLite, which locks the whole database
+    on write, ignores the clause.
+
+    Args:
+        session (Session): The database session to use.
+        employee_ids (list[int]): The ids of the employees.
+
+    Returns:
+        dict[int, Decimal]: The current balance of the employees that have
+          one, indexed by employee id.
+    """
+    rows = session.exec(
+        select(Balance.employee_id, Balance.value)
+        .where(Balance.employee_id.in_(employee_ids))  # type: ignore
+        .order_by(Balance.employee_id)  # type: ignore
+        .with_for_update()
     )
+    return {employee_id: value for employee_id, value in rows}
 
-    balance = Decimal(sum([row.value for row in transactions]))
 
-    if not employee.balance:
-        session.add(Balance(employee=employee, value=balance))
-    else:
-        employee.balance.value = balance
-        session.add(employee)
+def add_transactions(
+    session: Session,
+    transactions: list[tuple[int, Decimal]],
+    description: str,
+    actor: Optional[str] = DEFAULT_ACTOR,
+) -> None:
+    """
+    Add a batch of transactions and update the balances with set-based\
+    statements.
+
+    All the transactions are inserted with one bulk INSERT. The balances are
+    updated with one UPDATE per distinct delta and number of transactions, so
+    awarding the same value to a whole department costs a couple of
+    statements regardless of its size.
+    The balances are locked with `lock_balances` before being updated. As
+    with `add_transaction`, committing the session is left to the caller,
+    which keeps the batch atomic.
+
+    Args:
+        session (Session): The database session to use.
+        transactions (list[tuple[int, Decimal]]): The employee id and value
+          of each transaction.
+        description (str): A description of the transactions.
+        actor (Optional[str]): The actor responsible for the transactions.
+          Defaults to DEFAULT_ACTOR.
+
+    Returns:
+        None
+    """
+    if not transactions:
+        return
+
+    now = datetime.now()
+    deltas: dict[int, Decimal] = {}
+    counts: dict[int, int] = {}
+    rows = []
+    for employee_id, value in transactions:
+        value = Decimal(str(value))
+        deltas[employee_id] = deltas.get(employee_id, Decimal(0)) + value
+        counts[employee_id] = counts.get(employee_id, 0) + 1
+        rows.append(
+            {
+                "employee_id": employee_id,
+                "value": value,
+                "description": description,
+                "actor": actor,
+                "date": now,
+            }
+        )
+    session.exec(insert(Transaction), params=rows)
+
+    with_balance = lock_balances(session, list(deltas))
+    without_balance = [
+        {
+            "employee_id": employee_id,
+            "value": delta,
+            "last_transaction_at": now,
+            "transaction_count": counts[employee_id],
+        }
+        for employee_id, delta in deltas.items()
+        if employee_id not in with_balance
+    ]
+    if without_balance:
+        session.exec(insert(Balance), params=without_balance)
+
+    employee_ids_by_delta: dict[tuple[Decimal, int], list[int]] = {}
+    for employee_id, delta in deltas.items():
+        if employee_id in with_balance:
+            employee_ids_by_delta.setdefault(
+                (delta, counts[employee_id]), []
+            ).append(employee_id)
+
+    for (delta, count), employee_ids in employee_ids_by_delta.items():
+        session.exec(
+            update(Balance)
+            .where(Balance.employee_id.in_(employee_ids))  # type: ignore
+            .values(
+                value=Balance.value + delta,
+                last_transaction_at=now,
+                transaction_count=Balance.transaction_count + count,
+            )
+        )
+
+
+def get_latest_snapshot(
+    session: Session, employee_id: int
+) -> Optional[BalanceSnapshot]:
+    """
+    Get the latest balance snapshot of an employee.
+
+    Args:
+        session (Session): The database session to use.
+        employee_id (int): The id of the employee.
+
+    Returns:
+        Optional[BalanceSnapshot]: The latest snapshot, or None if the ledger
+          of the employee was never compacted.
+    """
+    return session.exec(
+        select(BalanceSnapshot)
+        .where(BalanceSnapshot.employee_id == employee_id)
+        .order_by(BalanceSnapshot.taken_at.desc())  # type: ignore
+        .limit(1)
+    ).first()
+
+
+def latest_snapshots() -> Any:
+    """
+    Build the subquery of the latest balance snapshot of every employee.
+
+    Returns:
+        Subquery: The employee_id, value, transaction_count,
+          last_transaction_at and taken_at of the latest snapshot of each
+          employee that has one.
+    """
+    latest = (
+        select(
+            BalanceSnapshot.employee_id,
+            func.max(BalanceSnapshot.taken_at).label("taken_at"),
+        )
+        .group_by(BalanceSnapshot.employee_id)  # type: ignore
+        .subquery()
+    )
+    return (
+        select(
+            BalanceSnapshot.employee_id,
+            BalanceSnapshot.value,
+            BalanceSnapshot.transaction_count,
+            BalanceSnapshot.last_transaction_at,
+            BalanceSnapshot.taken_at,
+        )
+        .join(
+            latest,
+            and_(
+                latest.c.employee_id == BalanceSnapshot.employee_id,
+                latest.c.taken_at == BalanceSnapshot.taken_at,
+            ),
+        )
+        .subquery()
+    )
+
+
+def recompute_balance(session: Session, employee: Employee) -> Decimal:
+    """
+    Recompute the balance of an employee from the transaction ledger.
+
+    The ledger is the latest balance snapshot of the employee, if any, plus
+    the transactions dated from the snapshot on, so the cost does not grow
+    with the compacted history. The date of the last transaction and the
+    number of transactions stored on the balance are recomputed too.
+
+    Args:
+        session (Session): The database session to use.
+        employee (Employee): The employee whose balance is recomputed.
+
+    Returns:
+        Decimal: The balance value summed from the ledger.
+    """
+    # Lock the balance first, so no transaction is applied between the sum
+    # and the write.
+    stored = session.exec(
+        select(Balance)
+        .where(Balance.employee_id == employee.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).first()
+
+    snapshot = get_latest_snapshot(session, employee.id)  # type: ignore
+    sql = select(
+        func.sum(Transaction.value),
+        func.max(Transaction.date),
+        func.count(),
+    ).where(Transaction.employee_id == employee.id)
+    if snapshot:
+        sql = sql.where(Transaction.date >= snapshot.taken_at)
+    ledger, last_transaction_at, transaction_count = session.exec(sql).one()
+
+    balance = Decimal(ledger or 0)
+    if snapshot:
+        balance += snapshot.value
+        transaction_count += snapshot.transaction_count
+        last_transaction_at = (
+            last_transaction_at or snapshot.last_transaction_at
+        )
+
+    if not stored:
+        stored = Balance(employee=employee, value=balance)
+    stored.value = balance
+    stored.last_transaction_at = last_transaction_at
+    stored.transaction_count = transaction_count
+    session.add(stored)
+
+    return balance
+
+
+def check_compaction_date(session: Session, before: datetime) -> None:
+    """
+    Check that the ledger can be compacted before a date.
+
+    Args:
+        session (Session): The database session to use.
+        before (datetime): The date the transactions are folded before.
+
+    Raises:
+        ValueError: If `before` is in the future or not later than the last
+          compaction.
+    """
+    if before > datetime.now():
+        raise ValueError("Cannot compact the ledger after the current date.")
+    last_taken_at = session.exec(
+        select(func.max(BalanceSnapshot.taken_at))
+    ).one()
+    if last_taken_at and before <= last_taken_at:
+        raise ValueError(
+            "The ledger is already compacted before "
+            f"{last_taken_at.strftime(DATE_FORMAT)}."
+        )
+
+
+def compact_transactions(
+    session: Session, before: datetime, archive_file: Optional[IO[str]] = None
+) -> tuple[int, int]:
+    """
+    Fold the transactions dated before a date into balance snapshots.
+
+    A new snapshot is taken at `before` for every employee with transactions
+    dated before it, adding them to the latest snapshot of the employee. The
+    folded transactions are then deleted, after being written to
+    `archive_file` as CSV when it is given. The balances are not changed.
+    Committing the session is left to the caller, which keeps the compaction
+    atomic.
+
+    Args:
+        session (Session): The database session to use.
+        before (datetime): The date the transactions are folded before. It
+          must not be in the future, or the transactions added afterwards
+          would be dated before the snapshot.
+        archive_file (Optional[IO[str]]): The file the deleted transactions
+          are written to. Defaults to None (not archived).
+
+    Returns:
+        tuple[int, int]: The number of snapshots taken and the number of
+          transactions deleted.
+
+    Raises:
+        ValueError: If `before` is in the future or not later than the last
+          compaction.
+    """
+    check_compaction_date(session, before)
+
+    snapshots = latest_snapshots()
+    ledger = session.exec(
+        select(
+            Transaction.employee_id,
+            func.sum(Transaction.value),
+            func.count(),
+            func.max(Transaction.date),
+            snapshots.c.value,
+            snapshots.c.transaction_count,
+        )
+        .join(
+            snapshots,
+            snapshots.c.employee_id == Transaction.employee_id,
+            isouter=True,
+        )
+        .where(Transaction.date < before)  # type: ignore
+        .group_by(
+            Transaction.employee_id,  # type: ignore
+            snapshots.c.value,
+            snapshots.c.transaction_count,
+        )
+    ).all()
+    if ledger:
+        session.exec(
+            insert(BalanceSnapshot),
+            params=[
+                {
+                    "employee_id": employee_id,
+                    "value": (snapshot_value or Decimal(0)) + Decimal(value),
+                    "transaction_count": (snapshot_count or 0) + count,
+                    "last_transaction_at": last_transaction_at,
+                    "taken_at": before,
+                    "created_at": datetime.now(),
+                }
+                for (
+                    employee_id,
+                    value,
+                    count,
+                    last_transaction_at,
+                    snapshot_value,
+                    snapshot_count,
+                ) in ledger
+            ],
+        )
+
+    if archive_file is not None:
+        writer = csv.writer(archive_file)
+        writer.writerow(ARCHIVE_FIELDS)
+        writer.writerows(
+            session.exec(
+                select(
+                    *[getattr(Transaction, field) for field in ARCHIVE_FIELDS]
+                )
+                .where(Transaction.date < before)  # type: ignore
+                .order_by(Transaction.id)  # type: ignore
+                .execution_options(yield_per=READ_CHUNK_SIZE)
+            )
+        )
+
+    deleted = session.exec(
+        delete(Transaction).where(Transaction.date < before)  # type: ignore
+    )
+    return len(ledger), deleted.rowcount
 
 
 def set_initial_password(
@@ -166,3 +556,174 @@ def set_initial_password(
     session.add(user)
 
     return password
+
+
+def get_employee_ids(session: Session) -> dict[str, int]:
+    """
+    Get the ids of all employees in the database indexed by email.
+
+    Args:
+        session (Session): The database session to use.
+
+    Returns:
+        dict[str, int]: A dictionary with emails as keys and ids as values.
+    """
+    rows = session.exec(select(Employee.email, Employee.id))
+    return {email: employee_id for email, employee_id in rows}
+
+
+def bulk_add_employees(
+    session: Session,
+    employees: list[Employee],
+    employee_ids: dict[str, int],
+    executor: Executor | None = None,
+) -> list[bool]:
+    """
+    Add or update a batch of employees with set-based statements.
+
+    Existing employees are updated with a single bulk UPDATE by primary key.
+    New employees are inserted together with their initial balance,
+    transaction and user using one bulk INSERT per table. The passwords of the
+    whole batch are hashed before the write, in parallel when `executor` is
+    given. As with `add_employee`, an email with the password is queued in
+    the outbox for every new employee.
+
+    Args:
+        session (Session): The database session to use.
+        employees (list[Employee]): The employees to add or update.
+        employee_ids (dict[str, int]): The ids of the employees already in the
+          database indexed by email, as returned by `get_employee_ids`. It is
+          updated in place with the ids of the inserted employees.
+        executor (Executor | None): The process pool used to hash the
+          passwords. Defaults to None (serial hashing).
+
+    Returns:
+        list[bool]: For each employee, whether it was created (True) or
+          updated (False).
+    """
+    created = []
+    new_rows: dict[str, dict] = {}
+    updated_rows: dict[int, dict] = {}
+
+    for employee in employees:
+        data = employee.model_dump(exclude={"id"})
+        email = data["email"]
+        if email in employee_ids:
+            updated_rows[employee_ids[email]] = {
+                "id": employee_ids[email],
+                **data,
+            }
+            created.append(False)
+        else:
+            created.append(email not in new_rows)
+            new_rows[email] = data
+
+    if updated_rows:
+        session.exec(update(Employee), params=list(updated_rows.values()))
+
+    if not new_rows:
+        return created
+
+    passwords = {email: generate_simple_password() for email in new_rows}
+    password_hashes = generate_password_hashes(
+        list(passwords.values()), executor
+    )
+
+    inserted = session.exec(
+        insert(Employee).returning(Employee.id, Employee.email),
+        params=list(new_rows.values()),
+    )
+    employee_ids.update({email: employee_id for employee_id, email in inserted})
+
+    now = datetime.now()
+    balances, transactions, users = [], [], []
+    for (email, data), password_hash in zip(new_rows.items(), password_hashes):
+        employee_id = employee_ids[email]
+        value = get_initial_points(data["role"], data["department"])
+
+        balances.append(
+            {
+                "employee_id": employee_id,
+                "value": value,
+                "last_transaction_at": now,
+                "transaction_count": 1,
+            }
+        )
+        transactions.append(
+            {
+                "employee_id": employee_id,
+                "value": value,
+                "description": "Initial balance",
+                "actor": DEFAULT_ACTOR,
+                "date": now,
+            }
+        )
+        users.append({"employee_id": employee_id, "password": password_hash})
+
+    session.exec(insert(Balance), params=balances)
+    session.exec(insert(Transaction), params=transactions)
+    session.exec(insert(User), params=users)
+    session.exec(
+        insert(Outbox),
+        params=[
+            {
+                "sender": EMAIL_FROM,
+                "recipient": email,
+                "subject": "Your dundie password",
+                "body": f"Your password is: {password}",
+                "attempts": 0,
+                "created_at": now,
+            }
+            for email, password in passwords.items()
+        ],
+    )
+
+    return created
+
+
+def queue_email(
+    session: Session, sender: str, recipient: str, subject: str, body: str
+) -> None:
+    """
+    Queue an email in the outbox to be sent by `dundie mail flush`.
+
+    The email is written in the same transaction as the caller's changes, so
+    it is only sent if they are committed.
+
+    Args:
+        session (Session): The database session to use.
+        sender (str): The email address of the sender.
+        recipient (str): The email address of the recipient.
+        subject (str): The subject of the email.
+        body (str): The body content of the email.
+
+    Returns:
+        None
+    """
+    session.add(
+        Outbox(sender=sender, recipient=recipient, subject=subject, body=body)
+    )
+
+
+def purge_outbox(session: Session) -> list[str]:
+    """
+    Delete the emails of the outbox that reached OUTBOX_MAX_ATTEMPTS.
+
+    They are not sent anymore and their body may hold a plain text password,
+    so they are not kept. Committing the session is left to the caller.
+
+    Args:
+        session (Session): The database session to use.
+
+    Returns:
+        list[str]: The recipients of the deleted emails.
+    """
+    # Count the attempts of the pending changes
+    session.flush()
+    return list(
+        session.exec(
+            delete(Outbox)
+            .where(Outbox.attempts >= OUTBOX_MAX_ATTEMPTS)  # type: ignore
+            .returning(Outbox.recipient)
+        ).scalars()
+    )
@@ -2,14 +2,19 @@
 
 import re
 import smtplib
+import socket
+import time
 from email.mime.text import MIMEText
+from typing import Iterable
 
 from pydantic import EmailStr
 
 from dundie.settings import (
     SMTP_HOST,
+    SMTP_MAX_RETRIES,
     SMTP_PASSWORD,
     SMTP_PORT,
+    SMTP_RETRY_BACKOFF,
     SMTP_TIMEOUT,
     SMTP_USERNAME,
 )
@@ -30,12 +35,175 @@ def check_valid_email(address: str) -> bool:
     return bool(re.fullmatch(regex, address))
 
 
+class SMTPSender:
+    """
+    Send emails reusing one authenticated SMTP connection.
+
+    The connection is opened on the first email and kept open for the next
+    ones. If it fails, the sender reconnects and retries the email with an
+    exponential backoff of `backoff`, `2 * backoff`, `4 * backoff`... seconds.
+    When the retries are exhausted, `connection_failed` is set until an email
+    is sent again, so callers can stop instead of retrying every email.
+    Emails the server rejects, e.g. with a 550 reply, are not retried.
+
+    Attributes:
+        host (str): The hostname of the SMTP server.
+        port (int): The port number of the SMTP server.
+        timeout (int): The timeout duration for SMTP connections in seconds.
+        max_retries (int): The number of retries of an email after a
+          connection failure.
+        backoff (float): The delay before the first retry in seconds.
+        sent (int): The number of emails sent with this sender.
+        connection_failed (bool): Whether the last email failed because the
+          SMTP server could not be reached, rather than being rejected.
+
+    Example:
+        >>> with SMTPSender() as smtp_sender:
+        ...     smtp_sender.send(EMAIL_FROM, "jim@dm.com", "Subject", "Body")
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        timeout: int | None = None,
+        max_retries: int | None = None,
+        backoff: float | None = None,
+    ):
+        """Initialize class."""
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.timeout = timeout or SMTP_TIMEOUT
+        self.max_retries = (
+            SMTP_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff = SMTP_RETRY_BACKOFF if backoff is None else backoff
+        self.sent = 0
+        self.connection_failed = False
+        self._server: smtplib.SMTP | None = None
+
+    def __enter__(self) -> "SMTPSender":
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Close the connection when leaving the runtime context."""
+        self.close()
+
+    def connect(self) -> smtplib.SMTP:
+        """
+        Open and authenticate the connection to the SMTP server.
+
+        Returns:
+            smtplib.SMTP: The connection to the SMTP server.
+        """
+        server = smtplib.SMTP(
+            host=self.host, port=self.port, timeout=self.timeout
+        )
+        server.ehlo()
+        if server.has_extn("auth"):
+            server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        self._server = server
+        return server
+
+    def close(self) -> None:
+        """Close the connection to the SMTP server, if any."""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+    def send(
+        self,
+        sender: str,
+        recipient: EmailStr | list[EmailStr],
+        subject: str,
+        body: str,
+    ) -> bool:
+        """
+        Send an email on the shared connection.
+
+        Args:
+            sender (str): The email address of the sender.
+            recipient (EmailStr | list[EmailStr]): A single recipient email
+              address or a list of recipient email addresses.
+            subject (str): The subject of the email.
+            body (str): The body content of the email.
+
+        Returns:
+            bool: True if the email was sent, False otherwise.
+        """
+        log = get_logger()
+
+        log.debug(
+            "Sending email from '%s' to '%s' with subject '%s' and body '%s'",
+            sender,
+            recipient,
+            subject,
+            body,
+        )
+
+        if not isinstance(recipient, list):
+            recipient = [recipient]
+
+        message = MIMEText(body)
+        message["From"] = sender
+        message["To"] = (",").join(recipient)
+        message["Subject"] = subject
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                server = self._server or self.connect()
+                server.sendmail(sender, recipient, message.as_string())
+            except (
+                smtplib.SMTPServerDisconnected,
+                smtplib.SMTPConnectError,
+                ConnectionError,
+                socket.timeout,
+            ) as error_msg:
+                # Connection failures are retried on a new connection
+                log.warning(
+                    "Error sending email to %s (attempt %d): %s",
+                    recipient,
+                    attempt + 1,
+                    error_msg,
+                )
+                self.close()
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * 2**attempt)
+            except (
+                smtplib.SMTPResponseException,
+                smtplib.SMTPRecipientsRefused,
+            ) as error_msg:
+                # The server rejected the email, sending it again won't help
+                log.error("Email to %s rejected: %s", recipient, error_msg)
+                self.connection_failed = False
+                return False
+            except Exception as error_msg:
+                log.error("Error sending email to %s: %s", recipient, error_msg)
+                self.connection_failed = False
+                return False
+            else:
+                self.sent += 1
+                self.connection_failed = False
+                return True
+
+        log.error("Error sending email to %s: retries exhausted", recipient)
+        self.connection_failed = True
+        return False
+
+
 def send_email(
     sender: str, recipient: EmailStr | list[EmailStr], subject: str, body: str
-) -> None:
+) -> bool:
     """
     Send an email using the specified parameters.
 
+    Use `send_emails` or `SMTPSender` to send many emails on one connection.
+
     Args:
         sender (str): The email address of the sender.
         recipient (EmailStr | list[EmailStr]): A single recipient email address
@@ -43,35 +211,39 @@ def send_email(
         subject (str): The subject of the email.
         body (str): The body content of the email.
 
-    Raises:
-        Exception: If there is an error sending the email, it logs the error
-          message.
+    Returns:
+        bool: True if the email was sent, False otherwise.
+    """
+    with SMTPSender() as smtp_sender:
+        return smtp_sender.send(sender, recipient, subject, body)
+
+
+def send_emails(
+    emails: Iterable[tuple[str, EmailStr | list[EmailStr], str, str]],
+) -> list[bool]:
+    """
+    Send a batch of emails reusing one SMTP connection.
+
+    Args:
+        emails (Iterable[tuple[str, EmailStr | list[EmailStr], str, str]]):
+          The sender, recipient, subject and body of each email.
+
+    Returns:
+        list[bool]: For each email, whether it was sent.
     """
     log = get_logger()
 
-    log.debug(
-        "Sending email from '%s' to '%s' with subject '%s' and body '%s'",
-        sender,
-        recipient,
-        subject,
-        body,
+    start = time.perf_counter()
+    with SMTPSender() as smtp_sender:
+        result = [smtp_sender.send(*email) for email in emails]
+    elapsed = time.perf_counter() - start
+
+    log.info(
+        "Sent %d of %d emails in %.2fs (%.1f emails/s)",
+        smtp_sender.sent,
+        len(result),
+        elapsed,
+        smtp_sender.sent / elapsed if elapsed else 0,
     )
 
-    if not isinstance(recipient, list):
-        recipient = [recipient]
-    try:
-        with smtplib.SMTP(
-            host=SMTP_HOST,
-            port=SMTP_PORT,
-            timeout=SMTP_TIMEOUT,
-        ) as server:
-            message = MIMEText(body)
-            message["From"] = sender
-            message["To"] = (",").join(recipient)
-            message["Subject"] = subject
-            server.user = SMTP_USERNAME
-            server.password = SMTP_PASSWORD
-            server.auth_plain()
-            server.sendmail(sender, recipient, message.as_string())
-    except Exception as error_msg:
-        log.error("Error sending email to %s: %s", recipient, error_msg)
+    return result
@@ -1,14 +1,26 @@
 """Convert currency using the exchange rate from the European Central Bank."""
 
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-import httpx
 from pydantic import BaseModel, Field
 
-from dundie.settings import API_BASE_URL
+from dundie.settings import (
+    API_BASE_URL,
+    API_MAX_CONNECTIONS,
+    API_TIMEOUT,
+    EXCHANGE_RATES_CACHE_PATH,
+    EXCHANGE_RATES_TTL,
+)
 from dundie.utils.log import get_logger
 
+if TYPE_CHECKING:
+    import httpx
+
 
 class USDRate(BaseModel):
     """Currency exchange rate model.
@@ -26,7 +38,134 @@ class USDRate(BaseModel):
     value: Decimal = Field(alias="ask")
 
 
-def get_exchange_rates(currencies: List[str]) -> Dict[str, USDRate]:
+def load_rates_cache(path: str | None = None) -> Dict[str, Dict[str, Any]]:
+    """Load the exchange rate cache from disk.
+
+    Args:
+        path (str, optional): The file path to the cache. Defaults to
+          EXCHANGE_RATES_CACHE_PATH.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The cached rates by currency code, each one
+          with the rate data and the `timestamp` it was fetched at. Empty if
+          the cache does not exist or cannot be read.
+    """
+    try:
+        with open(path or EXCHANGE_RATES_CACHE_PATH) as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_rates_cache(
+    cache: Dict[str, Dict[str, Any]], path: str | None = None
+) -> None:
+    """Save the exchange rate cache to disk.
+
+    The cache is written to a temporary file first and then renamed, so a
+    concurrent reader never sees a partial file.
+
+    Args:
+        cache (Dict[str, Dict[str, Any]]): The cached rates by currency code.
+        path (str, optional): The file path to the cache. Defaults to
+          EXCHANGE_RATES_CACHE_PATH.
+    """
+    path = path or EXCHANGE_RATES_CACHE_PATH
+    temporary_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or os.curdir, exist_ok=True)
+        with open(temporary_path, "w") as file:
+            json.dump(cache, file)
+        os.replace(temporary_path, path)
+    except OSError as error_msg:
+        get_logger().warning(f"Error {error_msg} saving the rates cache")
+
+
+def fetch_exchange_rate(client: "httpx.Client", currency: str) -> USDRate:
+    """Fetch the exchange rate of a single currency.
+
+    Args:
+        client (httpx.Client): The HTTP client used for the request.
+        currency (str): The currency code.
+
+    Returns:
+        USDRate: The exchange rate from USD to the currency.
+
+    Raises:
+        Exception: If the request fails or the response is invalid.
+    """
+    response = client.get(API_BASE_URL.format(currency=currency))
+    response.raise_for_status()
+    return USDRate(**response.json()[f"USD{currency}"])
+
+
+def fetch_exchange_rates(currencies: List[str]) -> Dict[str, USDRate]:
+    """Fetch the exchange rates of many currencies from the API.
+
+    All the currencies are requested at once, as the API accepts
+    comma-separated pairs. The currencies missing from that response, for
+    example because the API rejects the whole request when one of the pairs
+    is unknown, are fetched one by one, concurrently. Every request shares
+    one pooled HTTP client with a timeout of API_TIMEOUT seconds.
+
+    Args:
+        currencies (List[str]): A list of currency codes other than USD.
+
+    Returns:
+        Dict[str, USDRate]: The exchange rates by currency code. Currencies
+          whose rate could not be fetched are left out.
+    """
+    exchange_rates: Dict[str, USDRate] = {}
+    log = get_logger()
+
+    if not currencies:
+        return exchange_rates
+
+    # httpx is only imported when a rate has to be fetched, to keep it out of
+    # the startup of the CLI.
+    import httpx
+
+    limits = httpx.Limits(max_connections=API_MAX_CONNECTIONS)
+    with httpx.Client(timeout=API_TIMEOUT, limits=limits) as client:
+        pairs = ",USD-".join(currencies)
+        try:
+            response = client.get(API_BASE_URL.format(currency=pairs))
+            response.raise_for_status()
+            data = response.json()
+            for currency in currencies:
+                if f"USD{currency}" in data:
+                    exchange_rates[currency] = USDRate(**data[f"USD{currency}"])
+        except Exception as error_msg:
+            log.warning(f"Error {error_msg} for currencies {currencies}")
+
+        missing = [
+            currency
+            for currency in currencies
+            if currency not in exchange_rates
+        ]
+        if not missing:
+            return exchange_rates
+
+        def fetch(currency: str) -> USDRate | None:
+            try:
+                return fetch_exchange_rate(client, currency)
+            except Exception as error_msg:
+                log.error(f"Error {error_msg} for currency {currency}")
+                return None
+
+        workers = min(len(missing), API_MAX_CONNECTIONS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for currency, rate in zip(missing, executor.map(fetch, missing)):
+                if rate is not None:
+                    exchange_rates[currency] = rate
+
+    return exchange_rates
+
+
+def get_exchange_rates(
+    currencies: List[str], refresh: bool = False
+) -> Dict[str, USDRate]:
     """Get the exchange rates for the given currencies.
 
     This function fetches the exchange rates for a list of currency codes
@@ -34,11 +173,16 @@ def get_exchange_rates(currencies: List[str]) -> Dict[str, USDRate]:
     currency codes and the values are USDRate objects representing the
     exchange rates.
 
-    If there is an error fetching the exchange rate for a currency, the value
-    will be a USDRate object with the name "API Error" and ask value of 0.
+    The rates are cached on disk for EXCHANGE_RATES_TTL seconds, so repeated
+    calls within that time make no HTTP requests. If there is an error
+    fetching the exchange rate for a currency, the last cached rate is used
+    even if it is stale. Without a cached rate, the value will be a USDRate
+    object with the name "API Error" and ask value of 0.
 
     Args:
         currencies (List[str]): A list of currency codes.
+        refresh (bool, optional): Whether to fetch the rates even if they are
+          cached. Defaults to False.
 
     Returns:
         Dict[str, USDRate]: A dictionary with currency codes as keys and
@@ -47,20 +191,40 @@ def get_exchange_rates(currencies: List[str]) -> Dict[str, USDRate]:
     exchange_rates = {}
     log = get_logger()
 
-    for currency in currencies:
+    cache = load_rates_cache()
+    now = time.time()
+
+    expired = []
+    for currency in dict.fromkeys(currencies):
+        cached = cache.get(currency)
         if currency == "USD":
             exchange_rates[currency] = USDRate(ask=Decimal(1))
+        elif (
+            cached
+            and not refresh
+            and now - cached.get("timestamp", 0) < EXCHANGE_RATES_TTL
+        ):
+            exchange_rates[currency] = USDRate(**cached)
         else:
-            url = API_BASE_URL.format(currency=currency)
-            try:
-                response = httpx.get(url)
-                response.raise_for_status()
-                key = f"USD{currency}"
-                data = response.json()[key]
-                exchange_rates[currency] = USDRate(**data)
-            except Exception as error_msg:
-                log.error(f"Error {error_msg} for currency {currency}")
-                exchange_rates[currency] = USDRate(
-                    name="API Error", ask=Decimal(0)
-                )
+            expired.append(currency)
+
+    fetched = fetch_exchange_rates(expired)
+
+    for currency in expired:
+        cached = cache.get(currency)
+        if currency in fetched:
+            exchange_rates[currency] = fetched[currency]
+            cache[currency] = {
+                **fetched[currency].model_dump(mode="json", by_alias=True),
+                "timestamp": now,
+            }
+        elif cached:
+            log.warning(f"Using the cached rate for currency {currency}")
+            exchange_rates[currency] = USDRate(**cached)
+        else:
+            exchange_rates[currency] = USDRate(name="API Error", ask=Decimal(0))
+
+    if fetched:
+        save_rates_cache(cache)
+
     return exchange_rates
@@ -1,12 +1,59 @@
 """User module for dundie."""
 
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from random import sample
 from string import ascii_letters, digits
+from typing import Iterator, Optional
 
+from argon2 import Type, extract_parameters
+from argon2.exceptions import InvalidHashError
 from pwdlib import PasswordHash
 from pwdlib.exceptions import UnknownHashError
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from dundie.settings import (
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    PASSWORD_HASH_WORKERS,
+)
+from dundie.utils.log import get_logger
+
+
+def create_password_hash(
+    time_cost: int = ARGON2_TIME_COST,
+    memory_cost: int = ARGON2_MEMORY_COST,
+    parallelism: int = ARGON2_PARALLELISM,
+) -> PasswordHash:
+    """
+    Create a PasswordHash instance hashing with the given Argon2 parameters.
+
+    Args:
+        time_cost (int): The number of iterations. Defaults to
+          ARGON2_TIME_COST.
+        memory_cost (int): The memory usage in kibibytes. Defaults to
+          ARGON2_MEMORY_COST.
+        parallelism (int): The number of lanes. Defaults to
+          ARGON2_PARALLELISM.
+
+    Returns:
+        PasswordHash: The PasswordHash instance.
+    """
+    return PasswordHash(
+        (
+            Argon2Hasher(
+                time_cost=time_cost,
+                memory_cost=memory_cost,
+                parallelism=parallelism,
+            ),
+        )
+    )
 
-password_hash_instance = PasswordHash.recommended()
+
+password_hash_instance = create_password_hash()
 
 
 def generate_password_hash(password_plain: str) -> str:
@@ -23,6 +70,66 @@ def generate_password_hash(password_plain: str) -> str:
     return password_hash_instance.hash(password=password_plain)
 
 
+@contextmanager
+def password_hash_executor(
+    workers: int = PASSWORD_HASH_WORKERS,
+) -> Iterator[Executor | None]:
+    """
+    Create a process pool to hash passwords in parallel.
+
+    Args:
+        workers (int): The number of worker processes. 0 uses all the CPU
+          cores and 1 disables the pool. Defaults to PASSWORD_HASH_WORKERS.
+
+    Yields:
+        Executor | None: The process pool, or None if the passwords should be
+          hashed serially.
+    """
+    log = get_logger()
+
+    executor = None
+    if workers != 1:
+        try:
+            executor = ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count()
+            )
+        except (OSError, NotImplementedError) as error_msg:
+            log.warning("Hashing passwords serially: %s", error_msg)
+
+    try:
+        yield executor
+    finally:
+        if executor:
+            executor.shutdown()
+
+
+def generate_password_hashes(
+    passwords: list[str], executor: Executor | None = None
+) -> list[str]:
+    """
+    Generate the hashes of a batch of passwords.
+
+    Argon2 hashing is CPU-bound, so the batch is spread across the processes
+    of `executor` when one is given. If the pool is not usable, the passwords
+    are hashed serially.
+
+    Args:
+        passwords (list[str]): The plain text passwords to hash.
+        executor (Executor | None): The process pool created with
+          `password_hash_executor`. Defaults to None (serial hashing).
+
+    Returns:
+        list[str]: The hashed passwords, in the same order.
+    """
+    if executor is not None and len(passwords) > 1:
+        try:
+            return list(executor.map(generate_password_hash, passwords))
+        except (BrokenProcessPool, OSError) as error_msg:
+            get_logger().warning("Hashing passwords serially: %s", error_msg)
+
+    return [generate_password_hash(password) for password in passwords]
+
+
 def verify_password(password_plain: str, password_hash: str) -> bool:
     """Verify if a plain text password matches a hashed password.
 
@@ -47,6 +154,55 @@ def verify_password(password_plain: str, password_hash: str) -> bool:
     return result
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """
+    Check if a hashed password is weaker than the configured Argon2 settings.
+
+    Hashes with fewer iterations or less memory than ARGON2_TIME_COST and
+    ARGON2_MEMORY_COST need an upgrade. Stronger hashes, e.g. verified on a
+    host using the "batch" profile, are left as they are.
+
+    Args:
+        password_hash (str): The hashed password.
+
+    Returns:
+        bool: True if the password should be hashed again, False otherwise.
+    """
+    try:
+        parameters = extract_parameters(password_hash)
+    except InvalidHashError:
+        return True
+
+    return (
+        parameters.type is not Type.ID
+        or parameters.time_cost < ARGON2_TIME_COST
+        or parameters.memory_cost < ARGON2_MEMORY_COST
+    )
+
+
+def verify_and_update_password(
+    password_plain: str, password_hash: str
+) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password and hash it again if its hash needs an upgrade.
+
+    Args:
+        password_plain (str): The plain text password to verify.
+        password_hash (str): The hashed password to compare against.
+
+    Returns:
+        tuple[bool, Optional[str]]: Whether the password matches, and its new
+          hash if it matches and `password_needs_rehash`, None otherwise.
+    """
+    if not verify_password(password_plain, password_hash):
+        return False, None
+
+    if password_needs_rehash(password_hash):
+        return True, generate_password_hash(password_plain)
+
+    return True, None
+
+
 def generate_simple_password(size: int = 8) -> str:
     """
     Generate a simple password consisting of random letters and digits.
@@ -0,0 +1,68 @@
+"""dundie db subcommand integration test."""
+
+import pytest
+from click.testing import CliRunner
+
+from dundie import database
+from dundie.cli import main
+from dundie.settings import DATABASE_REVISION
+
+
+@pytest.fixture
+def runner():
+    """
+    Create and return a new instance of CliRunner.
+
+    Returns:
+        CliRunner: An instance of the CliRunner class.
+    """
+    return CliRunner()
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_db_init_command(runner, monkeypatch):
+    """
+    Test the 'db init' command stamps a new database once.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+        monkeypatch (MonkeyPatch): The monkeypatch fixture, used to drop the
+          test database engine, whose tables are not stamped.
+    """
+    monkeypatch.setattr(database, "engine", None)
+
+    result = runner.invoke(main, ["db", "init"])
+
+    assert result.exit_code == 0
+    assert f"Database initialized at revision {DATABASE_REVISION}" in (
+        result.output
+    )
+
+    result = runner.invoke(main, ["db", "init"])
+
+    assert result.exit_code == 0
+    assert "Database already initialized" in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_negative_command_on_uninitialized_database(runner, monkeypatch):
+    """
+    Test that a command on a database that is not initialized fails with an\
+    error message instead of a traceback.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+        monkeypatch (MonkeyPatch): The monkeypatch fixture, used to drop the
+          test database engine.
+    """
+    monkeypatch.setattr(database, "engine", None)
+
+    result = runner.invoke(main, ["show"])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert "run 'dundie db init'" in result.output
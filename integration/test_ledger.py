@@ -0,0 +1,73 @@
+"""dundie ledger subcommand integration test."""
+
+import gzip
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from click.testing import CliRunner
+
+from dundie.cli import load, main, reconcile
+from dundie.settings import DATE_FORMAT
+
+from .constants import EMPLOYEES_FILE
+
+
+@pytest.fixture
+def runner():
+    """
+    Create and return a new instance of CliRunner.
+
+    Returns:
+        CliRunner: An instance of the CliRunner class.
+    """
+    return CliRunner()
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_ledger_compact_command(runner):
+    """
+    Test the 'ledger compact' command folds and archives the transactions.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+    """
+    runner.invoke(load, EMPLOYEES_FILE)
+    # The date has a resolution of seconds
+    time.sleep(1)
+    before = datetime.now().strftime(DATE_FORMAT)
+
+    result = runner.invoke(
+        main,
+        ["ledger", "compact", "--before", before, "--archive", "ledger.csv.gz"],
+    )
+
+    assert result.exit_code == 0
+    assert "Compacted 6 transactions of 6 employees" in result.output
+    assert "Archived to ledger.csv.gz" in result.output
+    with gzip.open("ledger.csv.gz", "rt") as file:
+        assert len(file.readlines()) == 7
+
+    result = runner.invoke(reconcile)
+
+    assert "All balances match the ledger" in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_negative_ledger_compact_command_future_date(runner):
+    """
+    Test the 'ledger compact' command rejects a date in the future.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+    """
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    result = runner.invoke(main, ["ledger", "compact", "--before", tomorrow])
+
+    assert result.exit_code != 0
+    assert "Cannot compact the ledger after the current date" in result.output
@@ -58,3 +58,39 @@ def test_negative_wrong_command(runner, wrong_command):
     assert output.exit_code != 0
 
     assert f"No such command '{wrong_command}'." in output.output
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_load_command_bulk(runner):
+    """
+    Test the 'load --bulk' command reports the import throughput.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+    """
+    result = runner.invoke(load, [EMPLOYEES_FILE, "--bulk", "--chunk-size", 2])
+
+    assert result.exit_code == 0
+    assert "Dunder Mifflin Employees" in result.output
+    assert "Loaded 6 rows in" in result.output
+    assert "rows/s" in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_load_command_stream(runner):
+    """
+    Test the 'load --stream' command displays one table per chunk.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+    """
+    result = runner.invoke(
+        load, [EMPLOYEES_FILE, "--stream", "--chunk-size", 4]
+    )
+
+    assert result.exit_code == 0
+    assert result.output.count("Dunder Mifflin Employees") == 2
@@ -0,0 +1,78 @@
+"""dundie login and logout subcommands integration test."""
+
+from typing import Generator
+
+import pytest
+from click.testing import CliRunner
+
+from dundie.cli import load, main
+from dundie.database import get_session
+from dundie.models import Employee
+from dundie.utils.authentication import AuthenticationError
+from dundie.utils.db import add_employee
+from integration.constants import EMPLOYEES_FILE
+
+
+@pytest.fixture(autouse=True)
+def _auth(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    """Fixture to add a manager and set its credentials in the environment.
+
+    Yields:
+        None: This is a generator function that sets up the environment
+        and yields control back to the test.
+    """
+    with get_session() as session, monkeypatch.context() as ctx:
+        data = {
+            "name": "A manager",
+            "email": "manager@dm.com",
+            "role": "Manager",
+            "department": "Management",
+            "currency": "USD",
+        }
+        password = "1234"
+        employee, _ = add_employee(session, Employee(**data), password)
+        ctx.setenv("EMPLOYEE_EMAIL", employee.email)
+        ctx.setenv("EMPLOYEE_PASSWORD", password)
+        session.commit()
+        yield
+
+
+@pytest.fixture
+def runner():
+    """
+    Create and return a new instance of CliRunner.
+
+    Returns:
+        CliRunner: An instance of the CliRunner class.
+    """
+    return CliRunner()
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_login_update_logout(runner, monkeypatch):
+    """
+    Test that after 'login' the 'update' command runs without the password,
+    until 'logout' revokes the session token.
+    """
+    runner.invoke(load, EMPLOYEES_FILE)
+
+    result = runner.invoke(main, ["login"])
+    assert result.exit_code == 0
+    assert "Logged in as manager@dm.com until" in result.output
+
+    monkeypatch.delenv("EMPLOYEE_PASSWORD")
+
+    result = runner.invoke(main, ["update", "10", "--department", "Sales"])
+    assert result.exit_code == 0
+    assert "Dunder Mifflin Rewards Report" in result.output
+
+    result = runner.invoke(main, ["logout"])
+    assert result.exit_code == 0
+    assert "Logged out" in result.output
+
+    result = runner.invoke(main, ["update", "10", "--department", "Sales"])
+    assert isinstance(result.exception, AuthenticationError)
+
+    result = runner.invoke(main, ["logout"])
+    assert "Not logged in" in result.output
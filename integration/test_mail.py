@@ -0,0 +1,47 @@
+"""dundie mail subcommand integration test."""
+
+import pytest
+from click.testing import CliRunner
+
+from dundie.cli import load, main
+from dundie.utils.email import SMTPSender
+
+from .constants import EMPLOYEES_FILE
+
+
+@pytest.fixture
+def runner():
+    """
+    Create and return a new instance of CliRunner.
+
+    Returns:
+        CliRunner: An instance of the CliRunner class.
+    """
+    return CliRunner()
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_mail_flush_command(runner, monkeypatch):
+    """
+    Test the 'mail flush' command sends the emails queued by the load.
+
+    Args:
+        runner (CliRunner): A Click CliRunner instance used to invoke CLI
+          commands.
+        monkeypatch (MonkeyPatch): The monkeypatch fixture used to mock the
+          SMTP server.
+    """
+    monkeypatch.setattr(SMTPSender, "send", lambda *args: True)
+
+    runner.invoke(load, EMPLOYEES_FILE)
+
+    result = runner.invoke(main, ["mail", "flush", "--batch-size", 4])
+
+    assert result.exit_code == 0
+    assert "Sent 6 emails, 0 failed" in result.output
+    assert "emails/s" in result.output
+
+    result = runner.invoke(main, ["mail", "flush"])
+
+    assert "Sent 0 emails, 0 failed" in result.output
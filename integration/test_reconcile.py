@@ -0,0 +1,56 @@
+"""dundie reconcile subcommand integration test."""
+
+import pytest
+from click.testing import CliRunner
+from sqlmodel import select
+
+from dundie.cli import load, reconcile
+from dundie.database import get_session
+from dundie.models import Balance
+
+from .constants import EMPLOYEES_FILE
+
+
+@pytest.fixture
+def runner():
+    """
+    Create and return a new instance of CliRunner.
+
+    Returns:
+        CliRunner: An instance of the CliRunner class.
+    """
+    return CliRunner()
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_reconcile_without_mismatch(runner):
+    """Test the 'reconcile' command when every balance matches the ledger."""
+    runner.invoke(load, EMPLOYEES_FILE)
+
+    result = runner.invoke(reconcile)
+
+    assert result.exit_code == 0
+    assert "All balances match the ledger" in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_reconcile_fix_mismatch(runner):
+    """Test the 'reconcile --fix' command repairs a tampered balance."""
+    runner.invoke(load, EMPLOYEES_FILE)
+
+    with get_session() as session:
+        balance = session.exec(select(Balance)).first()
+        balance.value = 0
+        session.add(balance)
+        session.commit()
+
+    result = runner.invoke(reconcile, ["--fix"])
+
+    assert result.exit_code == 0
+    assert "Dunder Mifflin Balance Reconciliation" in result.output
+
+    result = runner.invoke(reconcile)
+
+    assert "All balances match the ledger" in result.output
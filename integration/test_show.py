@@ -1,11 +1,14 @@
 """dundie show subcommand integration test."""
 
+import csv
 import json
+from decimal import Decimal
 
 import pytest
 from click.testing import CliRunner
 
 from dundie.cli import load, main, show
+from dundie.utils.exchange import USDRate
 
 from .constants import EMPLOYEES_FILE
 
@@ -210,3 +213,175 @@ def test_positive_show_output_to_file_format_json(runner, tmp_path):
     assert len(content) > 0
     assert "email" in content[0]
     assert "department" in content[0]
+
+
+def test_positive_show_refresh_rates(runner, monkeypatch):
+    """
+    Test that the 'show' command only refreshes the cached exchange rates\
+    when the '--refresh-rates' flag is given.
+    """
+    calls = []
+
+    def mock_get_exchange_rates(currencies, refresh=False):
+        calls.append(refresh)
+        return {currency: USDRate(ask=Decimal(1)) for currency in currencies}
+
+    monkeypatch.setattr(
+        "dundie.core.get_exchange_rates", mock_get_exchange_rates
+    )
+    runner.invoke(load, EMPLOYEES_FILE)
+
+    result = runner.invoke(show)
+    assert result.exit_code == 0
+
+    result = runner.invoke(show, ["--refresh-rates"])
+    assert result.exit_code == 0
+
+    assert calls == [False, True]
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_show_format_ndjson(runner, monkeypatch):
+    """
+    Test that the 'show' command streams one JSON object per line with\
+    '--format ndjson', without building the full report.
+    """
+
+    def mock_read(**query):
+        raise AssertionError("The report should be streamed")
+
+    runner.invoke(load, EMPLOYEES_FILE)
+    monkeypatch.setattr("dundie.core.read", mock_read)
+
+    result = runner.invoke(main, ["show", "--format", "ndjson"])
+
+    assert result.exit_code == 0
+    assert "Dunder Mifflin Rewards Report" not in result.output
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert len(rows) > 1
+    assert "jim@dundermifflin.com" in [row["email"] for row in rows]
+    assert all(row["balance"].count(".") == 1 for row in rows)
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_show_output_to_file_format_csv(runner, tmp_path):
+    """Test that the 'show' command writes a CSV file with '--format csv'."""
+    runner.invoke(load, EMPLOYEES_FILE)
+    file_path = tmp_path / "output.csv"
+
+    result = runner.invoke(
+        main,
+        [
+            "show",
+            "--department",
+            "Sales",
+            "--file",
+            file_path,
+            "--format",
+            "csv",
+        ],
+    )
+
+    assert result.exit_code == 0
+    with open(file_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) > 0
+    assert {row["department"] for row in rows} == {"Sales"}
+    assert list(rows[0]) == [
+        "name",
+        "email",
+        "role",
+        "department",
+        "balance",
+        "currency",
+        "total",
+        "last_transaction",
+    ]
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_show_format_ndjson_with_no_results(runner):
+    """Test that the 'show' command streams nothing when there are no rows."""
+    result = runner.invoke(main, ["show", "--format", "ndjson"])
+
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_show_pages(runner):
+    """
+    Test that the 'show' command shows a page of employees with '--limit'\
+    and the next one with '--after'.
+    """
+    runner.invoke(load, EMPLOYEES_FILE)
+
+    result = runner.invoke(
+        main, ["show", "--sort", "email", "--limit", "2", "--format", "json"]
+    )
+    assert result.exit_code == 0
+    first = json.loads(result.output)
+    assert len(first) == 2
+
+    result = runner.invoke(
+        main,
+        [
+            "show",
+            "--sort",
+            "email",
+            "--limit",
+            "2",
+            "--after",
+            first[-1]["email"],
+        ],
+    )
+    assert result.exit_code == 0
+    assert first[0]["email"] not in result.output
+    assert "Next page: --after" in result.output
+
+    emails = [row["email"] for row in first]
+    assert emails == sorted(emails)
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_positive_show_fields(runner, tmp_path):
+    """Test that the 'show' command shows only the '--fields' requested."""
+    runner.invoke(load, EMPLOYEES_FILE)
+    file_path = tmp_path / "output.csv"
+
+    result = runner.invoke(
+        main,
+        [
+            "show",
+            "--fields",
+            "email, balance",
+            "--format",
+            "csv",
+            "--file",
+            file_path,
+        ],
+    )
+    assert result.exit_code == 0
+    with open(file_path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ["email", "balance"]
+
+    result = runner.invoke(main, ["show", "--fields", "name,role"])
+    assert result.exit_code == 0
+    assert "Role" in result.output
+    assert "Email" not in result.output
+
+
+@pytest.mark.integration
+@pytest.mark.medium
+def test_negative_show_invalid_fields(runner):
+    """Test that the 'show' command rejects unknown fields."""
+    result = runner.invoke(main, ["show", "--fields", "email,password"])
+
+    assert result.exit_code == 2
+    assert "password" in result.output
@@ -0,0 +1,88 @@
+"""dundie CLI startup time integration test.
+
+The commands are run in a new interpreter with `python -X importtime`, which
+reports the time spent importing every module.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+
+# Import time budgets in microseconds, well above the measured times to
+# absorb slow machines.
+HELP_BUDGET = 500_000
+SHOW_BUDGET = 2_000_000
+
+# Modules only the commands that need them may load
+HEAVY_MODULES = {"sqlalchemy", "sqlmodel", "httpx", "pwdlib"}
+
+
+def importtime(*args: str) -> tuple[int, set[str]]:
+    """
+    Run the dundie CLI with `-X importtime`.
+
+    Args:
+        *args (str): The arguments of the CLI.
+
+    Returns:
+        tuple[int, set[str]]: The total import time in microseconds and the
+          names of the imported modules.
+    """
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "dundie", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    total, modules = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        # Nested imports are already part of the cumulative time of the top
+        # level import, which is indented by a single space.
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total, modules
+
+
+def top_level(modules: set[str]) -> set[str]:
+    """Return the top level packages of the given modules."""
+    return {module.split(".")[0] for module in modules}
+
+
+@pytest.mark.integration
+@pytest.mark.low
+@pytest.mark.parametrize("option", ["--help", "--version"])
+def test_startup_help_and_version(option):
+    """
+    Test that `--help` and `--version` stay within the startup budget and do
+    not import the database, HTTP or hashing libraries.
+    """
+    total, modules = importtime(option)
+
+    assert total < HELP_BUDGET
+    assert not top_level(modules) & HEAVY_MODULES
+
+
+@pytest.mark.integration
+@pytest.mark.low
+def test_startup_show():
+    """
+    Test that `show` stays within the startup budget and does not import
+    httpx when no exchange rate has to be fetched.
+    """
+    importtime("db", "init")
+    total, modules = importtime("show")
+
+    assert total < SHOW_BUDGET
+    assert "httpx" not in top_level(modules)
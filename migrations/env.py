@@ -1,16 +1,25 @@
 """Alembic environment configuration."""
 
+import os
 from logging.config import fileConfig
 
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
 from dundie import models
+from dundie.settings import SQL_CONNECTION_STRING
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
+# Migrate the database set in DUNDIE_DATABASE_URL, like the application does,
+# instead of the SQLite database of the .ini file.
+if os.getenv("DUNDIE_DATABASE_URL"):
+    config.set_main_option(
+        "sqlalchemy.url", SQL_CONNECTION_STRING.replace("%", "%%")
+    )
+
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -66,8 +75,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # Commit each migration on its own, as data migrations such as
+        # hash_passwords commit in chunks.
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -4,15 +4,28 @@ Revision ID: 29e650e071c8
 Revises: 1fd825cb0401
 Create Date: 2025-05-06 16:32:57.083946
 
+The plain text passwords are read in chunks, hashed with a process pool and
+written back with one transaction per chunk, so an interrupted upgrade keeps
+the chunks already hashed and resumes from the next one. The chunk size, the
+number of worker processes and the verification of the new hashes can be set
+with Alembic's -x arguments, e.g.
+`alembic -x chunk_size=1000 -x workers=4 -x verify=true upgrade head`.
+
 """
 
 from typing import Sequence, Union
 
-from alembic import op
-from sqlmodel import Session, select
+from alembic import context, op
+from sqlalchemy import Engine, bindparam, update
+from sqlmodel import select
 
 from dundie.models import User
-from dundie.utils.user import generate_password_hash, verify_password
+from dundie.settings import LOAD_CHUNK_SIZE, PASSWORD_HASH_WORKERS
+from dundie.utils.user import (
+    generate_password_hashes,
+    password_hash_executor,
+    verify_password,
+)
 
 # revision identifiers, used by Alembic.
 revision: str = "29e650e071c8"
@@ -21,23 +34,96 @@ branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+def hash_passwords(
+    engine: Engine,
+    chunk_size: int = LOAD_CHUNK_SIZE,
+    workers: int = PASSWORD_HASH_WORKERS,
+    verify: bool = False,
+) -> int:
+    """
+    Hash the plain text passwords, committing after each chunk.
+
+    A password changed while its chunk was being hashed is left untouched.
+
+    Args:
+        engine (Engine): The engine of the database to migrate.
+        chunk_size (int): The number of passwords hashed per transaction.
+          Defaults to LOAD_CHUNK_SIZE.
+        workers (int): The number of processes hashing passwords. 0 uses all
+          the CPU cores and 1 hashes serially. Defaults to
+          PASSWORD_HASH_WORKERS.
+        verify (bool): Whether to verify every new hash before saving it.
+          Defaults to False.
+
+    Returns:
+        int: The number of passwords hashed.
+
+    Raises:
+        RuntimeError: If `verify` is set and a new hash does not match its
+          password.
+    """
+    statement = (
+        update(User)
+        .where(
+            User.id == bindparam("user_id"),  # type: ignore
+            User.password == bindparam("plain_password"),  # type: ignore
+        )
+        .values(password=bindparam("hashed_password"))
+    )
+
+    hashed = 0
+    last_id = 0
+    with password_hash_executor(workers) as executor:
+        while True:
+            with engine.connect() as connection:
+                rows = connection.execute(
+                    select(User.id, User.password)
+                    .where(
+                        ~User.password.like("$argon%"),  # type: ignore
+                        User.id > last_id,  # type: ignore
+                    )
+                    .order_by(User.id)  # type: ignore
+                    .limit(chunk_size)
+                ).all()
+            if not rows:
+                return hashed
+
+            passwords = [row.password for row in rows]
+            hashed_passwords = generate_password_hashes(passwords, executor)
+            if verify and not all(
+                map(verify_password, passwords, hashed_passwords)
+            ):
+                raise RuntimeError("A new password hash does not match.")
+
+            with engine.begin() as connection:
+                connection.execute(
+                    statement,
+                    [
+                        {
+                            "user_id": row.id,
+                            "plain_password": row.password,
+                            "hashed_password": hashed_password,
+                        }
+                        for row, hashed_password in zip(rows, hashed_passwords)
+                    ],
+                )
+            last_id = rows[-1].id
+            hashed += len(rows)
+
+
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    conn = op.get_bind()
-    session = Session(bind=conn)
-    users = session.exec(
-        select(User).where(~User.password.like("$argon%"))  # type: ignore
-    ).all()
-    for user in users:
-        plain_password = user.password
-        hashed_password = generate_password_hash(plain_password)
-        if verify_password(plain_password, hashed_password):
-            user.password = hashed_password
-            session.add(user)
-    session.commit()
-    # ### end Alembic commands ###
-    # ### commands auto generated by Alembic - please adjust! ###
+    x_arguments = context.get_x_argument(as_dictionary=True)
+
+    # Commit the previous migrations, then let each chunk commit on its own.
+    with op.get_context().autocommit_block():
+        hash_passwords(
+            op.get_bind().engine,
+            chunk_size=int(x_arguments.get("chunk_size", LOAD_CHUNK_SIZE)),
+            workers=int(x_arguments.get("workers", PASSWORD_HASH_WORKERS)),
+            verify=x_arguments.get("verify", "false").lower()
+            in ("1", "true", "yes"),
+        )
 
 
 def downgrade() -> None:
@@ -0,0 +1,117 @@
+"""Add 'balance' last transaction columns.
+
+Revision ID: b7f3e1a94c20
+Revises: 5d7e1b3c9a42
+Create Date: 2026-10-18 07:14:10.598493
+
+The date of the last transaction and the number of transactions of each
+employee are backfilled from the ledger in chunks of balances, with one
+transaction per chunk, so an interrupted upgrade can be run again. The chunk
+size can be set with Alembic's -x arguments, e.g.
+`alembic -x chunk_size=1000 upgrade head`.
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy import Engine, update
+from sqlmodel import func, select
+
+from dundie.models import Balance, Transaction
+from dundie.settings import LOAD_CHUNK_SIZE
+
+# revision identifiers, used by Alembic.
+revision: str = "b7f3e1a94c20"
+down_revision: Union[str, None] = "5d7e1b3c9a42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def backfill_balances(engine: Engine, chunk_size: int = LOAD_CHUNK_SIZE) -> int:
+    """
+    Backfill the last transaction columns of the balances, committing after\
+    each chunk.
+
+    Args:
+        engine (Engine): The engine of the database to migrate.
+        chunk_size (int): The number of balances updated per transaction.
+          Defaults to LOAD_CHUNK_SIZE.
+
+    Returns:
+        int: The number of balances backfilled.
+    """
+    ledger = Transaction.employee_id == Balance.employee_id
+    statement = update(Balance).values(
+        last_transaction_at=select(func.max(Transaction.date))
+        .where(ledger)
+        .scalar_subquery(),
+        transaction_count=select(func.count())
+        .select_from(Transaction)
+        .where(ledger)
+        .scalar_subquery(),
+    )
+
+    backfilled = 0
+    last_id = 0
+    while True:
+        with engine.begin() as connection:
+            employee_ids = (
+                connection.execute(
+                    select(Balance.employee_id)
+                    .where(Balance.employee_id > last_id)  # type: ignore
+                    .order_by(Balance.employee_id)  # type: ignore
+                    .limit(chunk_size)
+                )
+                .scalars()
+                .all()
+            )
+            if not employee_ids:
+                return backfilled
+
+            connection.execute(
+                statement.where(
+                    Balance.employee_id.between(  # type: ignore
+                        employee_ids[0], employee_ids[-1]
+                    )
+                )
+            )
+        last_id = employee_ids[-1]
+        backfilled += len(employee_ids)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column(
+        "balance",
+        sa.Column("last_transaction_at", sa.DateTime(), nullable=True),
+    )
+    op.add_column(
+        "balance",
+        sa.Column(
+            "transaction_count",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+    )
+    # ### end Alembic commands ###
+
+    x_arguments = context.get_x_argument(as_dictionary=True)
+
+    # Commit the new columns, then let each chunk commit on its own.
+    with op.get_context().autocommit_block():
+        backfill_balances(
+            op.get_bind().engine,
+            chunk_size=int(x_arguments.get("chunk_size", LOAD_CHUNK_SIZE)),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column("balance", "transaction_count")
+    op.drop_column("balance", "last_transaction_at")
+    # ### end Alembic commands ###
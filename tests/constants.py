@@ -11,7 +11,10 @@ TEST_LOG_FILE: str = "test_dundie.log"
 
 DATABASE_SCHEMA: Dict[str, Dict[str, Any]] = {
     "balance": {},
+    "balance_snapshot": {},
     "employee": {},
+    "outbox": {},
+    "token": {},
     "transaction": {},
     "user": {},
 }
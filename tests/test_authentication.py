@@ -0,0 +1,283 @@
+"""dundie authentication unit test."""
+
+import os
+import stat
+from typing import Generator
+
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import select
+
+from dundie.core import login, logout
+from dundie.database import get_session
+from dundie.models import Employee, Token, User
+from dundie.settings import TOKEN_PATH
+from dundie.utils import authentication, user
+from dundie.utils.authentication import (
+    AuthenticationError,
+    issue_token,
+    parse_token,
+    read_token,
+    require_authentication,
+    verify_token,
+)
+from dundie.utils.db import add_employee, add_transactions
+from dundie.utils.user import create_password_hash, verify_password
+
+from .constants import SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA
+
+PASSWORD = "1234"
+
+
+@require_authentication
+def whoami(from_employee: Employee) -> str:
+    """Return the email of the authenticated employee."""
+    return from_employee.email
+
+
+@require_authentication
+def authenticated(from_employee: Employee) -> Employee:
+    """Return the authenticated employee."""
+    return from_employee
+
+
+@require_authentication(history=True)
+def authenticated_with_history(from_employee: Employee) -> Employee:
+    """Return the authenticated employee, with its transactions."""
+    return from_employee
+
+
+@pytest.fixture(autouse=True)
+def _auth(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    """Fixture to add an employee and set its credentials in the environment.
+
+    Yields:
+        None: This is a generator function that sets up the environment
+        and yields control back to the test.
+    """
+    with get_session() as session, monkeypatch.context() as ctx:
+        employee = Employee(**SALES_ASSOCIATE_DATA)
+        add_employee(session, employee, PASSWORD)
+        session.commit()
+        ctx.setenv("EMPLOYEE_EMAIL", SALES_ASSOCIATE_DATA["email"])
+        ctx.setenv("EMPLOYEE_PASSWORD", PASSWORD)
+        yield
+
+
+def _forbid_password(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Remove the password from the environment and forbid verifying it."""
+
+    def mock_verify_password(*args: str) -> tuple:
+        raise AssertionError("The password should not be verified")
+
+    monkeypatch.delenv("EMPLOYEE_PASSWORD")
+    monkeypatch.setattr(
+        authentication, "verify_and_update_password", mock_verify_password
+    )
+
+
+@pytest.mark.unit
+def test_positive_login_saves_token():
+    """Test that login saves a token readable only by the current user."""
+    result = login()
+
+    assert result["email"] == SALES_ASSOCIATE_DATA["email"]
+    assert read_token()
+    assert stat.S_IMODE(os.stat(TOKEN_PATH).st_mode) == 0o600
+
+
+@pytest.mark.unit
+def test_positive_token_authentication(monkeypatch):
+    """Test that a logged in employee is authenticated without password."""
+    login()
+    _forbid_password(monkeypatch)
+
+    assert whoami() == SALES_ASSOCIATE_DATA["email"]
+
+
+@pytest.mark.unit
+def test_positive_credentials_of_another_employee_override_token(
+    monkeypatch,
+):
+    """
+    Test that the credentials of another employee in the environment take
+    precedence over the session token.
+    """
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_MANAGER_DATA), PASSWORD)
+        session.commit()
+    login()
+    monkeypatch.setenv("EMPLOYEE_EMAIL", SALES_MANAGER_DATA["email"])
+
+    assert whoami() == SALES_MANAGER_DATA["email"]
+
+    monkeypatch.delenv("EMPLOYEE_PASSWORD")
+    with pytest.raises(AuthenticationError, match="not for"):
+        whoami()
+
+
+@pytest.mark.unit
+def test_negative_forged_token():
+    """Test that a token with a wrong signature is rejected."""
+    login()
+    token_id, expires, signature = read_token().split(".")
+
+    with get_session() as session:
+        assert verify_token(session, f"{token_id}.{expires}.{signature}")
+        assert not verify_token(session, f"{token_id}.{expires}.{'0' * 64}")
+        assert not verify_token(session, f"{token_id}.{int(expires) + 60}.")
+        assert not verify_token(session, "not a token")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("expires", ["9" * 30, "-" + "9" * 30, "1e3", "é"])
+def test_negative_corrupted_token(expires: str):
+    """Test that a token with an invalid expiration is rejected."""
+    payload = f"token.{expires}"
+
+    assert parse_token(f"{payload}.{'0' * 64}") is None
+    assert parse_token(f"{payload}.{authentication.sign(payload)}") is None
+    assert parse_token(f"{payload}.signé") is None
+
+
+@pytest.mark.unit
+def test_negative_expired_token(monkeypatch):
+    """Test that an expired token is rejected."""
+    monkeypatch.setattr(authentication, "TOKEN_TTL", -1)
+
+    with get_session() as session:
+        employee = session.exec(select(Employee)).first()
+        token, _ = issue_token(session, employee)
+        session.commit()
+
+        assert not verify_token(session, token)
+
+
+@pytest.mark.unit
+def test_negative_revoked_token(monkeypatch):
+    """Test that logout revokes the token in the database."""
+    login()
+    _forbid_password(monkeypatch)
+    token = read_token()
+
+    assert logout() is True
+    assert read_token() is None
+    assert logout() is False
+
+    with get_session() as session:
+        assert not verify_token(session, token)
+        assert session.exec(select(Token)).one().revoked
+
+    authentication.save_token(token)
+    with pytest.raises(AuthenticationError, match="dundie login"):
+        whoami()
+
+
+@pytest.mark.unit
+def test_positive_login_revokes_previous_token():
+    """Test that logging in again revokes the previous token."""
+    login()
+    first = read_token()
+    login()
+
+    with get_session() as session:
+        assert not verify_token(session, first)
+        assert verify_token(session, read_token())
+
+
+@pytest.mark.unit
+def test_positive_secret_key_from_environment(monkeypatch):
+    """Test that DUNDIE_SECRET_KEY signs the tokens when it is set."""
+    login()
+    token = read_token()
+
+    monkeypatch.setenv("DUNDIE_SECRET_KEY", "another key")
+
+    with get_session() as session:
+        assert not verify_token(session, token)
+
+
+def _add_history(transactions: int) -> None:
+    """Give the authenticated employee a history of transactions."""
+    with get_session() as session:
+        employee = session.exec(select(Employee)).one()
+        for _ in range(transactions):
+            add_transactions(session, [(employee.id, 1)], "History")
+        session.commit()
+
+
+@pytest.mark.unit
+def test_positive_authentication_skips_transaction_history(sql_statements):
+    """
+    Test that authenticating loads the employee, its password and its\
+    balance, but not its transactions.
+    """
+    _add_history(50)
+
+    with sql_statements() as statements:
+        employee = authenticated()
+
+    assert len(statements) == 1
+    assert '"transaction"' not in statements[0]
+    assert "transaction" in inspect(employee).unloaded
+    assert employee.balance.value == 550
+    assert employee.user.password
+
+
+@pytest.mark.unit
+def test_positive_authentication_cost_is_independent_of_history(
+    sql_statements,
+):
+    """
+    Test that authenticating executes the same statements with or without\
+    transactions.
+    """
+    with sql_statements() as without_history:
+        authenticated()
+
+    _add_history(200)
+    with sql_statements() as with_history:
+        authenticated()
+
+    assert with_history == without_history
+
+
+@pytest.mark.unit
+def test_positive_authentication_with_history(monkeypatch):
+    """Test that history=True also loads the employee's transactions."""
+    login()
+    _forbid_password(monkeypatch)
+
+    employee = authenticated_with_history()
+
+    assert "transaction" not in inspect(employee).unloaded
+    assert len(employee.transaction) == 1
+
+
+@pytest.mark.unit
+def test_positive_authentication_rehashes_weak_password(monkeypatch):
+    """
+    Test that authenticating replaces a hash weaker than the Argon2 settings\
+    and keeps a hash that is not.
+    """
+    weak_hash = create_password_hash(time_cost=1, memory_cost=8 * 1024).hash(
+        PASSWORD
+    )
+    with get_session() as session:
+        employee_user = session.exec(select(User)).one()
+        employee_user.password = weak_hash
+        session.add(employee_user)
+        session.commit()
+
+    assert whoami() == SALES_ASSOCIATE_DATA["email"]
+
+    with get_session() as session:
+        upgraded_hash = session.exec(select(User.password)).one()
+    assert upgraded_hash != weak_hash
+    assert not user.password_needs_rehash(upgraded_hash)
+    assert verify_password(PASSWORD, upgraded_hash)
+
+    assert whoami() == SALES_ASSOCIATE_DATA["email"]
+
+    with get_session() as session:
+        assert session.exec(select(User.password)).one() == upgraded_hash
@@ -0,0 +1,289 @@
+"""dundie benchmark test.
+
+The benchmarks are slow and skipped by default. Set the number of
+transaction rows in the DUNDIE_BENCHMARK_ROWS environment variable, the
+number of writer processes in DUNDIE_BENCHMARK_WRITERS, or the number of
+passwords hashed per Argon2 profile in DUNDIE_BENCHMARK_HASHES, to run them,
+e.g. `DUNDIE_BENCHMARK_ROWS=10000000 pytest tests/test_benchmark.py -s`.
+"""
+
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Dict, Iterator
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, create_engine, select
+
+from dundie import models
+from dundie.database import create_db_engine
+from dundie.models import Balance, Employee, User
+from dundie.settings import ARGON2_PROFILES, SQLITE_PRAGMAS
+from dundie.utils.authentication import get_employee
+from dundie.utils.db import add_transactions
+from dundie.utils.user import create_password_hash
+
+BENCHMARK_ROWS = int(os.getenv("DUNDIE_BENCHMARK_ROWS", "0"))
+BENCHMARK_WRITERS = int(os.getenv("DUNDIE_BENCHMARK_WRITERS", "0"))
+BENCHMARK_HASHES = int(os.getenv("DUNDIE_BENCHMARK_HASHES", "0"))
+EMPLOYEES = 10_000
+LOOKUPS = 50
+WRITES = 200
+
+
+def _transactions(rows: int) -> Iterator[tuple]:
+    """Generate transaction rows spread over EMPLOYEES employees."""
+    start = datetime(2020, 1, 1)
+    for index in range(rows):
+        yield (
+            index % EMPLOYEES + 1,
+            10,
+            "Benchmark",
+            "system",
+            start + timedelta(seconds=index),
+        )
+
+
+def _lookup_seconds(connection: sqlite3.Connection) -> float:
+    """Return the mean time of the last transaction lookup of an employee."""
+    employee_ids = random.Random(0).sample(range(1, EMPLOYEES + 1), LOOKUPS)
+    start = time.perf_counter()
+    for employee_id in employee_ids:
+        connection.execute(
+            'SELECT max(date) FROM "transaction" WHERE employee_id = ?',
+            (employee_id,),
+        ).fetchone()
+    return (time.perf_counter() - start) / LOOKUPS
+
+
+@pytest.mark.unit
+@pytest.mark.low
+@pytest.mark.skipif(
+    not BENCHMARK_ROWS, reason="DUNDIE_BENCHMARK_ROWS is not set"
+)
+def test_benchmark_transaction_employee_id_date_index(tmpdir):
+    """
+    Compare the cost of the last transaction lookup of an employee with and\
+    without the (employee_id, date) index.
+    """
+    database = str(tmpdir.join("benchmark.db"))
+    models.SQLModel.metadata.create_all(
+        bind=create_engine(f"sqlite:///{database}")
+    )
+
+    connection = sqlite3.connect(database)
+    connection.execute("DROP INDEX ix_transaction_employee_id_date")
+    rows = _transactions(BENCHMARK_ROWS)
+    while chunk := list(islice(rows, 100_000)):
+        connection.executemany(
+            'INSERT INTO "transaction" '
+            "(employee_id, value, description, actor, date) "
+            "VALUES (?, ?, ?, ?, ?)",
+            chunk,
+        )
+    connection.commit()
+
+    without_index = _lookup_seconds(connection)
+    connection.execute(
+        "CREATE INDEX ix_transaction_employee_id_date "
+        'ON "transaction" (employee_id, date)'
+    )
+    with_index = _lookup_seconds(connection)
+    connection.close()
+
+    print(
+        f"\nLast transaction lookup over {BENCHMARK_ROWS:,} rows: "
+        f"{without_index * 1000:.3f} ms without index, "
+        f"{with_index * 1000:.3f} ms with index"
+    )
+    assert with_index < without_index
+
+
+def _writer(url: str, pragmas: Dict[str, Any], employee_id: int) -> int:
+    """
+    Award points to an employee WRITES times, one commit each, reading the
+    balance back after every award.
+
+    Returns:
+        int: The number of writes that failed with "database is locked".
+    """
+    engine = create_db_engine(url, pragmas=pragmas)
+    locked = 0
+    for _ in range(WRITES):
+        try:
+            with Session(engine) as session:
+                add_transactions(session, [(employee_id, Decimal(1))], "Award")
+                session.commit()
+                session.exec(
+                    select(Balance.value).where(
+                        Balance.employee_id == employee_id
+                    )
+                ).one()
+        except OperationalError as error:
+            if "locked" not in str(error):
+                raise
+            locked += 1
+    engine.dispose()
+    return locked
+
+
+def _concurrent_writes(url: str, pragmas: Dict[str, Any]) -> tuple[float, int]:
+    """
+    Run BENCHMARK_WRITERS writer processes against the same database.
+
+    Returns:
+        tuple[float, int]: The writes per second and the number of writes
+          that failed with "database is locked".
+    """
+    engine = create_db_engine(url, pragmas=pragmas)
+    models.SQLModel.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        for index in range(BENCHMARK_WRITERS):
+            employee = Employee(
+                name=f"Writer {index}",
+                email=f"writer{index}@dundie.com",
+                department="Sales",
+                role="Salesman",
+            )
+            session.add(Balance(employee=employee, value=Decimal(0)))
+        session.commit()
+    engine.dispose()
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=BENCHMARK_WRITERS) as executor:
+        locked = sum(
+            executor.map(
+                _writer,
+                [url] * BENCHMARK_WRITERS,
+                [pragmas] * BENCHMARK_WRITERS,
+                range(1, BENCHMARK_WRITERS + 1),
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    writes = BENCHMARK_WRITERS * WRITES - locked
+    return writes / elapsed, locked
+
+
+@pytest.mark.unit
+@pytest.mark.low
+@pytest.mark.skipif(
+    not BENCHMARK_WRITERS, reason="DUNDIE_BENCHMARK_WRITERS is not set"
+)
+def test_benchmark_sqlite_pragmas_concurrent_writers(tmpdir):
+    """
+    Compare concurrent writer processes on the SQLite defaults and on the
+    SQLITE_PRAGMAS profile.
+    """
+    results = {
+        name: _concurrent_writes(
+            f"sqlite:///{tmpdir.join(f'{name}.db')}", pragmas
+        )
+        for name, pragmas in [("default", {}), ("tuned", SQLITE_PRAGMAS)]
+    }
+
+    for name, (rate, locked) in results.items():
+        print(
+            f"\n{BENCHMARK_WRITERS} writers, {name} pragmas: "
+            f"{rate:.1f} writes/s, {locked} 'database is locked' errors"
+        )
+    assert results["tuned"][1] == 0
+
+
+def _authentication_seconds(
+    engine: Any, history: bool, lookups: int = LOOKUPS
+) -> float:
+    """Return the mean time of loading the employee to authenticate."""
+    start = time.perf_counter()
+    for _ in range(lookups):
+        with Session(engine) as session:
+            get_employee(session, Employee.id == 1, history=history)
+    return (time.perf_counter() - start) / lookups
+
+
+@pytest.mark.unit
+@pytest.mark.low
+@pytest.mark.skipif(
+    not BENCHMARK_ROWS, reason="DUNDIE_BENCHMARK_ROWS is not set"
+)
+def test_benchmark_authentication_transaction_history(tmpdir):
+    """
+    Compare the cost of loading the employee to authenticate with no\
+    transactions and with BENCHMARK_ROWS transactions.
+    """
+    database = str(tmpdir.join("benchmark.db"))
+    engine = create_db_engine(f"sqlite:///{database}")
+    models.SQLModel.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        employee = Employee(
+            name="Benchmark",
+            email="benchmark@dundie.com",
+            department="Sales",
+            role="Salesman",
+        )
+        session.add(User(employee=employee, password="password"))
+        session.add(Balance(employee=employee, value=Decimal(0)))
+        session.commit()
+
+    empty = _authentication_seconds(engine, history=False)
+
+    connection = sqlite3.connect(database)
+    rows = ((1, *row[1:]) for row in _transactions(BENCHMARK_ROWS))
+    while chunk := list(islice(rows, 100_000)):
+        connection.executemany(
+            'INSERT INTO "transaction" '
+            "(employee_id, value, description, actor, date) "
+            "VALUES (?, ?, ?, ?, ?)",
+            chunk,
+        )
+    connection.commit()
+    connection.close()
+
+    minimal = _authentication_seconds(engine, history=False)
+    full = _authentication_seconds(engine, history=True, lookups=3)
+    engine.dispose()
+
+    print(
+        f"\nAuthentication lookup: {empty * 1000:.3f} ms with no history, "
+        f"{minimal * 1000:.3f} ms with {BENCHMARK_ROWS:,} transactions, "
+        f"{full * 1000:.3f} ms loading them"
+    )
+    assert minimal < full
+
+
+@pytest.mark.unit
+@pytest.mark.low
+@pytest.mark.skipif(
+    not BENCHMARK_HASHES, reason="DUNDIE_BENCHMARK_HASHES is not set"
+)
+def test_benchmark_argon2_profiles():
+    """Compare the cost of hashing and verifying a password per profile."""
+    results = {}
+    for name, parameters in ARGON2_PROFILES.items():
+        password_hash = create_password_hash(**parameters)
+
+        start = time.perf_counter()
+        hashes = [
+            password_hash.hash(f"password{index}")
+            for index in range(BENCHMARK_HASHES)
+        ]
+        hashing = (time.perf_counter() - start) / BENCHMARK_HASHES
+
+        start = time.perf_counter()
+        for index, hashed_password in enumerate(hashes):
+            assert password_hash.verify(f"password{index}", hashed_password)
+        verifying = (time.perf_counter() - start) / BENCHMARK_HASHES
+
+        results[name] = hashing
+        print(
+            f"\nArgon2 {name} profile {parameters}: "
+            f"{hashing * 1000:.1f} ms per hash, "
+            f"{verifying * 1000:.1f} ms per verification"
+        )
+    assert results["batch"] < results["default"]
@@ -1,28 +1,51 @@
 """dundie database unit test."""
 
+import os
 from decimal import Decimal
+from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from alembic.script import ScriptDirectory
 from pydantic import ValidationError
-from sqlmodel import MetaData, select
-
-from dundie.database import get_session
-from dundie.models import Employee
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlmodel import MetaData, Session, SQLModel, func, select, text
+
+from dundie import database
+from dundie.core import update
+from dundie.database import (
+    DatabaseSchemaError,
+    create_db_engine,
+    get_database_revision,
+    get_session,
+    init_db,
+)
+from dundie.models import Balance, Employee, Transaction, User
 from dundie.settings import (
+    DATABASE_DIR,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_REVISION,
     DEFAULT_ACTOR,
     DEFAULT_ASSOCIATE_POINTS,
     DEFAULT_MANAGER_POINTS,
+    SQLITE_PRAGMAS,
 )
 from dundie.utils.db import (
     add_employee,
     add_transaction,
+    add_transactions,
+    bulk_add_employees,
+    get_employee_ids,
+    recompute_balance,
     set_initial_balance,
     set_initial_password,
 )
 from dundie.utils.user import verify_password
 
 from .constants import (
+    CEO_DATA,
     DATABASE_SCHEMA,
     INVALID_EMAILS,
     SALES_ASSOCIATE_DATA,
@@ -508,3 +531,371 @@ def test_set_initial_password(mock_generate_password):
         result = session.exec(sql).first()
 
         assert verify_password("mocked_password", result.user.password)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "sql",
+    [
+        'SELECT max(date) FROM "transaction" WHERE employee_id = 1',
+        'SELECT sum(value) FROM "transaction" WHERE employee_id = 1',
+        'SELECT employee_id, max(date) FROM "transaction" GROUP BY employee_id',
+    ],
+)
+def test_transaction_employee_id_date_index(sql: str):
+    """
+    Test that the per-employee ledger lookups use the (employee_id, date)\
+    index instead of scanning the transaction table.
+    """
+    with get_session() as session:
+        plan = session.exec(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+
+    details = " ".join(row[-1] for row in plan)
+    assert "INDEX ix_transaction_employee_id_date" in details
+
+
+@pytest.mark.unit
+def test_sqlite_pragmas():
+    """Test that the SQLite pragmas are set on every new connection."""
+    with get_session() as session:
+        for name, value in SQLITE_PRAGMAS.items():
+            result = session.exec(text(f"PRAGMA {name}")).one()[0]
+            if name == "journal_mode":
+                assert result == value.lower()
+            elif isinstance(value, int):
+                assert result == value
+
+
+@pytest.mark.unit
+def test_sqlite_pragmas_custom(tmpdir):
+    """Test that create_db_engine accepts a custom set of pragmas."""
+    engine = create_db_engine(
+        f"sqlite:///{tmpdir.join('custom.db')}", pragmas={"busy_timeout": 42}
+    )
+    with engine.connect() as connection:
+        busy_timeout = connection.execute(text("PRAGMA busy_timeout"))
+        journal_mode = connection.execute(text("PRAGMA journal_mode"))
+
+        assert busy_timeout.scalar() == 42
+        assert journal_mode.scalar() == "delete"
+
+
+@pytest.mark.unit
+def test_database_revision_is_alembic_head():
+    """Test that DATABASE_REVISION is the head of the Alembic migrations."""
+    migrations = Path(__file__).parent.parent / "migrations"
+    script = ScriptDirectory(str(migrations))
+
+    assert script.get_current_head() == DATABASE_REVISION
+
+
+def _last_transactions() -> dict[int, tuple]:
+    """
+    Return the stored and the ledger last transaction date and number of\
+    transactions of every employee.
+
+    Returns:
+        dict[int, tuple]: The stored date and count, and the ledger date and
+          count, indexed by employee id.
+    """
+    ledger = (
+        select(
+            Transaction.employee_id,
+            func.max(Transaction.date).label("date"),
+            func.count().label("count"),
+        )
+        .group_by(Transaction.employee_id)  # type: ignore
+        .subquery()
+    )
+    with get_session() as session:
+        rows = session.exec(
+            select(
+                Balance.employee_id,
+                Balance.last_transaction_at,
+                Balance.transaction_count,
+                ledger.c.date,
+                ledger.c.count,
+            ).join(ledger, ledger.c.employee_id == Balance.employee_id)
+        )
+        return {row[0]: (row[1:3], row[3:]) for row in rows}
+
+
+@pytest.mark.unit
+def test_positive_balance_last_transaction_maintained_on_write():
+    """
+    Test that every write path keeps the last transaction date and the\
+    number of transactions of the balance in line with the ledger.
+    """
+    with get_session() as session:
+        employee = Employee(**SALES_ASSOCIATE_DATA)
+        add_employee(session, employee)
+        bulk_add_employees(
+            session,
+            [Employee(**SALES_MANAGER_DATA), Employee(**CEO_DATA)],
+            get_employee_ids(session),
+        )
+        session.commit()
+
+        add_transaction(session, employee, Decimal(10), "Updated points")
+        session.commit()
+
+        ids = sorted(get_employee_ids(session).values())
+        add_transactions(
+            session,
+            [(ids[0], Decimal(1)), (ids[0], Decimal(2)), (ids[1], Decimal(3))],
+            "Updated points",
+        )
+        session.commit()
+
+    result = _last_transactions()
+
+    assert len(result) == 3
+    for stored, ledger in result.values():
+        assert stored == ledger
+    assert [stored[1] for stored, _ in result.values()] == [4, 2, 1]
+
+
+@pytest.mark.unit
+def test_positive_recompute_balance_last_transaction():
+    """Test that recompute_balance rebuilds the last transaction columns."""
+    with get_session() as session:
+        employee = Employee(**SALES_ASSOCIATE_DATA)
+        add_employee(session, employee)
+        session.commit()
+        session.exec(
+            text(
+                "UPDATE balance SET transaction_count = 42, "
+                "last_transaction_at = NULL"
+            )
+        )
+        session.commit()
+
+        recompute_balance(session, employee)
+        session.commit()
+
+    for stored, ledger in _last_transactions().values():
+        assert stored == ledger
+
+
+@pytest.mark.unit
+def test_backfill_balances_migration():
+    """
+    Test that the migration adding the last transaction columns backfills\
+    them from the ledger, one chunk at a time.
+    """
+    with get_session() as session:
+        for data in [CEO_DATA, SALES_MANAGER_DATA, SALES_ASSOCIATE_DATA]:
+            employee = Employee(**data)
+            add_employee(session, employee)
+            add_transaction(session, employee, Decimal(1), "Updated points")
+        session.commit()
+        session.exec(
+            text(
+                "UPDATE balance SET transaction_count = 0, "
+                "last_transaction_at = NULL"
+            )
+        )
+        session.commit()
+
+    migrations = Path(__file__).parent.parent / "migrations"
+    script = ScriptDirectory(str(migrations))
+    migration = script.get_revision("b7f3e1a94c20").module
+    commits = []
+
+    def commit(connection):
+        commits.append(connection)
+
+    event.listen(database.engine, "commit", commit)
+    try:
+        backfilled = migration.backfill_balances(database.engine, chunk_size=2)
+    finally:
+        event.remove(database.engine, "commit", commit)
+
+    assert backfilled == 3
+    assert len(commits) == 3
+    for stored, ledger in _last_transactions().values():
+        assert stored == ledger
+        assert stored[1] == 2
+
+
+def _hash_passwords_migration():
+    """Return the module of the hash_passwords migration."""
+    migrations = Path(__file__).parent.parent / "migrations"
+    script = ScriptDirectory(str(migrations))
+    return script.get_revision("29e650e071c8").module
+
+
+def _add_plain_passwords() -> None:
+    """Add three employees whose passwords are stored in plain text."""
+    with get_session() as session:
+        for data in [CEO_DATA, SALES_MANAGER_DATA, SALES_ASSOCIATE_DATA]:
+            add_employee(session, Employee(**data))
+        session.commit()
+        session.exec(text("UPDATE user SET password = 'plain' || id"))
+        session.commit()
+
+
+def _plain_passwords() -> list[int]:
+    """Return the ids of the users whose password is not hashed."""
+    with get_session() as session:
+        return session.exec(
+            select(User.id).where(~User.password.like("$argon%"))
+        ).all()
+
+
+@pytest.mark.unit
+def test_hash_passwords_migration_commits_per_chunk():
+    """
+    Test that the hash_passwords migration hashes the plain text passwords\
+    with one transaction per chunk.
+    """
+    _add_plain_passwords()
+    commits = []
+
+    def commit(connection):
+        commits.append(connection)
+
+    event.listen(database.engine, "commit", commit)
+    try:
+        hashed = _hash_passwords_migration().hash_passwords(
+            database.engine, chunk_size=2, workers=1, verify=True
+        )
+    finally:
+        event.remove(database.engine, "commit", commit)
+
+    assert hashed == 3
+    assert len(commits) == 2
+    assert _plain_passwords() == []
+    with get_session() as session:
+        for user in session.exec(select(User)).all():
+            assert verify_password(f"plain{user.id}", user.password)
+
+
+@pytest.mark.unit
+def test_hash_passwords_migration_resumes(monkeypatch):
+    """
+    Test that the hash_passwords migration keeps the chunks hashed before an\
+    interruption and resumes from the next one.
+    """
+    _add_plain_passwords()
+    migration = _hash_passwords_migration()
+    generate_password_hashes = migration.generate_password_hashes
+    chunks = []
+
+    def interrupted_password_hashes(passwords, executor):
+        if chunks:
+            raise KeyboardInterrupt
+        chunks.append(passwords)
+        return generate_password_hashes(passwords, executor)
+
+    with monkeypatch.context() as ctx:
+        ctx.setattr(
+            migration, "generate_password_hashes", interrupted_password_hashes
+        )
+        with pytest.raises(KeyboardInterrupt):
+            migration.hash_passwords(database.engine, chunk_size=2, workers=1)
+
+    assert len(_plain_passwords()) == 1
+    assert migration.hash_passwords(database.engine, workers=1) == 1
+    assert _plain_passwords() == []
+
+
+@pytest.mark.unit
+def test_get_session_checks_database_revision(monkeypatch):
+    """
+    Test that the first session refuses a database that is not initialized\
+    or not at DATABASE_REVISION, instead of creating the tables.
+    """
+    monkeypatch.setattr(database, "engine", None)
+
+    with pytest.raises(DatabaseSchemaError, match="dundie db init"):
+        get_session()
+    assert database.engine is None
+
+    assert init_db() is True
+    assert init_db() is False
+
+    with get_session() as session:
+        assert session.exec(select(Employee)).all() == []
+        session.exec(text("UPDATE alembic_version SET version_num = 'old'"))
+        session.commit()
+
+    monkeypatch.setattr(database, "engine", None)
+    with pytest.raises(DatabaseSchemaError, match="alembic upgrade head"):
+        get_session()
+    with pytest.raises(DatabaseSchemaError, match="alembic upgrade head"):
+        init_db()
+
+
+@pytest.mark.unit
+def test_negative_init_db_unversioned_database(monkeypatch):
+    """
+    Test that a database with tables but no migration revision, as created\
+    before the revision was checked, is not stamped by `init_db`.
+    """
+    monkeypatch.setattr(database, "engine", None)
+    os.makedirs(DATABASE_DIR, exist_ok=True)
+    SQLModel.metadata.create_all(bind=create_db_engine())
+
+    with pytest.raises(DatabaseSchemaError, match="alembic stamp 29e650e071c8"):
+        get_session()
+    with pytest.raises(DatabaseSchemaError, match="alembic stamp 29e650e071c8"):
+        init_db()
+
+    assert get_database_revision(create_db_engine()) is None
+
+
+@pytest.mark.unit
+def test_engine_options(monkeypatch):
+    """
+    Test that server databases get a configured connection pool while SQLite\
+    keeps the default one.
+    """
+    monkeypatch.setattr(database, "DATABASE_POOL_SIZE", 20)
+    monkeypatch.setattr(database, "DATABASE_MAX_OVERFLOW", 5)
+
+    assert database.engine_options("sqlite:///assets/database.db") == {}
+    assert database.engine_options("postgresql://dundie@localhost/dundie") == {
+        "pool_size": 20,
+        "max_overflow": 5,
+        "pool_recycle": DATABASE_POOL_RECYCLE,
+        "pool_pre_ping": DATABASE_POOL_PRE_PING,
+    }
+
+
+@pytest.mark.unit
+def test_update_locks_balances_for_postgresql(monkeypatch):
+    """
+    Test that a transfer locks the balances with SELECT ... FOR UPDATE, as\
+    compiled for PostgreSQL, before checking the funds.
+    """
+    with get_session() as session:
+        for data in [SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA]:
+            add_employee(session, Employee(**data))
+        session.commit()
+        sender = session.exec(
+            select(Employee).where(
+                Employee.email == SALES_MANAGER_DATA["email"]
+            )
+        ).one()
+
+    statements = []
+    exec_ = Session.exec
+
+    def spy_exec(self, statement, *args, **kwargs):
+        statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return exec_(self, statement, *args, **kwargs)
+
+    monkeypatch.setattr(Session, "exec", spy_exec)
+
+    assert (
+        update.__wrapped__(
+            10, from_employee=sender, email=SALES_ASSOCIATE_DATA["email"]
+        )
+        == ""
+    )
+
+    locks = [sql for sql in statements if sql.endswith("FOR UPDATE")]
+    assert len(locks) == 2
+    assert all("FROM balance" in sql for sql in locks)
+    assert "ORDER BY balance.employee_id" in locks[0]
@@ -0,0 +1,96 @@
+"""dundie email unit test."""
+
+import socket
+
+import pytest
+
+from dundie.utils import email
+from dundie.utils.email import SMTPSender, send_emails
+
+SENDER = "master@dundie.com"
+
+
+@pytest.mark.unit
+def test_positive_smtp_sender_reuses_connection(smtp_server):
+    """Test that SMTPSender sends many emails on one SMTP session."""
+    handler, port = smtp_server
+    recipients = [f"employee{index}@dundie.com" for index in range(5)]
+
+    with SMTPSender(host="127.0.0.1", port=port) as smtp_sender:
+        for recipient in recipients:
+            assert smtp_sender.send(SENDER, recipient, "Subject", "Body")
+
+    assert smtp_sender.sent == 5
+    assert [rcpt_tos for _, rcpt_tos in handler.messages] == [
+        [recipient] for recipient in recipients
+    ]
+    assert len(handler.sessions) == 1
+
+
+@pytest.mark.unit
+def test_positive_smtp_sender_reconnects(smtp_server, monkeypatch):
+    """Test that SMTPSender reconnects when the connection is dropped."""
+    handler, port = smtp_server
+    monkeypatch.setattr(email.time, "sleep", lambda seconds: None)
+
+    with SMTPSender(host="127.0.0.1", port=port) as smtp_sender:
+        assert smtp_sender.send(SENDER, "jim@dundie.com", "Subject", "Body")
+        smtp_sender._server.sock.shutdown(socket.SHUT_RDWR)
+        assert smtp_sender.send(SENDER, "pam@dundie.com", "Subject", "Body")
+
+    assert len(handler.messages) == 2
+    assert len(handler.sessions) == 2
+
+
+@pytest.mark.unit
+def test_negative_smtp_sender_retries_with_backoff(monkeypatch, unused_port):
+    """Test that SMTPSender retries with an exponential backoff."""
+    sleeps: list[float] = []
+    monkeypatch.setattr(email.time, "sleep", sleeps.append)
+
+    smtp_sender = SMTPSender(
+        host="127.0.0.1", port=unused_port, max_retries=3, backoff=0.5
+    )
+
+    assert not smtp_sender.send(SENDER, "jim@dundie.com", "Subject", "Body")
+    assert sleeps == [0.5, 1.0, 2.0]
+    assert smtp_sender.sent == 0
+    assert smtp_sender.connection_failed is True
+
+
+@pytest.mark.unit
+def test_negative_smtp_sender_rejected_recipient(smtp_server, monkeypatch):
+    """
+    Test that SMTPSender does not retry an email the server rejects, nor\
+    reports it as a connection failure.
+    """
+    handler, port = smtp_server
+    handler.rejected.add("toby@dundie.com")
+    sleeps: list[float] = []
+    monkeypatch.setattr(email.time, "sleep", sleeps.append)
+
+    with SMTPSender(host="127.0.0.1", port=port) as smtp_sender:
+        assert not smtp_sender.send(SENDER, "toby@dundie.com", "Subject", "")
+        assert smtp_sender.connection_failed is False
+        assert smtp_sender.send(SENDER, "pam@dundie.com", "Subject", "Body")
+
+    assert sleeps == []
+    assert handler.messages == [(SENDER, ["pam@dundie.com"])]
+    assert len(handler.sessions) == 1
+
+
+@pytest.mark.unit
+def test_positive_send_emails(smtp_server, monkeypatch):
+    """Test that send_emails sends a batch of emails on one session."""
+    handler, port = smtp_server
+    monkeypatch.setattr(email, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(email, "SMTP_PORT", port)
+
+    result = send_emails(
+        (SENDER, f"employee{index}@dundie.com", "Subject", "Body")
+        for index in range(3)
+    )
+
+    assert result == [True, True, True]
+    assert len(handler.messages) == 3
+    assert len(handler.sessions) == 1
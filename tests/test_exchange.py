@@ -1,11 +1,20 @@
 """dundie exchange unit test."""
 
+import json
+import threading
+import time
 from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 
 import pytest
 
-from dundie.utils.exchange import get_exchange_rates
+from dundie.utils.exchange import (
+    fetch_exchange_rates,
+    get_exchange_rates,
+    load_rates_cache,
+    save_rates_cache,
+)
 
 
 @pytest.fixture
@@ -26,18 +35,18 @@ def mock_get_logger():
 @pytest.fixture
 def mock_httpx_get():
     """
-    Mock function to patch the `httpx.get` method used in the\
+    Mock function to patch the `httpx.Client.get` method used in the\
     `dundie.utils.exchange` module.
 
-    This function uses the `patch` context manager to replace the `httpx.get`
-    method with a mock object for testing purposes. It yields the mocked
-    `httpx.get` method, allowing tests to configure its behavior and assert its
-    usage.
+    This function uses the `patch` context manager to replace the
+    `httpx.Client.get` method with a mock object for testing purposes. It
+    yields the mocked `httpx.Client.get` method, allowing tests to configure
+    its behavior and assert its usage.
 
     Yields:
-        unittest.mock.MagicMock: The mocked `httpx.get` method.
+        unittest.mock.MagicMock: The mocked `httpx.Client.get` method.
     """
-    with patch("dundie.utils.exchange.httpx.get") as mock_get:
+    with patch("httpx.Client.get") as mock_get:
         yield mock_get
 
 
@@ -130,3 +139,198 @@ def test_get_exchange_rates_api_error(mock_httpx_get, mock_get_logger):
     result = get_exchange_rates(["EUR"])
     assert result["EUR"].name == "API Error"
     assert result["EUR"].value == Decimal(0)
+
+
+@pytest.fixture
+def eur_response():
+    """
+    Create a mocked API response with the USD to EUR exchange rate.
+
+    Returns:
+        unittest.mock.Mock: The mocked `httpx` response.
+    """
+    mock_response = Mock()
+    mock_response.json.return_value = {
+        "USDEUR": {
+            "code": "USD",
+            "codein": "EUR",
+            "name": "Dollar/Euro",
+            "ask": "0.85",
+        }
+    }
+    mock_response.raise_for_status = Mock()
+    return mock_response
+
+
+@pytest.mark.unit
+def test_get_exchange_rates_cached(mock_httpx_get, eur_response):
+    """
+    Test that `get_exchange_rates` does not call the API again while the\
+    cached rate is within its TTL.
+    """
+    mock_httpx_get.return_value = eur_response
+
+    first = get_exchange_rates(["EUR"])
+    second = get_exchange_rates(["EUR", "USD"])
+
+    assert mock_httpx_get.call_count == 1
+    assert second["EUR"] == first["EUR"]
+    assert second["USD"].value == Decimal(1)
+    assert load_rates_cache()["EUR"]["ask"] == "0.85"
+
+
+@pytest.mark.unit
+def test_get_exchange_rates_refresh(mock_httpx_get, eur_response):
+    """Test that `get_exchange_rates` calls the API when asked to refresh."""
+    mock_httpx_get.return_value = eur_response
+
+    get_exchange_rates(["EUR"])
+    get_exchange_rates(["EUR"], refresh=True)
+
+    assert mock_httpx_get.call_count == 2
+
+
+@pytest.mark.unit
+def test_get_exchange_rates_expired(mock_httpx_get, eur_response, monkeypatch):
+    """Test that `get_exchange_rates` calls the API once the TTL expires."""
+    mock_httpx_get.return_value = eur_response
+    monkeypatch.setattr("dundie.utils.exchange.EXCHANGE_RATES_TTL", 0)
+
+    get_exchange_rates(["EUR"])
+    get_exchange_rates(["EUR"])
+
+    assert mock_httpx_get.call_count == 2
+
+
+@pytest.mark.unit
+def test_get_exchange_rates_stale_fallback(
+    mock_httpx_get, mock_get_logger, eur_response
+):
+    """
+    Test that `get_exchange_rates` uses the stale cached rate when the API is\
+    unreachable.
+    """
+    mock_httpx_get.return_value = eur_response
+    get_exchange_rates(["EUR"])
+
+    mock_httpx_get.side_effect = Exception("API Error")
+    result = get_exchange_rates(["EUR"], refresh=True)
+
+    assert result["EUR"].name == "Dollar/Euro"
+    assert result["EUR"].value == Decimal("0.85")
+
+
+@pytest.mark.unit
+def test_load_rates_cache_invalid(tmpdir):
+    """Test that an unreadable cache file is ignored."""
+    cache_path = str(tmpdir.join("exchange_rates.json"))
+    with open(cache_path, "w") as file:
+        file.write("not json")
+
+    assert load_rates_cache(cache_path) == {}
+
+    save_rates_cache({"EUR": {"ask": "0.85", "timestamp": 0}}, cache_path)
+    assert load_rates_cache(cache_path) == {
+        "EUR": {"ask": "0.85", "timestamp": 0}
+    }
+
+
+class StubRatesHandler(BaseHTTPRequestHandler):
+    """Exchange rate API stub answering every request after a delay."""
+
+    latency = 0.2
+    batch = True
+    paths: list[str] = []
+
+    def do_GET(self):  # noqa: N802
+        """Answer with the rates of the requested comma-separated pairs."""
+        self.paths.append(self.path)
+        time.sleep(self.latency)
+
+        pairs = self.path.rsplit("/", 1)[-1].split(",")
+        if len(pairs) > 1 and not self.batch:
+            self.send_error(404)
+            return
+
+        body = json.dumps(
+            {
+                pair.replace("-", ""): {
+                    "code": "USD",
+                    "codein": pair.split("-")[1],
+                    "name": f"Dollar/{pair.split('-')[1]}",
+                    "ask": "2.5",
+                }
+                for pair in pairs
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Silence the request log."""
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    """
+    Run a local exchange rate API stub and point API_BASE_URL to it.
+
+    Yields:
+        type[StubRatesHandler]: The request handler class of the stub.
+    """
+    handler = type("Handler", (StubRatesHandler,), {"paths": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        "dundie.utils.exchange.API_BASE_URL",
+        f"http://127.0.0.1:{server.server_port}/json/last/USD-{{currency}}",
+    )
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+
+CURRENCIES = ["EUR", "BRL", "GBP", "JPY", "CAD", "AUD"]
+
+
+@pytest.mark.unit
+def test_fetch_exchange_rates_batched(stub_api):
+    """Test that all the currencies are fetched with a single request."""
+    result = fetch_exchange_rates(CURRENCIES)
+
+    assert len(stub_api.paths) == 1
+    assert sorted(result) == sorted(CURRENCIES)
+    assert all(rate.value == Decimal("2.5") for rate in result.values())
+
+
+@pytest.mark.unit
+def test_fetch_exchange_rates_concurrent(stub_api):
+    """
+    Test that, when the batched request fails, the currencies are fetched\
+    concurrently instead of one after the other.
+    """
+    stub_api.batch = False
+
+    start = time.perf_counter()
+    result = fetch_exchange_rates(CURRENCIES)
+    elapsed = time.perf_counter() - start
+
+    assert len(stub_api.paths) == len(CURRENCIES) + 1
+    assert sorted(result) == sorted(CURRENCIES)
+    # Serially it would take the latency of the batch plus one per currency
+    assert elapsed < stub_api.latency * (len(CURRENCIES) + 1) / 2
+
+
+@pytest.mark.unit
+def test_get_exchange_rates_stub_api(stub_api):
+    """Test `get_exchange_rates` against the stub and then the cache."""
+    result = get_exchange_rates(["USD", *CURRENCIES])
+    assert result["USD"].value == Decimal(1)
+    assert result["EUR"].value == Decimal("2.5")
+
+    get_exchange_rates(CURRENCIES)
+    assert len(stub_api.paths) == 1
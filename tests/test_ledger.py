@@ -0,0 +1,243 @@
+"""dundie ledger compaction unit test."""
+
+import csv
+import gzip
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlmodel import func, select
+
+from dundie.core import compact_ledger, reconcile
+from dundie.database import get_session
+from dundie.models import Balance, BalanceSnapshot, Employee, Transaction
+from dundie.settings import (
+    DATE_FORMAT,
+    DEFAULT_ASSOCIATE_POINTS,
+    DEFAULT_MANAGER_POINTS,
+)
+from dundie.utils.db import (
+    ARCHIVE_FIELDS,
+    add_employee,
+    add_transaction,
+    recompute_balance,
+)
+
+from .constants import SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA
+
+
+@pytest.fixture(autouse=True)
+def _employees() -> None:
+    """Fixture to add a set of employees to the database."""
+    with get_session() as session:
+        for data in [SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA]:
+            add_employee(session, Employee(**data))
+        session.commit()
+
+
+def _add_points(email: str, value: Decimal) -> None:
+    """Add a transaction to the employee with the given email."""
+    with get_session() as session:
+        employee = session.exec(
+            select(Employee).where(Employee.email == email)
+        ).one()
+        add_transaction(session, employee, value, "Updated points")
+        session.commit()
+
+
+def _balance(email: str) -> Balance:
+    """Return the stored balance of the employee with the given email."""
+    with get_session() as session:
+        session.expire_on_commit = False
+        return session.exec(
+            select(Balance).join(Employee).where(Employee.email == email)
+        ).one()
+
+
+@pytest.mark.unit
+def test_positive_compact_ledger() -> None:
+    """
+    Test that compacting the ledger folds the transactions into snapshots.
+
+    Asserts:
+        A snapshot is taken for each employee with the value, the number and
+        the date of the last of its transactions, the transactions are
+        deleted and the balances still match the ledger.
+    """
+    _add_points(SALES_ASSOCIATE_DATA["email"], Decimal(10))
+    before = datetime.now()
+
+    result = compact_ledger(before)
+
+    assert result == {
+        "employees": 2,
+        "transactions": 3,
+        "before": before.strftime(DATE_FORMAT),
+        "archive": None,
+    }
+    with get_session() as session:
+        snapshots = {
+            snapshot.employee_id: snapshot
+            for snapshot in session.exec(select(BalanceSnapshot))
+        }
+        assert (
+            session.exec(select(func.count()).select_from(Transaction)).one()
+            == 0
+        )
+
+    associate = _balance(SALES_ASSOCIATE_DATA["email"])
+    snapshot = snapshots[associate.employee_id]
+    assert snapshot.value == DEFAULT_ASSOCIATE_POINTS + 10
+    assert snapshot.transaction_count == 2
+    assert snapshot.last_transaction_at == associate.last_transaction_at
+    assert snapshot.taken_at == before
+    assert associate.value == DEFAULT_ASSOCIATE_POINTS + 10
+    assert reconcile() == []
+
+
+@pytest.mark.unit
+def test_positive_recompute_balance_after_compaction() -> None:
+    """
+    Test that a balance is recomputed from its latest snapshot plus the newer
+    transactions, across several compactions.
+    """
+    email = SALES_MANAGER_DATA["email"]
+    compact_ledger(datetime.now())
+    _add_points(email, Decimal(5))
+    compact_ledger(datetime.now())
+    _add_points(email, Decimal("-2.5"))
+    last_transaction_at = _balance(email).last_transaction_at
+
+    with get_session() as session:
+        employee = session.exec(
+            select(Employee).where(Employee.email == email)
+        ).one()
+        employee.balance.value = Decimal(0)
+        employee.balance.transaction_count = 0
+        session.add(employee.balance)
+
+        assert recompute_balance(session, employee) == (
+            DEFAULT_MANAGER_POINTS + Decimal("2.5")
+        )
+        session.commit()
+
+    balance = _balance(email)
+    assert balance.value == DEFAULT_MANAGER_POINTS + Decimal("2.5")
+    assert balance.transaction_count == 3
+    assert balance.last_transaction_at == last_transaction_at
+
+
+@pytest.mark.unit
+def test_positive_reconcile_after_compaction() -> None:
+    """Test that reconcile reads the snapshots and fixes a tampered balance."""
+    email = SALES_ASSOCIATE_DATA["email"]
+    compact_ledger(datetime.now())
+    _add_points(email, Decimal(1))
+
+    assert reconcile() == []
+
+    with get_session() as session:
+        employee = session.exec(
+            select(Employee).where(Employee.email == email)
+        ).one()
+        employee.balance.value = Decimal(0)
+        session.add(employee.balance)
+        session.commit()
+
+    result = reconcile(fix=True)
+
+    assert [row["ledger"] for row in result] == [DEFAULT_ASSOCIATE_POINTS + 1]
+    assert _balance(email).value == DEFAULT_ASSOCIATE_POINTS + 1
+    assert reconcile() == []
+
+
+@pytest.mark.unit
+def test_positive_compact_ledger_archive() -> None:
+    """Test that the compacted transactions are archived to a gzip CSV."""
+    with get_session() as session:
+        transactions = session.exec(
+            select(Transaction).order_by(Transaction.id)  # type: ignore
+        ).all()
+
+    compact_ledger(datetime.now(), archive="ledger.csv.gz")
+
+    with gzip.open("ledger.csv.gz", "rt", newline="") as file:
+        rows = list(csv.reader(file))
+
+    assert rows[0] == ARCHIVE_FIELDS
+    assert [row[:3] for row in rows[1:]] == [
+        [
+            str(transaction.id),
+            str(transaction.employee_id),
+            str(transaction.value),
+        ]
+        for transaction in transactions
+    ]
+
+
+@pytest.mark.unit
+def test_negative_compact_ledger_archive_exists() -> None:
+    """Test that an existing archive is not overwritten."""
+    with open("ledger.csv.gz", "w") as file:
+        file.write("data")
+
+    with pytest.raises(FileExistsError):
+        compact_ledger(datetime.now(), archive="ledger.csv.gz")
+
+    with get_session() as session:
+        assert (
+            session.exec(select(func.count()).select_from(Transaction)).one()
+            == 2
+        )
+
+
+@pytest.mark.unit
+def test_negative_compact_ledger_future_date() -> None:
+    """Test that the ledger is not compacted after the current date."""
+    with pytest.raises(ValueError):
+        compact_ledger(datetime.now() + timedelta(days=1))
+
+
+@pytest.mark.unit
+def test_negative_compact_ledger_before_last_compaction() -> None:
+    """Test that the ledger is not compacted again before a snapshot."""
+    before = datetime.now()
+    compact_ledger(before)
+
+    with pytest.raises(ValueError):
+        compact_ledger(before - timedelta(seconds=1))
+
+
+@pytest.mark.unit
+def test_negative_compact_ledger_invalid_date_keeps_no_archive() -> None:
+    """
+    Test that no archive file is left behind when the date is rejected, so
+    the compaction can be retried with the same archive.
+    """
+    with pytest.raises(ValueError):
+        compact_ledger(
+            datetime.now() + timedelta(days=1), archive="ledger.csv.gz"
+        )
+
+    assert not os.path.exists("ledger.csv.gz")
+
+    result = compact_ledger(datetime.now(), archive="ledger.csv.gz")
+
+    assert result["archive"] == "ledger.csv.gz"
+    assert os.path.exists("ledger.csv.gz")
+
+
+@pytest.mark.unit
+def test_positive_compact_ledger_empty_archive_removed() -> None:
+    """Test that no archive is written when no transaction is compacted."""
+    before = datetime.now()
+    compact_ledger(before)
+
+    result = compact_ledger(
+        before + timedelta(microseconds=1), archive="ledger.csv.gz"
+    )
+
+    assert result["transactions"] == 0
+    assert result["archive"] is None
+    assert not os.path.exists("ledger.csv.gz")
@@ -4,11 +4,21 @@ import os
 from unittest.mock import patch
 
 import pytest
-
-from dundie.core import load
-from dundie.settings import CURRENT_PATH, LOG_FILE
+from sqlmodel import select
+
+from dundie.core import iter_load, load
+from dundie.database import get_session
+from dundie.models import Employee
+from dundie.settings import (
+    CURRENT_PATH,
+    DEFAULT_ASSOCIATE_POINTS,
+    DEFAULT_MANAGER_POINTS,
+    LOG_FILE,
+)
+from dundie.utils.user import verify_password
 from tests.constants import (
     CEO_DATA,
+    EMPLOYEES_FILE,
     INVALID_EMAILS,
     SALES_ASSOCIATE_DATA,
     SALES_MANAGER_DATA,
@@ -175,3 +185,170 @@ def test_negative_load_file_not_found(mock_logger):
     mock_logger().error.assert_called_with("FileNotFoundError: File not found")
 
     assert result == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("chunk_size", [1, 2, 500])
+def test_positive_bulk_load_csv(chunk_size, workers):
+    """
+    Test that the bulk load creates the employees with their initial balance,\
+    transaction and user, whatever the chunk size and hashing workers.
+
+    Asserts:
+        Every row of the EMPLOYEES_FILE is reported as created.
+        Every employee has the initial points as balance and transaction.
+        Every employee has a hashed password.
+    """
+    result = load(
+        EMPLOYEES_FILE, bulk=True, chunk_size=chunk_size, workers=workers
+    )
+
+    assert len(result) == 6
+    assert all(row["created"] for row in result)
+
+    with get_session() as session:
+        employees = session.exec(select(Employee).order_by(Employee.id)).all()
+
+        assert [employee.email for employee in employees] == [
+            row["email"] for row in result
+        ]
+        for employee in employees:
+            expected = (
+                DEFAULT_MANAGER_POINTS
+                if employee.superuser
+                or employee.department in ["Board of Directors", "Management"]
+                else DEFAULT_ASSOCIATE_POINTS
+            )
+            assert employee.balance.value == expected
+            assert len(employee.transaction) == 1
+            assert employee.transaction[0].value == expected
+            assert employee.transaction[0].description == "Initial balance"
+            assert employee.user.password.startswith("$argon2")
+
+
+@pytest.mark.unit
+def test_positive_bulk_load_csv_updates_existing_employees():
+    """
+    Test that the bulk load updates the employees already in the database.
+
+    Asserts:
+        The second load reports every row as updated.
+        The employee data is updated and no transaction is added.
+    """
+    load(EMPLOYEES_FILE, bulk=True)
+
+    employees_file = "updated_employees.csv"
+    with (
+        open(EMPLOYEES_FILE) as source,
+        open(os.path.join(CURRENT_PATH, employees_file), "w") as file,
+    ):
+        file.write(source.read().replace("Sales,", "Paper Sales,"))
+
+    result = load(employees_file, bulk=True, chunk_size=4)
+
+    assert len(result) == 6
+    assert not any(row["created"] for row in result)
+
+    with get_session() as session:
+        employees = session.exec(
+            select(Employee).where(Employee.department == "Paper Sales")
+        ).all()
+
+        assert len(employees) == 2
+        for employee in employees:
+            assert len(employee.transaction) == 1
+
+
+@pytest.mark.unit
+def test_positive_bulk_load_csv_with_duplicated_rows():
+    """
+    Test that a row duplicated in the CSV file is created once and then\
+    updated, as in the default load mode.
+    """
+    employees_file = "duplicated_employees.csv"
+    updated_data = {**SALES_ASSOCIATE_DATA, "role": "Senior Salesman"}
+
+    with open(os.path.join(CURRENT_PATH, employees_file), "w") as file:
+        file.write(", ".join(SALES_ASSOCIATE_DATA.keys()) + "\n")
+        file.write(", ".join(SALES_ASSOCIATE_DATA.values()) + "\n")
+        file.write(", ".join(updated_data.values()) + "\n")
+
+    result = load(employees_file, bulk=True)
+
+    assert [row["created"] for row in result] == [True, False]
+
+    with get_session() as session:
+        employees = session.exec(select(Employee)).all()
+
+        assert len(employees) == 1
+        assert employees[0].role == "Senior Salesman"
+
+
+@pytest.mark.unit
+def test_negative_bulk_load_csv_with_invalid_email():
+    """
+    Test that the bulk load stops at the first invalid row and keeps the\
+    valid rows before it.
+    """
+    employees_file = "invalid_email.csv"
+    invalid_data = {**SALES_MANAGER_DATA, "email": "invalid.email"}
+
+    with open(os.path.join(CURRENT_PATH, employees_file), "w") as file:
+        file.write(", ".join(SALES_ASSOCIATE_DATA.keys()) + "\n")
+        for employee_data in [SALES_ASSOCIATE_DATA, invalid_data, CEO_DATA]:
+            file.write(", ".join(employee_data.values()) + "\n")
+
+    result = load(employees_file, bulk=True, chunk_size=2)
+
+    assert [row["email"] for row in result] == [SALES_ASSOCIATE_DATA["email"]]
+
+    with get_session() as session:
+        employees = session.exec(select(Employee)).all()
+
+        assert [employee.email for employee in employees] == [
+            SALES_ASSOCIATE_DATA["email"]
+        ]
+        assert not verify_password("", employees[0].user.password)
+
+    with open(os.path.join(CURRENT_PATH, LOG_FILE), "r") as logfile:
+        assert "has an invalid email 'invalid.email'" in logfile.read()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("bulk", [False, True])
+def test_positive_iter_load_yields_committed_chunks(bulk):
+    """
+    Test that iter_load yields one list of records per chunk, each chunk\
+    being committed before the next one is read.
+
+    Asserts:
+        The EMPLOYEES_FILE is yielded in chunks of at most `chunk_size` rows.
+        The employees of the first chunk are in the database before the
+        second chunk is requested.
+    """
+    chunks = iter_load(EMPLOYEES_FILE, bulk=bulk, chunk_size=4)
+
+    first_chunk = next(chunks)
+
+    assert len(first_chunk) == 4
+
+    with get_session() as session:
+        assert len(session.exec(select(Employee)).all()) == 4
+
+    assert [len(chunk) for chunk in chunks] == [2]
+
+    with get_session() as session:
+        assert len(session.exec(select(Employee)).all()) == 6
+
+
+@pytest.mark.unit
+def test_negative_iter_load_empty_csv():
+    """Test that iter_load yields nothing and logs an empty CSV file."""
+    empty_csv_file = "empty.csv"
+    open(os.path.join(CURRENT_PATH, empty_csv_file), "w").close()
+
+    assert list(iter_load(empty_csv_file)) == []
+
+    with open(os.path.join(CURRENT_PATH, LOG_FILE), "r") as logfile:
+        assert "Empty CSV file provided 'empty.csv'" in logfile.read()
@@ -0,0 +1,287 @@
+"""dundie mail outbox unit test."""
+
+import pytest
+from sqlmodel import select
+
+from dundie.core import flush_outbox, load
+from dundie.database import get_session
+from dundie.models import Employee, Outbox
+from dundie.settings import EMAIL_FROM, OUTBOX_MAX_ATTEMPTS, SMTP_MAX_RETRIES
+from dundie.utils import email as email_module
+from dundie.utils.db import add_employee
+from dundie.utils.email import SMTPSender
+
+from .constants import (
+    CEO_DATA,
+    EMPLOYEES_FILE,
+    SALES_ASSOCIATE_DATA,
+    SALES_MANAGER_DATA,
+)
+
+
+@pytest.fixture
+def sent_emails(monkeypatch: pytest.MonkeyPatch) -> list[tuple]:
+    """
+    Fixture to capture the emails sent by `flush_outbox`.
+
+    Yields:
+        list[tuple]: The arguments of every email sent.
+    """
+    emails: list[tuple] = []
+
+    def mock_send(self: SMTPSender, *args: str) -> bool:
+        emails.append(args)
+        return True
+
+    monkeypatch.setattr(SMTPSender, "send", mock_send)
+    return emails
+
+
+def _add_employees() -> None:
+    """Add a set of employees to the database."""
+    with get_session() as session:
+        for data in [SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA, CEO_DATA]:
+            add_employee(session, Employee(**data), "1234")
+        session.commit()
+
+
+@pytest.mark.unit
+def test_positive_add_employee_queues_email(monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that adding an employee queues the password email in the outbox\
+    instead of sending it.
+    """
+
+    def mock_send(self: SMTPSender, *args: str) -> bool:
+        raise AssertionError("No email should be sent")
+
+    monkeypatch.setattr(SMTPSender, "send", mock_send)
+
+    _add_employees()
+
+    with get_session() as session:
+        emails = session.exec(select(Outbox).order_by(Outbox.id)).all()
+
+        assert [email.recipient for email in emails] == [
+            SALES_ASSOCIATE_DATA["email"],
+            SALES_MANAGER_DATA["email"],
+            CEO_DATA["email"],
+        ]
+        assert emails[0].sender == EMAIL_FROM
+        assert emails[0].subject == "Your dundie password"
+        assert emails[0].body == "Your password is: 1234"
+        assert emails[0].attempts == 0
+
+
+@pytest.mark.unit
+def test_positive_bulk_load_queues_emails():
+    """Test that the bulk load queues one password email per new employee."""
+    result = load(EMPLOYEES_FILE, bulk=True, chunk_size=4)
+
+    with get_session() as session:
+        emails = session.exec(select(Outbox).order_by(Outbox.id)).all()
+
+        assert [email.recipient for email in emails] == [
+            row["email"] for row in result
+        ]
+        assert all(
+            email.body.startswith("Your password is: ") for email in emails
+        )
+
+
+@pytest.mark.unit
+def test_negative_rolled_back_employee_queues_no_email():
+    """Test that no email is queued for an employee that is rolled back."""
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_ASSOCIATE_DATA))
+        session.rollback()
+
+    with get_session() as session:
+        assert session.exec(select(Outbox)).all() == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("batch_size", [1, 2, 100])
+def test_positive_flush_outbox(sent_emails: list[tuple], batch_size: int):
+    """
+    Test that `flush_outbox` sends every queued email and drains the outbox,\
+    whatever the batch size.
+    """
+    _add_employees()
+
+    assert flush_outbox(batch_size=batch_size) == {
+        "sent": 3,
+        "failed": 0,
+        "dropped": 0,
+        "unsent": 0,
+    }
+
+    assert [email[1] for email in sent_emails] == [
+        SALES_ASSOCIATE_DATA["email"],
+        SALES_MANAGER_DATA["email"],
+        CEO_DATA["email"],
+    ]
+
+    with get_session() as session:
+        assert session.exec(select(Outbox)).all() == []
+
+    assert flush_outbox() == {
+        "sent": 0,
+        "failed": 0,
+        "dropped": 0,
+        "unsent": 0,
+    }
+
+
+@pytest.mark.unit
+def test_negative_flush_outbox_drops_exhausted_emails(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+):
+    """
+    Test that `flush_outbox` keeps the emails that fail to be sent and drops\
+    them after OUTBOX_MAX_ATTEMPTS, logging their recipient, so their\
+    password is not kept in the database.
+    """
+
+    def mock_send(
+        self: SMTPSender, sender: str, recipient: str, *args: str
+    ) -> bool:
+        return recipient != SALES_MANAGER_DATA["email"]
+
+    monkeypatch.setattr(SMTPSender, "send", mock_send)
+
+    _add_employees()
+
+    assert flush_outbox(batch_size=1) == {
+        "sent": 2,
+        "failed": 1,
+        "dropped": 0,
+        "unsent": 0,
+    }
+
+    for _ in range(OUTBOX_MAX_ATTEMPTS - 2):
+        assert flush_outbox() == {
+            "sent": 0,
+            "failed": 1,
+            "dropped": 0,
+            "unsent": 0,
+        }
+
+    with get_session() as session:
+        emails = session.exec(select(Outbox)).all()
+
+        assert [email.recipient for email in emails] == [
+            SALES_MANAGER_DATA["email"]
+        ]
+        assert emails[0].attempts == OUTBOX_MAX_ATTEMPTS - 1
+
+    assert flush_outbox() == {
+        "sent": 0,
+        "failed": 1,
+        "dropped": 1,
+        "unsent": 0,
+    }
+
+    with get_session() as session:
+        assert session.exec(select(Outbox)).all() == []
+
+    assert (
+        f"Dropped the email to {SALES_MANAGER_DATA['email']} after "
+        f"{OUTBOX_MAX_ATTEMPTS} failed attempts"
+    ) in caplog.text
+
+
+@pytest.mark.unit
+def test_positive_flush_outbox_purges_exhausted_emails(
+    sent_emails: list[tuple],
+):
+    """
+    Test that `flush_outbox` deletes the emails already at\
+    OUTBOX_MAX_ATTEMPTS without sending them.
+    """
+    _add_employees()
+    with get_session() as session:
+        for email in session.exec(select(Outbox)):
+            email.attempts = OUTBOX_MAX_ATTEMPTS
+            session.add(email)
+        session.commit()
+
+    assert flush_outbox() == {
+        "sent": 0,
+        "failed": 0,
+        "dropped": 3,
+        "unsent": 0,
+    }
+    assert sent_emails == []
+
+    with get_session() as session:
+        assert session.exec(select(Outbox)).all() == []
+
+
+@pytest.mark.unit
+def test_negative_flush_outbox_stops_when_server_unreachable(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    Test that `flush_outbox` stops at the first email the SMTP server cannot\
+    be reached for, retrying only once and keeping every email unsent without\
+    counting an attempt.
+    """
+    sleeps: list[float] = []
+    monkeypatch.setattr(email_module.time, "sleep", sleeps.append)
+
+    def mock_connect(self: SMTPSender) -> None:
+        raise ConnectionRefusedError("Connection refused")
+
+    monkeypatch.setattr(SMTPSender, "connect", mock_connect)
+
+    _add_employees()
+
+    assert flush_outbox(batch_size=1) == {
+        "sent": 0,
+        "failed": 0,
+        "dropped": 0,
+        "unsent": 3,
+    }
+    assert len(sleeps) == SMTP_MAX_RETRIES
+
+    with get_session() as session:
+        emails = session.exec(select(Outbox)).all()
+
+        assert len(emails) == 3
+        assert all(email.attempts == 0 for email in emails)
+
+
+@pytest.mark.unit
+def test_negative_flush_outbox_rejected_email(
+    smtp_server, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that an email the SMTP server rejects counts a failed attempt\
+    without blocking the emails queued after it.
+    """
+    handler, port = smtp_server
+    handler.rejected.add(SALES_ASSOCIATE_DATA["email"])
+    monkeypatch.setattr(email_module, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(email_module, "SMTP_PORT", port)
+
+    _add_employees()
+
+    assert flush_outbox() == {
+        "sent": 2,
+        "failed": 1,
+        "dropped": 0,
+        "unsent": 0,
+    }
+    assert [rcpt_tos for _, rcpt_tos in handler.messages] == [
+        [SALES_MANAGER_DATA["email"]],
+        [CEO_DATA["email"]],
+    ]
+
+    with get_session() as session:
+        emails = session.exec(select(Outbox)).all()
+
+        assert [email.recipient for email in emails] == [
+            SALES_ASSOCIATE_DATA["email"]
+        ]
+        assert emails[0].attempts == 1
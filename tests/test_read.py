@@ -1,10 +1,16 @@
 """dundie read function unit test."""
 
+from decimal import Decimal
+
 import pytest
+from sqlalchemy import event
+from sqlmodel import select
 
-from dundie.core import read
+from dundie import core, database
+from dundie.core import iter_read, read
 from dundie.database import get_session
-from dundie.models import Employee
+from dundie.models import Employee, Transaction
+from dundie.settings import DATE_FORMAT
 from dundie.utils.db import add_employee
 
 from .constants import CEO_DATA, SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA
@@ -212,3 +218,227 @@ def test_negative_read_with_department_query():
     result = read(department="None")
 
     assert len(result) == 0
+
+
+@pytest.mark.unit
+def test_positive_read_query_count_is_constant(sql_statements):
+    """
+    Test that the number of queries of the read function does not grow with\
+    the number of employees.
+    """
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_ASSOCIATE_DATA))
+        session.commit()
+
+    with sql_statements() as statements:
+        assert len(read()) == 1
+
+    with get_session() as session:
+        for index in range(10):
+            data = {**SALES_MANAGER_DATA, "email": f"jane{index}@doe.com"}
+            add_employee(session, Employee(**data))
+        session.commit()
+
+    with sql_statements() as more_statements:
+        assert len(read()) == 11
+    assert len(more_statements) == len(statements)
+
+
+@pytest.mark.unit
+def test_positive_read_last_transaction():
+    """Test that read returns the date of the latest transaction."""
+    with get_session() as session:
+        employee = Employee(**SALES_ASSOCIATE_DATA)
+        add_employee(session, employee)
+        session.commit()
+        transactions = session.exec(
+            select(Transaction).where(Transaction.employee_id == employee.id)
+        ).all()
+
+    result = read()
+
+    assert result[0]["last_transaction"] == max(
+        transaction.date for transaction in transactions
+    ).strftime(DATE_FORMAT)
+
+
+@pytest.mark.unit
+def test_positive_read_last_transaction_from_balance(sql_statements):
+    """
+    Test that read takes the date of the last transaction from the balance,\
+    without reading the transaction table.
+    """
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_ASSOCIATE_DATA))
+        session.commit()
+
+    with sql_statements() as statements:
+        result = read()
+
+    assert result[0]["last_transaction"]
+    assert not any('"transaction"' in statement for statement in statements)
+
+
+@pytest.mark.unit
+def test_positive_iter_read_streams_rows(monkeypatch):
+    """
+    Test that iter_read yields the same rows as read, fetching them in\
+    chunks of READ_CHUNK_SIZE.
+    """
+    monkeypatch.setattr(core, "READ_CHUNK_SIZE", 2)
+    with get_session() as session:
+        for index in range(5):
+            data = {**SALES_ASSOCIATE_DATA, "email": f"jim{index}@doe.com"}
+            add_employee(session, Employee(**data))
+        session.commit()
+
+    fetches = []
+
+    def before_cursor_execute(conn, cursor, statement, params, context, many):
+        fetches.append(context.execution_options.get("yield_per"))
+
+    event.listen(
+        database.engine, "before_cursor_execute", before_cursor_execute
+    )
+    try:
+        rows = iter_read()
+        assert fetches == []
+        first = next(rows)
+        rows = [first, *rows]
+    finally:
+        event.remove(
+            database.engine, "before_cursor_execute", before_cursor_execute
+        )
+
+    assert 2 in fetches
+    assert rows == read()
+    assert [row["email"] for row in rows] == [
+        f"jim{index}@doe.com" for index in range(5)
+    ]
+
+
+def _add_pages() -> list[str]:
+    """Add five employees, with emails not in id order.
+
+    Returns:
+        list[str]: The emails, in id order.
+    """
+    emails = [f"{name}@doe.com" for name in ["eve", "bob", "dan", "amy", "cid"]]
+    with get_session() as session:
+        for email in emails:
+            add_employee(
+                session, Employee(**{**SALES_ASSOCIATE_DATA, "email": email})
+            )
+        session.commit()
+    return emails
+
+
+@pytest.mark.unit
+def test_positive_read_pages_by_id():
+    """Test that read returns the pages of employees sorted by id."""
+    emails = _add_pages()
+    with get_session() as session:
+        ids = session.exec(select(Employee.id).order_by(Employee.id)).all()
+
+    first = read(limit=2)
+    second = read(limit=2, after=ids[1])
+    last = read(limit=2, after=emails[3])
+
+    assert [row["email"] for row in first] == emails[:2]
+    assert [row["email"] for row in second] == emails[2:4]
+    assert [row["email"] for row in last] == emails[4:]
+    assert read(limit=2, after=ids[-1]) == []
+
+
+@pytest.mark.unit
+def test_positive_read_pages_by_email():
+    """Test that read returns the pages of employees sorted by email."""
+    emails = sorted(_add_pages())
+    with get_session() as session:
+        bob_id = session.exec(
+            select(Employee.id).where(Employee.email == "bob@doe.com")
+        ).one()
+
+    first = read(order_by="email", limit=2)
+    second = read(order_by="email", limit=2, after=first[-1]["email"])
+    by_id = read(order_by="email", limit=2, after=bob_id)
+
+    assert [row["email"] for row in first] == emails[:2]
+    assert [row["email"] for row in second] == emails[2:4]
+    assert by_id == second
+
+
+@pytest.mark.unit
+def test_positive_read_page_with_filter():
+    """Test that the filters apply before the page is cut."""
+    _add_pages()
+    with get_session() as session:
+        add_employee(session, Employee(**CEO_DATA))
+        session.commit()
+
+    result = read(department=CEO_DATA["department"], limit=1, after=1)
+
+    assert [row["email"] for row in result] == [CEO_DATA["email"]]
+
+
+@pytest.mark.unit
+def test_negative_read_invalid_sort_key():
+    """Test that read rejects a sort key that cannot be a cursor."""
+    with pytest.raises(ValueError, match="Invalid sort key"):
+        read(order_by="name")
+
+
+@pytest.mark.unit
+def test_positive_read_fields(monkeypatch, sql_statements):
+    """
+    Test that read selects only the requested fields and skips the exchange\
+    rates when the total is not requested.
+    """
+
+    def mock_get_exchange_rates(*args, **kwargs):
+        raise AssertionError("The exchange rates should not be fetched")
+
+    monkeypatch.setattr(core, "get_exchange_rates", mock_get_exchange_rates)
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_ASSOCIATE_DATA))
+        session.commit()
+
+    with sql_statements() as statements:
+        result = read(fields=["email", "balance", "email"])
+
+    assert result == [
+        {"email": SALES_ASSOCIATE_DATA["email"], "balance": Decimal(500)}
+    ]
+    assert len(statements) == 1
+    assert "employee.name" not in statements[0]
+    assert '"transaction"' not in statements[0]
+
+
+@pytest.mark.unit
+def test_positive_read_fields_total():
+    """Test that the total is computed without returning its columns."""
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_ASSOCIATE_DATA))
+        session.commit()
+
+    result = read(fields=["total", "name"])
+
+    assert list(result[0]) == ["total", "name"]
+    assert result[0]["total"] == read()[0]["total"]
+
+
+@pytest.mark.unit
+def test_positive_read_single_field():
+    """Test that read returns dicts when a single field is requested."""
+    with get_session() as session:
+        add_employee(session, Employee(**SALES_ASSOCIATE_DATA))
+        session.commit()
+
+    assert read(fields=["email"]) == [{"email": SALES_ASSOCIATE_DATA["email"]}]
+
+
+@pytest.mark.unit
+def test_negative_read_invalid_field():
+    """Test that read rejects a field that does not exist."""
+    with pytest.raises(ValueError, match="Invalid field 'password'"):
+        read(fields=["email", "password"])
@@ -0,0 +1,95 @@
+"""dundie reconcile function unit test."""
+
+from decimal import Decimal
+
+import pytest
+from sqlmodel import select
+
+from dundie.core import reconcile
+from dundie.database import get_session
+from dundie.models import Employee
+from dundie.settings import DEFAULT_ASSOCIATE_POINTS, DEFAULT_MANAGER_POINTS
+from dundie.utils.db import add_employee, add_transaction
+
+from .constants import CEO_DATA, SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA
+
+
+@pytest.fixture(autouse=True)
+def _employees() -> None:
+    """Fixture to add a set of employees to the database."""
+    with get_session() as session:
+        for data in [SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA, CEO_DATA]:
+            add_employee(session, Employee(**data))
+        session.commit()
+
+
+def _tamper_balance(email: str, value: Decimal) -> None:
+    """Overwrite the stored balance of an employee bypassing the ledger."""
+    with get_session() as session:
+        employee = session.exec(
+            select(Employee).where(Employee.email == email)
+        ).one()
+        employee.balance.value = value
+        session.add(employee.balance)
+        session.commit()
+
+
+@pytest.mark.unit
+def test_positive_reconcile_balances_match_ledger() -> None:
+    """Test that no mismatch is reported when balances match the ledger."""
+    with get_session() as session:
+        employee = session.exec(
+            select(Employee).where(
+                Employee.email == SALES_ASSOCIATE_DATA["email"]
+            )
+        ).one()
+        add_transaction(session, employee, Decimal(10), "Updated points")
+        add_transaction(session, employee, Decimal(-2.5), "Updated points")
+        session.commit()
+
+    assert reconcile() == []
+
+
+@pytest.mark.unit
+def test_negative_reconcile_reports_mismatch() -> None:
+    """
+    Test that a balance that differs from the ledger is reported.
+
+    Asserts:
+        Only the tampered employee is reported, with both the stored and the
+        ledger balance, and the balance is left untouched without `fix`.
+    """
+    _tamper_balance(SALES_MANAGER_DATA["email"], Decimal(1))
+
+    result = reconcile()
+
+    assert result == [
+        {
+            "email": SALES_MANAGER_DATA["email"],
+            "balance": Decimal(1),
+            "ledger": DEFAULT_MANAGER_POINTS,
+            "fixed": False,
+        }
+    ]
+    assert len(reconcile()) == 1
+
+
+@pytest.mark.unit
+def test_positive_reconcile_fix_mismatch() -> None:
+    """Test that `fix` rewrites the mismatched balance from the ledger."""
+    _tamper_balance(SALES_ASSOCIATE_DATA["email"], Decimal(0))
+
+    result = reconcile(fix=True)
+
+    assert len(result) == 1
+    assert result[0]["fixed"] is True
+    assert reconcile() == []
+
+    with get_session() as session:
+        employee = session.exec(
+            select(Employee).where(
+                Employee.email == SALES_ASSOCIATE_DATA["email"]
+            )
+        ).one()
+
+        assert employee.balance.value == DEFAULT_ASSOCIATE_POINTS
@@ -1,15 +1,16 @@
 """dundie update subcommand unit test."""
 
 from collections import deque
+from decimal import Decimal
 from typing import Generator
 
 import pytest
-from sqlmodel import select
+from sqlmodel import func, select
 
 from dundie.core import read, update
 from dundie.database import get_session
-from dundie.models import Employee
-from dundie.utils.db import add_employee
+from dundie.models import Balance, Employee, Transaction
+from dundie.utils.db import add_employee, add_transactions
 
 from .constants import CEO_DATA, SALES_ASSOCIATE_DATA, SALES_MANAGER_DATA
 
@@ -196,3 +197,106 @@ def test_update_points_to_all_employees() -> None:
                 assert data.balance.value == previous_balance.popleft()
             else:
                 assert data.balance.value == previous_balance.popleft() + 25
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("currencies", [["USD"], ["USD", "EUR", "BRL", "GBP"]])
+def test_update_points_skips_exchange_rates(
+    monkeypatch: pytest.MonkeyPatch, currencies: list[str]
+) -> None:
+    """
+    Test that update does not look up exchange rates, so its latency does\
+    not depend on the number of currencies of the target employees.
+    """
+    lookups: list[list[str]] = []
+
+    def mock_get_exchange_rates(currencies: list[str], **kwargs):
+        lookups.append(currencies)
+        return {}
+
+    monkeypatch.setattr(
+        "dundie.core.get_exchange_rates", mock_get_exchange_rates
+    )
+
+    with get_session() as session:
+        for index, currency in enumerate(currencies):
+            data = {
+                **SALES_ASSOCIATE_DATA,
+                "email": f"john{index}@doe.com",
+                "currency": currency,
+            }
+            add_employee(session, Employee(**data))
+        session.commit()
+
+    assert update(10, department=SALES_ASSOCIATE_DATA["department"]) == ""
+
+    assert lookups == []
+
+
+def _add_sales_employees(count: int, start: int = 0) -> None:
+    """Add employees to the Sales department with an initial balance."""
+    with get_session() as session:
+        for index in range(start, start + count):
+            data = {**SALES_ASSOCIATE_DATA, "email": f"john{index}@doe.com"}
+            session.add(Balance(employee=Employee(**data), value=Decimal(100)))
+        session.commit()
+
+
+@pytest.mark.unit
+def test_update_department_award_is_set_based(sql_statements) -> None:
+    """
+    Test that the number of statements of a department award does not grow\
+    with the size of the department.
+    """
+    _add_sales_employees(3)
+    with sql_statements() as small:
+        assert update(10, department="Sales") == ""
+
+    _add_sales_employees(50, start=3)
+    with sql_statements() as large:
+        assert update(10, department="Sales") == ""
+
+    assert len(large) == len(small)
+
+    with get_session() as session:
+        balances = session.exec(
+            select(Balance.value)
+            .join(Employee)
+            .where(Employee.department == "Sales")
+        ).all()
+        transactions = session.exec(
+            select(func.count()).where(
+                Transaction.description == "Updated points"
+            )
+        ).one()
+
+    assert sorted(balances) == [Decimal(110)] * 50 + [Decimal(120)] * 3
+    assert transactions == 3 + 53
+
+
+@pytest.mark.unit
+def test_update_award_is_atomic(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a failure during an award leaves no partial award behind."""
+    _add_sales_employees(5)
+
+    def failing_add_transactions(session, transactions, *args, **kwargs):
+        add_transactions(session, transactions[:2], *args, **kwargs)
+        raise RuntimeError("Database failure")
+
+    monkeypatch.setattr(
+        "dundie.core.add_transactions", failing_add_transactions
+    )
+
+    with pytest.raises(RuntimeError):
+        update(10, department="Sales")
+
+    with get_session() as session:
+        balances = session.exec(select(Balance.value)).all()
+        transactions = session.exec(
+            select(func.count()).where(
+                Transaction.description == "Updated points"
+            )
+        ).one()
+
+    assert Decimal(110) not in balances
+    assert transactions == 0
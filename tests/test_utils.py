@@ -1,12 +1,23 @@
 """dundie utils unit test."""
 
+import os
+import subprocess
+import sys
+from concurrent.futures.process import BrokenProcessPool
+
 import pytest
 from pwdlib.exceptions import UnknownHashError
 
+from dundie.utils import user
 from dundie.utils.email import check_valid_email
 from dundie.utils.user import (
+    create_password_hash,
     generate_password_hash,
+    generate_password_hashes,
     generate_simple_password,
+    password_hash_executor,
+    password_needs_rehash,
+    verify_and_update_password,
     verify_password,
 )
 from tests.constants import INVALID_EMAILS, VALID_EMAILS
@@ -171,6 +182,74 @@ def test_verify_password_invalid_hash(monkeypatch: pytest.MonkeyPatch) -> None:
     assert verify_password("password", "invalid_hash") is False
 
 
+@pytest.mark.unit
+def test_password_needs_rehash() -> None:
+    """
+    Test that only the hashes weaker than the Argon2 settings need a\
+    rehash.
+    """
+    assert password_needs_rehash(generate_password_hash("password")) is False
+    assert password_needs_rehash(
+        create_password_hash(time_cost=1).hash("password")
+    )
+    assert password_needs_rehash(
+        create_password_hash(memory_cost=8 * 1024).hash("password")
+    )
+    assert password_needs_rehash("invalid_hash") is True
+
+
+@pytest.mark.unit
+def test_password_needs_rehash_keeps_stronger_hash(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a host with cheaper settings does not downgrade a hash."""
+    password_hash = generate_password_hash("password")
+    monkeypatch.setattr(user, "ARGON2_TIME_COST", 1)
+    monkeypatch.setattr(user, "ARGON2_MEMORY_COST", 8 * 1024)
+
+    assert password_needs_rehash(password_hash) is False
+
+
+@pytest.mark.unit
+def test_negative_invalid_argon2_profile() -> None:
+    """Test that an unknown Argon2 profile is rejected with the valid ones."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import dundie.settings"],
+        env={**os.environ, "DUNDIE_ARGON2_PROFILE": "fast"},
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode != 0
+    assert (
+        "Invalid DUNDIE_ARGON2_PROFILE 'fast', use one of: default, batch."
+        in result.stderr
+    )
+
+
+@pytest.mark.unit
+def test_verify_and_update_password() -> None:
+    """Test `verify_and_update_password` with current and weak hashes."""
+    password_hash = generate_password_hash("password")
+    weak_hash = create_password_hash(time_cost=1).hash("password")
+
+    assert verify_and_update_password("password", password_hash) == (
+        True,
+        None,
+    )
+    assert verify_and_update_password("wrongpassword", weak_hash) == (
+        False,
+        None,
+    )
+
+    valid, updated_hash = verify_and_update_password("password", weak_hash)
+    assert valid is True
+    assert updated_hash is not None
+    assert password_needs_rehash(updated_hash) is False
+    assert verify_password("password", updated_hash) is True
+
+
 @pytest.mark.unit
 def test_generate_simple_password_default_size() -> None:
     """Test `generate_simple_password` with default size."""
@@ -228,3 +307,46 @@ def test_positive_generate_simple_password() -> None:
     passwords = {generate_simple_password(size=8) for _ in range(100)}
 
     assert len(passwords) == 100  # Check that all passwords are unique
+
+
+@pytest.mark.unit
+def test_password_hash_executor_serial() -> None:
+    """Test that `password_hash_executor` yields no pool for one worker."""
+    with password_hash_executor(workers=1) as executor:
+        assert executor is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_password_hashes(workers: int) -> None:
+    """
+    Test that `generate_password_hashes` hashes every password of the batch\
+    in order, serially or with a process pool.
+    """
+    passwords = [generate_simple_password() for _ in range(4)]
+
+    with password_hash_executor(workers=workers) as executor:
+        hashed_passwords = generate_password_hashes(passwords, executor)
+
+    assert len(hashed_passwords) == len(passwords)
+    for password, hashed_password in zip(passwords, hashed_passwords):
+        assert verify_password(password, hashed_password) is True
+
+
+@pytest.mark.unit
+def test_generate_password_hashes_broken_pool(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that `generate_password_hashes` falls back to serial hashing."""
+
+    def mock_map(*args: tuple, **kwargs: dict) -> None:
+        raise BrokenProcessPool("broken")
+
+    passwords = ["password1", "password2"]
+
+    with password_hash_executor(workers=2) as executor:
+        monkeypatch.setattr(executor, "map", mock_map)
+        hashed_passwords = generate_password_hashes(passwords, executor)
+
+    assert verify_password("password1", hashed_passwords[0]) is True
+    assert verify_password("password2", hashed_passwords[1]) is True